@@ -132,34 +132,68 @@ app_license = "mit"
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	("Distribution Organization", "Country"): {
+		"on_update": "sysmayal.sysmayal.utils.lookup_cache.clear_lookup_cache",
+		"on_trash": "sysmayal.sysmayal.utils.lookup_cache.clear_lookup_cache",
+		"after_rename": "sysmayal.sysmayal.utils.lookup_cache.clear_lookup_cache",
+	},
+	("Product Compliance", "Certification Document", "Distribution Organization"): {
+		"validate": "sysmayal.sysmayal.utils.expiry_buckets.set_expiry_buckets",
+	},
+	("Certification Document", "Product Compliance"): {
+		"on_update": "sysmayal.sysmayal.integrations.calendar_feed.update_feed_events",
+		"on_trash": "sysmayal.sysmayal.integrations.calendar_feed.update_feed_events",
+		"after_rename": "sysmayal.sysmayal.integrations.calendar_feed.update_feed_events",
+	},
+	("User Permission", "DocShare", "User", "Custom DocPerm"): {
+		"on_update": "sysmayal.sysmayal.integrations.calendar_feed.clear_feed_cache",
+		"on_trash": "sysmayal.sysmayal.integrations.calendar_feed.clear_feed_cache",
+	},
+	(
+		"Distribution Organization",
+		"Distribution Contact",
+		"Product Compliance",
+		"Certification Document",
+		"Market Entry Plan",
+		"Product Development Project",
+		"Market Research",
+		"Country Regulation",
+	): {
+		"on_update": "sysmayal.sysmayal.utils.change_log.record_document_change",
+		"on_trash": "sysmayal.sysmayal.utils.change_log.record_document_change",
+		"after_rename": "sysmayal.sysmayal.utils.change_log.record_document_change",
+	},
+	("Product Compliance", "Certification Document", "Distribution Contact"): {
+		"on_update": "sysmayal.sysmayal.utils.compliance_rollup.update_record_rollup",
+		"on_trash": "sysmayal.sysmayal.utils.compliance_rollup.update_record_rollup",
+	},
+	"Distribution Organization": {
+		"validate": "sysmayal.sysmayal.utils.compliance_rollup.set_organization_rollup",
+		"on_update": "sysmayal.sysmayal.utils.compliance_rollup.update_organization_rollup",
+		"on_trash": "sysmayal.sysmayal.utils.compliance_rollup.update_organization_rollup",
+	},
+	"Product Development Project": {
+		"on_update": "sysmayal.sysmayal.report.rd_project_status_report.rd_project_status_report.clear_project_analytics_cache",
+		"on_trash": "sysmayal.sysmayal.report.rd_project_status_report.rd_project_status_report.clear_project_analytics_cache",
+	},
+}
 
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"sysmayal.tasks.all"
-# 	],
-# 	"daily": [
-# 		"sysmayal.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"sysmayal.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"sysmayal.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"sysmayal.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"all": [
+		"sysmayal.sysmayal.integrations.erpnext_sync.process_sync_events"
+	],
+	"daily": [
+		"sysmayal.sysmayal.tasks.check_certification_expiry",
+		"sysmayal.sysmayal.utils.expiry_buckets.update_expiry_buckets"
+	],
+	"hourly_long": [
+		"sysmayal.sysmayal.integrations.analytics_export.run_scheduled_export"
+	],
+}
 
 # Testing
 # -------
@@ -194,11 +228,35 @@ app_license = "mit"
 # before_request = ["sysmayal.utils.before_request"]
 # after_request = ["sysmayal.utils.after_request"]
 
+before_request = [
+	"sysmayal.sysmayal.utils.instrumentation.before_request",
+	"sysmayal.sysmayal.utils.n_plus_one.before_request",
+	"sysmayal.sysmayal.utils.slow_queries.before_request"
+]
+after_request = [
+	"sysmayal.sysmayal.utils.instrumentation.after_request",
+	"sysmayal.sysmayal.utils.n_plus_one.after_request",
+	"sysmayal.sysmayal.utils.slow_queries.after_request",
+	"sysmayal.sysmayal.utils.replica.close_request_replica"
+]
+
 # Job Events
 # ----------
 # before_job = ["sysmayal.utils.before_job"]
 # after_job = ["sysmayal.utils.after_job"]
 
+before_job = [
+	"sysmayal.sysmayal.utils.instrumentation.before_job",
+	"sysmayal.sysmayal.utils.n_plus_one.before_job",
+	"sysmayal.sysmayal.utils.slow_queries.before_job"
+]
+after_job = [
+	"sysmayal.sysmayal.utils.instrumentation.after_job",
+	"sysmayal.sysmayal.utils.n_plus_one.after_job",
+	"sysmayal.sysmayal.utils.slow_queries.after_job",
+	"sysmayal.sysmayal.utils.replica.close_request_replica"
+]
+
 # User Data Protection
 # --------------------
 
@@ -233,7 +291,9 @@ app_license = "mit"
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+	"Sysmayal Sync Event": 30,  # days to retain processed sync events
+	"Sysmayal Slow Query": 14,
+	"Sysmayal Change Log": 30
+}
 
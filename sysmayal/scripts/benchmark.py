@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Sysmayal Benchmark Suite
+
+This script generates large, deterministic synthetic data sets and times
+the reports, dashboard endpoints and bulk operations against them. Results
+are written as JSON so runs can be compared between releases.
+
+Usage:
+    bench --site your-site.com execute sysmayal.scripts.benchmark.generate_benchmark_data --kwargs "{'scale': 0.01}"
+    bench --site your-site.com execute sysmayal.scripts.benchmark.run_benchmarks
+    bench --site your-site.com execute sysmayal.scripts.benchmark.clear_benchmark_data
+    bench --site your-site.com execute sysmayal.scripts.benchmark.measure_import_time
+
+Generated records are named with the BENCH- prefix and are inserted with
+bulk inserts, bypassing document hooks, so a full-scale data set
+(scale=1.0) can be created in minutes.
+
+measure_import_time tracks the app's cold-start cost: it imports each
+module in a fresh interpreter under python -X importtime and reports what
+the module adds on top of frappe, with the heaviest packages it pulls in.
+"""
+
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import frappe
+from frappe.utils import add_days, get_datetime, getdate, now_datetime, nowdate
+from sysmayal.sysmayal.utils.expiry_buckets import get_expiry_bucket
+
+# Record volumes at scale=1.0
+BASE_VOLUMES = {
+    "Distribution Organization": 100000,
+    "Distribution Contact": 1000000,
+    "Product Compliance": 500000,
+    "Certification Document": 200000
+}
+
+NAME_PREFIX = "BENCH-"
+CHUNK_SIZE = 10000
+
+# Packages listed per module in the import time results
+HEAVIEST_IMPORTS = 5
+
+# Share of organizations without a parent organization
+ROOT_ORGANIZATION_RATIO = 0.1
+
+ORGANIZATION_TYPES = ["Distributor", "Retailer", "Supplier", "Manufacturer", "Wholesaler", "Agent"]
+ORGANIZATION_STATUSES = ["Active"] * 6 + ["Inactive", "Pending", "Suspended", "Terminated"]
+REGULATORY_STATUSES = ["Compliant", "Pending Review", "Non-Compliant", "Expired", "Not Applicable"]
+CONTACT_STATUSES = ["Active"] * 6 + ["Inactive", "Pending", "Do Not Contact"]
+REGULATORY_ROLES = ["Quality Manager", "Regulatory Affairs Manager", "Product Manager", "Distribution Manager"]
+COMPLIANCE_STATUSES = ["Compliant"] * 4 + ["Pending Review", "Non-Compliant", "Partially Compliant", "Expired"]
+PRODUCT_CATEGORIES = ["Aloe Juice", "Aloe Powder", "Cosmetic Formulation", "Pharmaceutical", "Dietary Supplement"]
+RISK_LEVELS = ["Low", "Medium", "High", "Critical"]
+DOCUMENT_TYPES = ["ISO Certificate", "GMP Certificate", "Organic Certificate", "FDA Registration"]
+CERTIFICATE_STATUSES = ["Valid"] * 5 + ["Expired", "Expiring Soon", "Pending Renewal", "Under Review"]
+FIRST_NAMES = ["Ana", "Ben", "Chen", "Dara", "Elif", "Femi", "Gita", "Hugo", "Ines", "Jun", "Kofi", "Lena"]
+LAST_NAMES = ["Alvarez", "Brown", "Costa", "Dubois", "Eze", "Fischer", "Garcia", "Haddad", "Ito", "Jensen"]
+
+def generate_benchmark_data(scale=1.0, seed=42):
+    """
+    Bulk-create a deterministic synthetic data set.
+
+    Args:
+        scale (float): Fraction of BASE_VOLUMES to create
+        seed (int): Random seed; the same seed and scale give the same data
+
+    Returns:
+        dict: Number of records created per doctype
+    """
+
+    rng = random.Random(seed)
+    volumes = {doctype: max(int(count * float(scale)), 1) for doctype, count in BASE_VOLUMES.items()}
+
+    countries = frappe.get_all("Country", pluck="name", order_by="name")
+    if not countries:
+        frappe.throw("Country records are required to generate benchmark data")
+
+    print(f"Generating Sysmayal benchmark data (scale={scale}, seed={seed})...")
+
+    _generate_organizations(rng, volumes["Distribution Organization"], countries)
+    _generate_contacts(rng, volumes["Distribution Contact"], volumes["Distribution Organization"], countries)
+    _generate_compliance(rng, volumes["Product Compliance"], volumes["Distribution Organization"], countries)
+    _generate_certificates(rng, volumes["Certification Document"], volumes["Distribution Organization"], countries)
+
+    print("Benchmark data generated!")
+    return volumes
+
+def clear_benchmark_data():
+    """Delete every generated BENCH- record."""
+
+    for doctype in BASE_VOLUMES:
+        frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE name LIKE %s", (f"{NAME_PREFIX}%",))
+        frappe.db.commit()
+        print(f"Cleared benchmark {doctype} records")
+
+def get_scenarios():
+    """
+    Get the timed benchmark scenarios.
+
+    Returns:
+        dict: Callables keyed by scenario name
+    """
+
+    from sysmayal.sysmayal.doctype.certification_document import certification_document
+    from sysmayal.sysmayal.doctype.distribution_organization import distribution_organization
+    from sysmayal.sysmayal.doctype.market_entry_plan import market_entry_plan
+    from sysmayal.sysmayal.doctype.market_research import market_research
+    from sysmayal.sysmayal.doctype.product_compliance import product_compliance
+    from sysmayal.sysmayal.doctype.product_development_project import product_development_project
+    from sysmayal.sysmayal.report.compliance_status_report import compliance_status_report
+    from sysmayal.sysmayal.report.distribution_analytics_report import distribution_analytics_report
+    from sysmayal.sysmayal.report.rd_project_status_report import rd_project_status_report
+
+    return {
+        # Reports
+        "report.compliance_status": lambda: compliance_status_report.execute({}),
+        "report.distribution_analytics": lambda: distribution_analytics_report.execute({}),
+        "report.rd_project_status": lambda: rd_project_status_report.execute({}),
+
+        # Dashboard endpoints
+        "dashboard.compliance": product_compliance.get_compliance_dashboard_data,
+        "dashboard.certificates": certification_document.get_certificate_dashboard_data,
+        "dashboard.projects": product_development_project.get_project_dashboard_data,
+        "dashboard.market_entry": market_entry_plan.get_market_entry_dashboard,
+        "dashboard.research": market_research.get_research_dashboard_data,
+        "dashboard.distribution_summary": distribution_analytics_report.get_distribution_summary,
+        "dashboard.distribution_performance": distribution_analytics_report.get_performance_metrics,
+        "dashboard.contact_analytics": distribution_analytics_report.get_contact_analytics,
+        "dashboard.organization_hierarchy": lambda: distribution_organization.get_organization_hierarchy(
+            _get_benchmark_root_organization()
+        ),
+        "dashboard.expiring_certificates": certification_document.get_expiring_certificates,
+
+        # Bulk operations
+        "bulk.import_organizations": _run_organization_import,
+        "bulk.verify_certificates": lambda: certification_document.bulk_verify_documents(
+            frappe.get_all(
+                "Certification Document",
+                filters={"name": ["like", f"{NAME_PREFIX}%"]},
+                pluck="name",
+                order_by="name",
+                limit=500
+            )
+        )
+    }
+
+def run_benchmarks(scenarios=None, repeat=3, output=None):
+    """
+    Time each scenario and write the results as JSON.
+
+    Every run is rolled back, so scenarios that write leave no trace.
+
+    Args:
+        scenarios (list): Scenario names to run, defaults to all
+        repeat (int): Number of timed runs per scenario
+        output (str): Result file path, defaults to the site's private/benchmarks folder
+
+    Returns:
+        str: Path of the result file
+    """
+
+    available = get_scenarios()
+    selected = scenarios or list(available)
+    repeat = int(repeat)
+
+    results = {
+        "timestamp": str(now_datetime()),
+        "site": frappe.local.site,
+        "app_version": frappe.get_attr("sysmayal.__version__"),
+        "frappe_version": frappe.__version__,
+        "python_version": platform.python_version(),
+        "data_volumes": {doctype: frappe.db.count(doctype) for doctype in BASE_VOLUMES},
+        "scenarios": {}
+    }
+
+    for name in selected:
+        runs = []
+        error = None
+
+        for _run in range(repeat):
+            frappe.db.rollback()
+            start = time.perf_counter()
+            try:
+                available[name]()
+            except Exception as e:
+                error = str(e)
+                break
+            finally:
+                frappe.db.rollback()
+            runs.append(round(time.perf_counter() - start, 4))
+
+        results["scenarios"][name] = {
+            "runs": runs,
+            "min": min(runs) if runs else None,
+            "median": statistics.median(runs) if runs else None,
+            "max": max(runs) if runs else None,
+            "error": error
+        }
+        print(f"{name}: {results['scenarios'][name]['median']}s" + (f" (error: {error})" if error else ""))
+
+    output = output or frappe.get_site_path(
+        "private", "benchmarks", "sysmayal-{0}.json".format(get_datetime().strftime("%Y%m%d-%H%M%S"))
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=1, default=str)
+
+    print(f"Benchmark results written to {output}")
+    return output
+
+def measure_import_time(modules=None, output=None):
+    """
+    Measure the cold-start import cost of the app's modules.
+
+    Each module is imported in a fresh interpreter after frappe with
+    python -X importtime, so the figures are what the module adds to a
+    web or background worker that has already loaded frappe.
+
+    Args:
+        modules (list): Dotted module paths, defaults to every app module
+        output (str): Result file path, defaults to the site's private/benchmarks folder
+
+    Returns:
+        str: Path of the result file
+    """
+
+    modules = modules or get_app_modules()
+
+    results = {
+        "timestamp": str(now_datetime()),
+        "app_version": frappe.get_attr("sysmayal.__version__"),
+        "frappe_version": frappe.__version__,
+        "python_version": platform.python_version(),
+        "modules": {module: _measure_module_import(module) for module in modules}
+    }
+
+    for module, result in sorted(results["modules"].items(), key=lambda r: r[1]["import_ms"], reverse=True):
+        heaviest = ", ".join(f"{package} {ms}ms" for package, ms in result["heaviest"])
+        print(f"{module}: {result['import_ms']}ms" + (f" ({heaviest})" if heaviest else ""))
+
+    output = output or frappe.get_site_path(
+        "private", "benchmarks", "sysmayal-importtime-{0}.json".format(get_datetime().strftime("%Y%m%d-%H%M%S"))
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=1, default=str)
+
+    print(f"Import time results written to {output}")
+    return output
+
+def get_app_modules():
+    """List the dotted paths of the app's Python modules, excluding patches."""
+
+    app_path = frappe.get_app_path("sysmayal")
+    modules = []
+
+    for dirpath, dirnames, filenames in os.walk(app_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in ("__pycache__", "patches"))
+        package = os.path.relpath(dirpath, os.path.dirname(app_path)).replace(os.sep, ".")
+
+        for filename in sorted(filenames):
+            if filename.endswith(".py") and filename != "__init__.py":
+                modules.append(f"{package}.{filename[:-3]}")
+
+    return modules
+
+def _measure_module_import(module):
+    """Import one module after frappe in a fresh interpreter and parse -X importtime."""
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import frappe\nimport {module}"],
+        capture_output=True,
+        text=True
+    )
+
+    # Lines are "import time: self [us] | cumulative | imported package", in completion order
+    lines = [line.split("|") for line in process.stderr.splitlines() if line.startswith("import time:")]
+    entries = [(int(line[0].split(":")[1]), line[2].rstrip()) for line in lines[1:] if len(line) == 3]
+
+    # Everything completed after frappe itself was imported by the module
+    frappe_index = next((i for i, (_us, name) in enumerate(entries) if name.strip() == "frappe"), -1)
+    entries = entries[frappe_index + 1:]
+
+    packages = {}
+    for self_us, name in entries:
+        package = name.strip().split(".")[0]
+        if package != "sysmayal":
+            packages[package] = packages.get(package, 0) + self_us
+
+    heaviest = sorted(packages.items(), key=lambda p: p[1], reverse=True)[:HEAVIEST_IMPORTS]
+
+    return {
+        "import_ms": round(sum(self_us for self_us, _name in entries) / 1000, 1),
+        "heaviest": [(package, round(us / 1000, 1)) for package, us in heaviest if us >= 1000],
+        "error": process.stderr.strip().splitlines()[-1] if process.returncode else None
+    }
+
+def _generate_organizations(rng, count, countries):
+    """Create organizations with a parent hierarchy."""
+
+    roots = max(int(count * ROOT_ORGANIZATION_RATIO), 1)
+
+    def rows():
+        for i in range(count):
+            # Children always point at an earlier organization, so the hierarchy is acyclic
+            parent = _bench_name("ORG", rng.randrange(i)) if i >= roots else None
+            yield (
+                _bench_name("ORG", i),
+                f"Benchmark Organization {i:07d}",
+                rng.choice(ORGANIZATION_TYPES),
+                parent,
+                rng.choice(countries),
+                rng.choice(ORGANIZATION_STATUSES),
+                f"org{i}@bench.example.com",
+                rng.choice(REGULATORY_STATUSES),
+                rng.randrange(100000, 50000000),
+                rng.randrange(5, 2000),
+                *_expiry(rng, 720)
+            )
+
+    _bulk_insert("Distribution Organization", [
+        "organization_name", "organization_type", "parent_organization", "country", "status",
+        "email_id", "regulatory_status", "annual_revenue", "employee_count",
+        "agreement_expiry", "agreement_expiry_bucket"
+    ], rows(), count)
+
+def _generate_contacts(rng, count, organizations, countries):
+    """Create contacts spread over the organizations."""
+
+    def rows():
+        for i in range(count):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield (
+                _bench_name("CON", i),
+                first_name,
+                last_name,
+                f"{first_name} {last_name}",
+                _bench_name("ORG", rng.randrange(organizations)),
+                f"contact{i}@bench.example.com",
+                rng.choice(countries),
+                rng.choice(REGULATORY_ROLES),
+                rng.choice(CONTACT_STATUSES)
+            )
+
+    _bulk_insert("Distribution Contact", [
+        "first_name", "last_name", "full_name", "organization", "email_id",
+        "country", "regulatory_role", "status"
+    ], rows(), count)
+
+def _generate_compliance(rng, count, organizations, countries):
+    """Create product compliance records with review and expiry dates."""
+
+    def rows():
+        for i in range(count):
+            yield (
+                _bench_name("COMP", i),
+                f"Benchmark Product {i:07d}",
+                f"BP-{i:07d}",
+                rng.choice(countries),
+                rng.choice(COMPLIANCE_STATUSES),
+                rng.choice(PRODUCT_CATEGORIES),
+                rng.choice(RISK_LEVELS),
+                rng.randrange(0, 101),
+                _bench_name("ORG", rng.randrange(organizations)),
+                *_expiry(rng, 365),
+                *_expiry(rng, 1095)
+            )
+
+    _bulk_insert("Product Compliance", [
+        "product_name", "product_code", "country", "compliance_status", "product_category",
+        "risk_level", "compliance_percentage", "manufacturer",
+        "next_review_date", "review_bucket", "expiry_date", "expiry_bucket"
+    ], rows(), count)
+
+def _generate_certificates(rng, count, organizations, countries):
+    """Create certification documents with expiry and renewal dates."""
+
+    def rows():
+        for i in range(count):
+            expiry_date, expiry_bucket = _expiry(rng, 1095)
+            yield (
+                _bench_name("CERT", i),
+                f"Benchmark Certificate {i:07d}",
+                rng.choice(DOCUMENT_TYPES),
+                rng.choice(CERTIFICATE_STATUSES),
+                rng.choice(countries),
+                "Benchmark Certification Body",
+                f"BC-{i:07d}",
+                _bench_name("ORG", rng.randrange(organizations)),
+                f"cert{i}@bench.example.com",
+                expiry_date,
+                expiry_bucket,
+                add_days(expiry_date, -90),
+                "Annual"
+            )
+
+    _bulk_insert("Certification Document", [
+        "document_title", "document_type", "status", "country", "issuing_authority",
+        "certificate_number", "organization", "contact_email",
+        "expiry_date", "expiry_bucket", "next_renewal_due", "review_frequency"
+    ], rows(), count)
+
+def _bulk_insert(doctype, fields, rows, count):
+    """Insert generated rows in committed chunks."""
+
+    now = now_datetime()
+    standard = ("Administrator", "Administrator", now, now, 0)
+    columns = ["name", *fields, "owner", "modified_by", "creation", "modified", "docstatus"]
+
+    chunk = []
+    inserted = 0
+
+    for row in rows:
+        chunk.append((*row, *standard))
+
+        if len(chunk) == CHUNK_SIZE:
+            inserted += _insert_chunk(doctype, columns, chunk)
+            chunk = []
+            print(f"  {doctype}: {inserted}/{count}")
+
+    if chunk:
+        inserted += _insert_chunk(doctype, columns, chunk)
+
+    print(f"Created {inserted} {doctype} records")
+
+def _insert_chunk(doctype, columns, chunk):
+    """Insert and commit one chunk of rows."""
+
+    frappe.db.bulk_insert(doctype, columns, chunk, ignore_duplicates=True)
+    frappe.db.commit()
+    return len(chunk)
+
+def _expiry(rng, spread_days):
+    """Generate a date around today with its expiry window."""
+
+    date = getdate(add_days(nowdate(), rng.randrange(-spread_days // 4, spread_days)))
+    return date, get_expiry_bucket(date)
+
+def _bench_name(kind, index):
+    """Name of a generated record."""
+
+    return f"{NAME_PREFIX}{kind}-{index:07d}"
+
+def _get_benchmark_root_organization():
+    """Name of the first generated root organization."""
+
+    return _bench_name("ORG", 0)
+
+def _run_organization_import(rows=1000):
+    """Import a generated CSV of organizations through the bulk importer."""
+
+    from sysmayal.sysmayal.data_import.bulk_importer import SysmayalBulkImporter
+
+    rng = random.Random(rows)
+    countries = frappe.get_all("Country", pluck="name", order_by="name", limit=50)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as f:
+        writer = csv.writer(f)
+        writer.writerow(["organization_name", "organization_type", "country", "status", "email_id"])
+        for i in range(rows):
+            writer.writerow([
+                f"Benchmark Import {i:06d}",
+                rng.choice(ORGANIZATION_TYPES),
+                rng.choice(countries),
+                "Active",
+                f"import{i}@bench.example.com"
+            ])
+
+    try:
+        return SysmayalBulkImporter().import_organizations(f.name)
+    finally:
+        os.remove(f.name)
+
+if __name__ == "__main__":
+    # This script should be run from within a Frappe context
+    print("Sysmayal Benchmark Suite")
+    print("This script should be executed from within ERPNext using:")
+    print("bench --site your-site.com execute sysmayal.scripts.benchmark.run_benchmarks")
@@ -6,6 +6,7 @@ This module provides comprehensive data import functionality for:
 - Distribution contacts  
 - Address data
 - Regulatory compliance data
+- Batched upserts of country regulation datasets
 - Bulk import operations with validation and error handling
 """
 
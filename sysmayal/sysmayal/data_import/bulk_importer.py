@@ -6,11 +6,11 @@ contacts, addresses, and regulatory data with validation and error handling.
 """
 
 import frappe
-import pandas as pd
 import json
 import os
 from frappe.utils import validate_email_address, nowdate, cstr
 from frappe import _
+from sysmayal.sysmayal.utils.lookup_cache import get_cached_value
 
 class SysmayalBulkImporter:
     """
@@ -42,11 +42,7 @@ class SysmayalBulkImporter:
         """
         
         try:
-            # Read file based on extension
-            if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-                df = pd.read_excel(file_path)
-            else:
-                df = pd.read_csv(file_path)
+            df = read_import_file(file_path)
                 
             # Apply field mapping if provided
             if mapping:
@@ -81,11 +77,7 @@ class SysmayalBulkImporter:
         """
         
         try:
-            # Read file based on extension
-            if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-                df = pd.read_excel(file_path)
-            else:
-                df = pd.read_csv(file_path)
+            df = read_import_file(file_path)
                 
             # Apply field mapping if provided
             if mapping:
@@ -133,7 +125,8 @@ class SysmayalBulkImporter:
                 "total_records": result.get("total", 0),
                 "created": result.get("created", 0),
                 "updated": result.get("updated", 0),
-                "errors": [],
+                "unchanged": result.get("unchanged", 0),
+                "errors": result.get("errors", []),
                 "warnings": []
             }
             
@@ -143,6 +136,8 @@ class SysmayalBulkImporter:
     def _import_organization_row(self, row, row_number):
         """Import a single organization row."""
         
+        import pandas as pd
+        
         # Validate required fields
         if not row.get('organization_name'):
             raise Exception("Organization name is required")
@@ -214,6 +209,8 @@ class SysmayalBulkImporter:
     def _import_contact_row(self, row, row_number):
         """Import a single contact row."""
         
+        import pandas as pd
+        
         # Validate required fields
         if not row.get('first_name'):
             raise Exception("First name is required")
@@ -229,7 +226,7 @@ class SysmayalBulkImporter:
             raise Exception(f"Invalid email address: {row['email_id']}")
             
         # Check if organization exists
-        if not frappe.db.exists("Distribution Organization", row['organization']):
+        if not get_cached_value("Distribution Organization", row['organization']):
             raise Exception(f"Organization '{row['organization']}' does not exist")
             
         # Check for duplicate email in same organization
@@ -295,6 +292,29 @@ class SysmayalBulkImporter:
             "warnings": self.warnings
         }
 
+def read_import_file(file_path):
+    """
+    Read a CSV or Excel import file into a DataFrame.
+    
+    pandas is imported here rather than at module level, so workers that
+    only resolve this module's whitelisted methods do not load pandas and
+    NumPy until a file is actually read.
+    
+    Args:
+        file_path (str): Path to the import file
+        
+    Returns:
+        DataFrame: File contents
+    """
+    
+    import pandas as pd
+    
+    # Read file based on extension
+    if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
+        return pd.read_excel(file_path)
+        
+    return pd.read_csv(file_path)
+
 # Frappe whitelisted functions for API access
 
 @frappe.whitelist()
@@ -453,10 +473,7 @@ def validate_import_data(file_url, doctype_name, mapping=None):
             mapping = json.loads(mapping)
             
         # Read file
-        if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-            df = pd.read_excel(file_path)
-        else:
-            df = pd.read_csv(file_path)
+        df = read_import_file(file_path)
             
         # Apply field mapping if provided
         if mapping:
@@ -485,6 +502,8 @@ def validate_import_data(file_url, doctype_name, mapping=None):
 def _validate_organization_data(df, results):
     """Validate organization import data."""
     
+    import pandas as pd
+    
     required_fields = ["organization_name", "country"]
     
     # Check for missing required fields
@@ -517,6 +536,8 @@ def _validate_organization_data(df, results):
 def _validate_contact_data(df, results):
     """Validate contact import data."""
     
+    import pandas as pd
+    
     required_fields = ["first_name", "email_id", "organization"]
     
     # Check for missing required fields
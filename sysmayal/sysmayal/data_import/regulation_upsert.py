@@ -0,0 +1,158 @@
+"""
+Bulk Upsert for Country Regulation Datasets
+
+This module imports regulation datasets (the aloe vera global regulations
+JSON format) into Country Regulation with one lookup query for all existing
+records, a bulk insert for new countries and single-statement updates of
+only the changed fields, so unchanged countries cost nothing.
+"""
+
+import re
+
+import frappe
+from frappe.utils import add_months, cstr, now_datetime, nowdate
+from sysmayal.sysmayal.utils.change_log import record_changes
+from sysmayal.sysmayal.utils.regulation_registry import clear_regulation_cache
+
+# Fields compared against existing records to decide whether a country changed
+CONTENT_FIELDS = ("regulatory_authority", "authority_website", "aloe_classification", "key_requirements")
+
+def parse_regulation_dataset(regulation_data):
+    """
+    Map a regulation dataset to Country Regulation field values.
+
+    Args:
+        regulation_data (dict): Dataset with a "countries" mapping
+
+    Returns:
+        dict: Field values keyed by country name
+    """
+
+    rows = {}
+
+    for country_code, data in regulation_data.get("countries", {}).items():
+        country_name = data.get("country_name", country_code.replace("_", " ").title())
+
+        row = {
+            "regulatory_authority": data.get("regulatory_authority", ""),
+            "authority_website": data.get("website", "")
+        }
+
+        # Process product classifications, using the first classification
+        classifications = (data.get("product_classifications") or {}).values()
+
+        categories = [c["category"] for c in classifications if "category" in c]
+        if categories:
+            row["aloe_classification"] = categories[0]
+
+        # Process requirements
+        requirements = [r for c in classifications for r in c.get("requirements", [])]
+        if requirements:
+            row["key_requirements"] = "<br>".join(requirements)
+
+        rows[country_name] = row
+
+    return rows
+
+def upsert_regulations(regulation_data, update_existing=True, metadata=None):
+    """
+    Create or update Country Regulation records from a dataset.
+
+    Args:
+        regulation_data (dict): Dataset with a "countries" mapping
+        update_existing (bool): Update changed existing countries, or only create new ones
+        metadata (dict): Extra field values written on every created or updated record
+
+    Returns:
+        dict: Created, updated, unchanged and skipped counts
+    """
+
+    rows = parse_regulation_dataset(regulation_data)
+    metadata = dict(metadata or {}, last_updated=nowdate())
+
+    result = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": []}
+
+    if rows:
+        countries = list(rows)
+
+        existing = {
+            r.name: r for r in frappe.get_all(
+                "Country Regulation",
+                filters={"name": ["in", countries]},
+                fields=["name", *CONTENT_FIELDS]
+            )
+        }
+        valid_countries = set(frappe.get_all("Country", filters={"name": ["in", countries]}, pluck="name"))
+
+        to_create = []
+        updated = {}
+
+        for country_name, row in rows.items():
+            current = existing.get(country_name)
+
+            if not current:
+                if country_name not in valid_countries:
+                    result["skipped"] += 1
+                    result["errors"].append(f"Country '{country_name}' does not exist")
+                    continue
+
+                to_create.append((country_name, row))
+                continue
+
+            changed = {
+                field: value for field, value in row.items()
+                if cstr(current.get(field)) != cstr(value)
+            }
+
+            if not changed or not update_existing:
+                result["unchanged"] += 1
+                continue
+
+            frappe.db.set_value("Country Regulation", country_name, {**changed, **metadata})
+            updated[country_name] = [*changed, *metadata]
+            result["updated"] += 1
+
+        if to_create:
+            _bulk_create(to_create, metadata)
+            result["created"] = len(to_create)
+
+        record_changes("Country Regulation", updated, "Update", source="Regulation Upsert")
+        record_changes(
+            "Country Regulation", {name: None for name, row in to_create}, "Insert", source="Regulation Upsert"
+        )
+
+        if result["created"] or result["updated"]:
+            clear_regulation_cache()
+
+    result["total"] = result["created"] + result["updated"] + result["unchanged"]
+    return result
+
+def _bulk_create(rows, metadata):
+    """Insert new Country Regulation records in one statement."""
+
+    now = now_datetime()
+    user = frappe.session.user
+
+    defaults = {
+        "verification_status": "Pending Verification",
+        "next_review_date": add_months(nowdate(), 12),
+        **metadata
+    }
+
+    fields = ["name", "country_name", "route", *CONTENT_FIELDS, *defaults]
+    values = []
+
+    for country_name, row in rows:
+        values.append((
+            country_name,
+            country_name,
+            re.sub(r"[^a-zA-Z0-9]+", "-", f"regulations-{country_name}").strip("-").lower(),
+            *(row.get(field) for field in CONTENT_FIELDS),
+            *defaults.values()
+        ))
+
+    frappe.db.bulk_insert(
+        "Country Regulation",
+        ["creation", "modified", "owner", "modified_by", "docstatus", "idx", *fields],
+        [(now, now, user, user, 0, 0, *row) for row in values]
+    )
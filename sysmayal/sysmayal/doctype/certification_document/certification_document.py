@@ -9,8 +9,12 @@ import frappe
 import hashlib
 import os
 from frappe.model.document import Document
-from frappe.utils import nowdate, add_days, date_diff, cstr
+from frappe.utils import nowdate, add_days, cint, date_diff, cstr
 from frappe import _
+from sysmayal.sysmayal.notifications.expiry_digest import CERTIFICATE_REMINDER_DAYS, is_digest_enabled
+from sysmayal.sysmayal.utils.expiry_buckets import get_buckets_within
+from sysmayal.sysmayal.utils.concurrent_queries import run_aggregates
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
 class CertificationDocument(Document):
     """
@@ -126,10 +130,14 @@ class CertificationDocument(Document):
                     
     def send_expiry_notifications(self):
         """Send notifications for expiring certificates."""
+        # In digest mode reminders are sent once a day by the scheduler
+        if is_digest_enabled():
+            return
+            
         if self.expiry_date and self.contact_email:
             days_to_expiry = date_diff(self.expiry_date, nowdate())
             
-            if days_to_expiry in [90, 30, 7, 1] and days_to_expiry > 0:
+            if days_to_expiry in CERTIFICATE_REMINDER_DAYS and days_to_expiry > 0:
                 try:
                     frappe.sendmail(
                         recipients=[self.contact_email],
@@ -244,65 +252,76 @@ class CertificationDocument(Document):
 def get_expiring_certificates(days_ahead=90):
     """Get certificates expiring within specified days."""
     
-    expiring_certs = frappe.db.sql("""
+    # Standard windows are served from the indexed expiry window field
+    buckets = get_buckets_within(cint(days_ahead))
+    
+    if buckets:
+        condition = "expiry_bucket IN %(buckets)s"
+    else:
+        condition = "expiry_date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL %(days_ahead)s DAY)"
+    
+    expiring_certs = frappe.db.sql(f"""
         SELECT name, document_title, certificate_number, expiry_date,
                organization, contact_email, status,
                DATEDIFF(expiry_date, CURDATE()) as days_to_expiry
         FROM `tabCertification Document`
-        WHERE expiry_date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL %s DAY)
+        WHERE {condition}
         AND status != 'Expired'
         ORDER BY expiry_date
-    """, (days_ahead,), as_dict=True)
+    """, {"buckets": tuple(buckets or ()), "days_ahead": cint(days_ahead)}, as_dict=True)
     
     return expiring_certs
 
 @frappe.whitelist()
+@read_from_replica
 def get_certificate_dashboard_data():
     """Get dashboard data for certification documents."""
     
-    # Status distribution
-    status_data = frappe.db.sql("""
-        SELECT status, COUNT(*) as count
-        FROM `tabCertification Document`
-        GROUP BY status
-    """, as_dict=True)
-    
-    # Document type distribution
-    type_data = frappe.db.sql("""
-        SELECT document_type, COUNT(*) as count
-        FROM `tabCertification Document`
-        GROUP BY document_type
-        ORDER BY count DESC
-    """, as_dict=True)
-    
-    # Monthly expiry forecast
-    expiry_forecast = frappe.db.sql("""
-        SELECT 
-            DATE_FORMAT(expiry_date, '%Y-%m') as month,
-            COUNT(*) as expiring_count
-        FROM `tabCertification Document`
-        WHERE expiry_date >= CURDATE()
-        AND expiry_date <= DATE_ADD(CURDATE(), INTERVAL 12 MONTH)
-        GROUP BY month
-        ORDER BY month
-    """, as_dict=True)
-    
-    # Cost analysis
-    cost_analysis = frappe.db.sql("""
-        SELECT 
-            SUM(certification_cost) as total_certification_cost,
-            SUM(renewal_cost) as total_renewal_cost,
-            AVG(certification_cost) as avg_certification_cost,
-            COUNT(*) as total_certificates
-        FROM `tabCertification Document`
-        WHERE certification_cost > 0 OR renewal_cost > 0
-    """, as_dict=True)
+    results = run_aggregates({
+        # Status distribution
+        "status_distribution": ("""
+            SELECT status, COUNT(*) as count
+            FROM `tabCertification Document`
+            GROUP BY status
+        """, ()),
+        
+        # Document type distribution
+        "type_distribution": ("""
+            SELECT document_type, COUNT(*) as count
+            FROM `tabCertification Document`
+            GROUP BY document_type
+            ORDER BY count DESC
+        """, ()),
+        
+        # Monthly expiry forecast
+        "expiry_forecast": ("""
+            SELECT 
+                DATE_FORMAT(expiry_date, '%Y-%m') as month,
+                COUNT(*) as expiring_count
+            FROM `tabCertification Document`
+            WHERE expiry_date >= CURDATE()
+            AND expiry_date <= DATE_ADD(CURDATE(), INTERVAL 12 MONTH)
+            GROUP BY month
+            ORDER BY month
+        """, ()),
+        
+        # Cost analysis
+        "cost_analysis": ("""
+            SELECT 
+                SUM(certification_cost) as total_certification_cost,
+                SUM(renewal_cost) as total_renewal_cost,
+                AVG(certification_cost) as avg_certification_cost,
+                COUNT(*) as total_certificates
+            FROM `tabCertification Document`
+            WHERE certification_cost > 0 OR renewal_cost > 0
+        """, ())
+    })
     
     return {
-        "status_distribution": status_data,
-        "type_distribution": type_data,
-        "expiry_forecast": expiry_forecast,
-        "cost_analysis": cost_analysis[0] if cost_analysis else {}
+        "status_distribution": results["status_distribution"],
+        "type_distribution": results["type_distribution"],
+        "expiry_forecast": results["expiry_forecast"],
+        "cost_analysis": results["cost_analysis"][0] if results["cost_analysis"] else {}
     }
 
 @frappe.whitelist()
@@ -333,6 +352,7 @@ def bulk_verify_documents(document_names):
     return results
 
 @frappe.whitelist()
+@read_from_replica
 def generate_certificate_report(filters=None):
     """Generate comprehensive certificate report."""
     
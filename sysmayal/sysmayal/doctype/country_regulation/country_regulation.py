@@ -10,6 +10,9 @@ from frappe.model.document import Document
 from frappe.website.website_generator import WebsiteGenerator
 from frappe.utils import nowdate, add_months, cstr
 from frappe import _
+from sysmayal.sysmayal.utils import regulation_registry
+from sysmayal.sysmayal.utils.text_search import add_fulltext_index
+from sysmayal.sysmayal.data_import.regulation_upsert import upsert_regulations
 
 class CountryRegulation(WebsiteGenerator):
     # Website configuration to fix the AttributeError
@@ -34,6 +37,22 @@ class CountryRegulation(WebsiteGenerator):
         """Called before saving the document."""
         self.update_review_date()
         
+    def on_update(self):
+        """Called after saving the document."""
+        # A changed country also moves the record out of the old country's cache entry
+        if self.has_value_changed("country_name"):
+            regulation_registry.clear_regulation_cache()
+        else:
+            regulation_registry.clear_regulation_cache(self.country_name)
+        
+    def on_trash(self):
+        """Called before deleting the document."""
+        regulation_registry.clear_regulation_cache(self.country_name)
+        
+    def after_rename(self, old, new, merge=False):
+        """Called after renaming the document."""
+        regulation_registry.clear_regulation_cache()
+        
     def validate_country_uniqueness(self):
         """Ensure only one regulation record per country."""
         if self.country_name:
@@ -138,74 +157,33 @@ class CountryRegulation(WebsiteGenerator):
 def get_regulations_by_region(region):
     """Get all country regulations for a specific region."""
     
-    regulations = frappe.get_all(
-        "Country Regulation",
-        filters={"region": region},
-        fields=[
-            "name", "country_name", "regulatory_authority", 
-            "aloe_classification", "verification_status", "last_updated"
-        ],
-        order_by="country_name"
-    )
+    fields = [
+        "name", "country_name", "regulatory_authority", 
+        "aloe_classification", "verification_status", "last_updated"
+    ]
     
-    return regulations
+    return [
+        {field: regulation.get(field) for field in fields}
+        for regulation in regulation_registry.get_regulations_by_region(region)
+    ]
 
 @frappe.whitelist()
 def import_regulation_data(regulation_data):
-    """Import regulation data from external sources."""
+    """
+    Import regulation data from external sources.
+
+    Existing records are diffed against the incoming data in one query and
+    only changed countries are written.
+    """
     
     if isinstance(regulation_data, str):
         regulation_data = frappe.parse_json(regulation_data)
         
-    created_count = 0
-    updated_count = 0
-    
-    for country_code, data in regulation_data.get("countries", {}).items():
-        country_name = data.get("country_name", country_code.replace("_", " ").title())
-        
-        existing = frappe.db.get_value("Country Regulation", {"country_name": country_name}, "name")
-        
-        if existing:
-            # Update existing record
-            reg_doc = frappe.get_doc("Country Regulation", existing)
-            updated_count += 1
-        else:
-            # Create new record
-            reg_doc = frappe.new_doc("Country Regulation")
-            reg_doc.country_name = country_name
-            created_count += 1
-            
-        # Update fields from data
-        reg_doc.regulatory_authority = data.get("regulatory_authority", "")
-        reg_doc.authority_website = data.get("website", "")
-        reg_doc.last_updated = nowdate()
-        reg_doc.data_source = "Import"
-        reg_doc.verification_status = "Pending Verification"
-        
-        # Process product classifications
-        if "product_classifications" in data:
-            classifications = []
-            for product_type, classification in data["product_classifications"].items():
-                if "category" in classification:
-                    classifications.append(classification["category"])
-            
-            if classifications:
-                reg_doc.aloe_classification = classifications[0]  # Use first classification
-                
-        # Process requirements
-        if "product_classifications" in data:
-            requirements = []
-            for product_type, classification in data["product_classifications"].items():
-                if "requirements" in classification:
-                    requirements.extend(classification["requirements"])
-            
-            if requirements:
-                reg_doc.key_requirements = "<br>".join(requirements)
-                
-        reg_doc.save(ignore_permissions=True)
-        
-    return {
-        "created": created_count,
-        "updated": updated_count,
-        "total": created_count + updated_count
-    }
+    return upsert_regulations(regulation_data, metadata={
+        "data_source": "Import",
+        "verification_status": "Pending Verification"
+    })
+
+def on_doctype_update():
+    """Add the FULLTEXT index used by the text search API."""
+    add_fulltext_index("Country Regulation")
@@ -9,6 +9,10 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import validate_email_address, nowdate, now
 from frappe import _
+from sysmayal.sysmayal.integrations.erpnext_sync import queue_sync
+from sysmayal.sysmayal.utils.change_log import record_changes
+from sysmayal.sysmayal.utils.lookup_cache import get_cached_value
+from sysmayal.sysmayal.utils.regulation_registry import get_regulation
 
 class DistributionContact(Document):
     """
@@ -31,12 +35,12 @@ class DistributionContact(Document):
         
     def after_insert(self):
         """Called after inserting a new distribution contact."""
-        self.create_contact_link()
         self.send_welcome_notification()
         
     def on_update(self):
-        """Called after updating the distribution contact."""
-        self.update_linked_contact()
+        """Called after inserting or updating the distribution contact."""
+        # The ERPNext Contact record is synced in the background
+        queue_sync(self)
         
     def validate_email(self):
         """Validate email address format and uniqueness."""
@@ -61,10 +65,10 @@ class DistributionContact(Document):
     def validate_organization(self):
         """Validate organization relationship."""
         if self.organization:
-            org_doc = frappe.get_doc("Distribution Organization", self.organization)
+            org_status = get_cached_value("Distribution Organization", self.organization, "status")
             
             # Check if organization is active
-            if org_doc.status not in ["Active", "Pending"]:
+            if org_status not in ["Active", "Pending"]:
                 frappe.msgprint(
                     _("Warning: The organization {0} is not active").format(self.organization),
                     indicator="orange"
@@ -110,67 +114,10 @@ class DistributionContact(Document):
     def update_organization_country(self):
         """Update contact's country from organization if not set."""
         if self.organization and not self.country:
-            org_country = frappe.db.get_value(
-                "Distribution Organization", 
-                self.organization, 
-                "country"
-            )
+            org_country = get_cached_value("Distribution Organization", self.organization, "country")
             if org_country:
                 self.country = org_country
                 
-    def create_contact_link(self):
-        """Create corresponding Contact record in ERPNext."""
-        try:
-            if not frappe.db.exists("Contact", {"email_id": self.email_id}):
-                contact = frappe.new_doc("Contact")
-                contact.first_name = self.first_name
-                contact.last_name = self.last_name
-                contact.email_id = self.email_id
-                contact.phone = self.phone
-                contact.mobile_no = self.mobile_no
-                contact.designation = self.designation
-                contact.department = self.department
-                
-                # Add organization link
-                if self.organization:
-                    # Check if organization has corresponding Customer/Supplier
-                    org_doc = frappe.get_doc("Distribution Organization", self.organization)
-                    
-                    customer_name = frappe.db.get_value(
-                        "Customer",
-                        {"custom_distribution_organization": self.organization},
-                        "name"
-                    )
-                    
-                    supplier_name = frappe.db.get_value(
-                        "Supplier", 
-                        {"custom_distribution_organization": self.organization},
-                        "name"
-                    )
-                    
-                    if customer_name:
-                        contact.append("links", {
-                            "link_doctype": "Customer",
-                            "link_name": customer_name
-                        })
-                        
-                    if supplier_name:
-                        contact.append("links", {
-                            "link_doctype": "Supplier", 
-                            "link_name": supplier_name
-                        })
-                
-                contact.save(ignore_permissions=True)
-                
-                # Link back to distribution contact
-                contact.db_set("custom_distribution_contact", self.name)
-                
-        except Exception as e:
-            frappe.log_error(
-                message=f"Error creating Contact link: {str(e)}",
-                title="Distribution Contact Link Creation Error"
-            )
-            
     def send_welcome_notification(self):
         """Send welcome notification to the contact."""
         if self.email_id and self.status == "Active":
@@ -189,6 +136,7 @@ class DistributionContact(Document):
                 
                 # Update last contacted
                 self.db_set("last_contacted", now())
+                record_changes(self.doctype, {self.name: ["last_contacted"]}, "Update", source="Welcome Email")
                 
             except Exception as e:
                 frappe.log_error(
@@ -196,39 +144,20 @@ class DistributionContact(Document):
                     title="Welcome Email Error"
                 )
                 
-    def update_linked_contact(self):
-        """Update linked Contact record with current information."""
-        try:
-            contact_name = frappe.db.get_value(
-                "Contact",
-                {"custom_distribution_contact": self.name},
-                "name"
-            )
-            
-            if contact_name:
-                contact = frappe.get_doc("Contact", contact_name)
-                contact.first_name = self.first_name
-                contact.last_name = self.last_name
-                contact.phone = self.phone
-                contact.mobile_no = self.mobile_no
-                contact.designation = self.designation
-                contact.department = self.department
-                contact.save(ignore_permissions=True)
-                
-        except Exception as e:
-            frappe.log_error(
-                message=f"Error updating linked Contact: {str(e)}",
-                title="Contact Update Error"
-            )
-            
     @frappe.whitelist()
     def get_organization_details(self):
         """Get details about the contact's organization."""
         if not self.organization:
             return {}
             
-        org_doc = frappe.get_doc("Distribution Organization", self.organization)
+        org_doc = get_cached_value("Distribution Organization", self.organization, [
+            "organization_name", "organization_type", "country", "territory", "status",
+            "regulatory_status", "website", "contact_person", "email_id"
+        ])
         
+        if not org_doc:
+            return {}
+            
         return {
             "organization_name": org_doc.organization_name,
             "organization_type": org_doc.organization_type,
@@ -261,6 +190,7 @@ class DistributionContact(Document):
     def update_last_contacted(self):
         """Update the last contacted timestamp."""
         self.db_set("last_contacted", now())
+        record_changes(self.doctype, {self.name: ["last_contacted"]}, "Update", source="Update Last Contacted")
         return _("Last contacted timestamp updated")
         
     @frappe.whitelist()
@@ -268,19 +198,13 @@ class DistributionContact(Document):
         """Get regulatory requirements relevant to this contact's role and country."""
         requirements = []
         
-        if self.country:
-            country_regs = frappe.get_all(
-                "Country Regulation",
-                filters={"country_name": self.country},
-                fields=["name", "regulatory_authority", "key_requirements"]
-            )
-            
-            for reg in country_regs:
-                requirements.append({
-                    "source": "Country Regulation",
-                    "authority": reg.regulatory_authority,
-                    "requirements": reg.key_requirements or "Not specified"
-                })
+        regulation = get_regulation(self.country)
+        if regulation:
+            requirements.append({
+                "source": "Country Regulation",
+                "authority": regulation.regulatory_authority,
+                "requirements": regulation.requirements or "Not specified"
+            })
                 
         # Add role-specific requirements
         if self.regulatory_role:
@@ -381,21 +305,22 @@ def bulk_update_contact_status(contact_names, new_status):
     if isinstance(contact_names, str):
         contact_names = frappe.parse_json(contact_names)
         
-    updated_count = 0
+    updated = {}
     
     for contact_name in contact_names:
         try:
             frappe.db.set_value("Distribution Contact", contact_name, "status", new_status)
-            updated_count += 1
+            updated[contact_name] = ["status"]
         except Exception as e:
             frappe.log_error(
                 message=f"Error updating contact {contact_name}: {str(e)}",
                 title="Bulk Contact Update Error"
             )
             
+    record_changes("Distribution Contact", updated, "Update", source="Bulk Contact Status Update")
     frappe.db.commit()
     
-    return _("{0} contacts updated successfully").format(updated_count)
+    return _("{0} contacts updated successfully").format(len(updated))
 
 @frappe.whitelist()
 def export_contacts_for_organization(organization):
@@ -404,7 +329,10 @@ def export_contacts_for_organization(organization):
     contacts = frappe.get_all(
         "Distribution Contact",
         filters={"organization": organization},
-        fields="*"
+        fields=[
+            "full_name", "email_id", "phone", "mobile_no", "designation",
+            "department", "regulatory_role", "status", "country", "last_contacted"
+        ]
     )
     
     # Format data for export
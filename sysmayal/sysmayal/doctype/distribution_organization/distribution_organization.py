@@ -7,8 +7,12 @@ including validation, business rules, and integration with other modules.
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import validate_email_address, nowdate, add_days
+from frappe.utils import validate_email_address, nowdate, add_days, cint
 from frappe import _
+from sysmayal.sysmayal.integrations.erpnext_sync import queue_sync
+from sysmayal.sysmayal.utils.compliance_rollup import ROLLUP_FIELDS
+from sysmayal.sysmayal.utils.lookup_cache import get_cached_value
+from sysmayal.sysmayal.utils.regulation_registry import get_regulation
 
 class DistributionOrganization(Document):
     """
@@ -31,12 +35,12 @@ class DistributionOrganization(Document):
         
     def after_insert(self):
         """Called after inserting a new distribution organization."""
-        self.create_customer_supplier_links()
         self.send_welcome_notification()
         
     def on_update(self):
-        """Called after updating the distribution organization."""
-        self.update_linked_records()
+        """Called after inserting or updating the distribution organization."""
+        # Customer/Supplier records are synced in the background
+        queue_sync(self)
         
     def validate_email(self):
         """Validate email address format."""
@@ -51,8 +55,8 @@ class DistributionOrganization(Document):
                 frappe.throw(_("Organization cannot be its own parent"))
                 
             # Check for circular reference
-            parent_doc = frappe.get_doc("Distribution Organization", self.parent_organization)
-            if parent_doc.parent_organization == self.name:
+            grandparent = get_cached_value("Distribution Organization", self.parent_organization, "parent_organization")
+            if grandparent == self.name:
                 frappe.throw(_("Circular parent-child relationship not allowed"))
                 
     def validate_agreement_dates(self):
@@ -71,9 +75,10 @@ class DistributionOrganization(Document):
             
         if self.country and not self.currency:
             # Try to get default currency for the country
-            country_doc = frappe.get_doc("Country", self.country)
-            if hasattr(country_doc, 'default_currency') and country_doc.default_currency:
-                self.currency = country_doc.default_currency
+            if frappe.get_meta("Country").has_field("default_currency"):
+                default_currency = get_cached_value("Country", self.country, "default_currency")
+                if default_currency:
+                    self.currency = default_currency
                 
     def update_compliance_status(self):
         """Update compliance status based on certifications and audit dates."""
@@ -82,40 +87,6 @@ class DistributionOrganization(Document):
                 if self.regulatory_status in ["Compliant", "Pending Review"]:
                     self.regulatory_status = "Expired"
                     
-    def create_customer_supplier_links(self):
-        """Create corresponding Customer and/or Supplier records."""
-        try:
-            # Create Customer record for distributors and retailers
-            if self.organization_type in ["Distributor", "Retailer", "Wholesaler"]:
-                if not frappe.db.exists("Customer", self.organization_name):
-                    customer = frappe.new_doc("Customer")
-                    customer.customer_name = self.organization_name
-                    customer.customer_type = "Company"
-                    customer.customer_group = "Commercial"  # Default group
-                    customer.territory = self.territory or "All Territories"
-                    customer.save(ignore_permissions=True)
-                    
-                    # Link back to distribution organization
-                    customer.db_set("custom_distribution_organization", self.name)
-                    
-            # Create Supplier record for suppliers and manufacturers
-            if self.organization_type in ["Supplier", "Manufacturer"]:
-                if not frappe.db.exists("Supplier", self.organization_name):
-                    supplier = frappe.new_doc("Supplier")
-                    supplier.supplier_name = self.organization_name
-                    supplier.supplier_type = "Company"
-                    supplier.supplier_group = "Raw Material"  # Default group
-                    supplier.save(ignore_permissions=True)
-                    
-                    # Link back to distribution organization
-                    supplier.db_set("custom_distribution_organization", self.name)
-                    
-        except Exception as e:
-            frappe.log_error(
-                message=f"Error creating Customer/Supplier links: {str(e)}",
-                title="Distribution Organization Link Creation Error"
-            )
-            
     def send_welcome_notification(self):
         """Send welcome notification to the organization contact."""
         if self.email_id and self.contact_person:
@@ -137,50 +108,20 @@ class DistributionOrganization(Document):
                     title="Welcome Email Error"
                 )
                 
-    def update_linked_records(self):
-        """Update linked Customer and Supplier records with current information."""
-        try:
-            # Update Customer record
-            customer_name = frappe.db.get_value(
-                "Customer", 
-                {"custom_distribution_organization": self.name}, 
-                "name"
-            )
-            if customer_name:
-                customer = frappe.get_doc("Customer", customer_name)
-                customer.territory = self.territory or "All Territories"
-                customer.save(ignore_permissions=True)
-                
-            # Update Supplier record
-            supplier_name = frappe.db.get_value(
-                "Supplier",
-                {"custom_distribution_organization": self.name},
-                "name"
-            )
-            if supplier_name:
-                supplier = frappe.get_doc("Supplier", supplier_name)
-                # Update supplier information as needed
-                supplier.save(ignore_permissions=True)
-                
-        except Exception as e:
-            frappe.log_error(
-                message=f"Error updating linked records: {str(e)}",
-                title="Linked Records Update Error"
-            )
-            
     @frappe.whitelist()
     def get_country_regulations(self):
         """Get regulatory requirements for the organization's country."""
-        if not self.country:
+        regulation = get_regulation(self.country)
+        if not regulation:
             return []
             
-        regulations = frappe.get_all(
-            "Country Regulation",
-            filters={"country_name": self.country},
-            fields=["name", "regulatory_authority", "authority_website", "key_requirements"]
-        )
-        
-        return regulations
+        return [{
+            "name": regulation.name,
+            "regulatory_authority": regulation.regulatory_authority,
+            "authority_website": regulation.authority_website,
+            "key_requirements": regulation.key_requirements,
+            "requirements": regulation.requirements
+        }]
         
     @frappe.whitelist() 
     def get_compliance_checklist(self):
@@ -219,6 +160,22 @@ class DistributionOrganization(Document):
             "details": f"Expiry: {self.agreement_expiry or 'Not specified'}"
         })
         
+        # Group compliance from the stored subsidiary totals
+        if cint(self.group_organizations) > 1:
+            subsidiaries = cint(self.group_organizations) - 1
+            
+            checklist.append({
+                "item": "Group Product Compliance",
+                "status": "Non-Compliant" if cint(self.group_non_compliant_products) else "Compliant",
+                "details": f"{cint(self.group_non_compliant_products)} non-compliant products across this organization and {subsidiaries} subsidiaries"
+            })
+            
+            checklist.append({
+                "item": "Group Certifications",
+                "status": "Expiring Soon" if cint(self.group_expiring_certificates) else "Valid",
+                "details": f"{cint(self.group_expiring_certificates)} certificates expiring within 90 days across this organization and {subsidiaries} subsidiaries"
+            })
+        
         return checklist
         
     def get_dashboard_data(self):
@@ -251,7 +208,7 @@ def get_organization_hierarchy(organization_name):
         children = frappe.get_all(
             "Distribution Organization",
             filters={"parent_organization": parent},
-            fields=["name", "organization_name", "organization_type", "status"]
+            fields=["name", "organization_name", "organization_type", "status", *ROLLUP_FIELDS]
         )
         
         for child in children:
@@ -266,6 +223,7 @@ def get_organization_hierarchy(organization_name):
         "organization_name": organization.organization_name,
         "organization_type": organization.organization_type,
         "status": organization.status,
+        **{field: organization.get(field) for field in ROLLUP_FIELDS},
         "children": get_children(organization.name)
     }
     
@@ -10,6 +10,9 @@ from frappe.model.document import Document
 from frappe.website.website_generator import WebsiteGenerator
 from frappe.utils import nowdate, add_months, date_diff, cstr
 from frappe import _
+from sysmayal.sysmayal.utils.regulation_registry import get_regulation
+from sysmayal.sysmayal.utils.concurrent_queries import run_aggregates
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
 class MarketEntryPlan(WebsiteGenerator):
     # Website configuration to fix the AttributeError
@@ -99,9 +102,14 @@ class MarketEntryPlan(WebsiteGenerator):
         """Get comprehensive market analysis summary."""
         
         # Get country regulation information
-        country_info = frappe.get_value("Country Regulation", self.target_country, 
-                                      ["regulatory_authority", "key_requirements", 
-                                       "typical_timeline", "aloe_classification"], as_dict=True)
+        regulation = get_regulation(self.target_country)
+        country_info = frappe._dict({
+            "regulatory_authority": regulation.regulatory_authority,
+            "key_requirements": regulation.key_requirements,
+            "requirements": regulation.requirements,
+            "typical_timeline": regulation.typical_timeline,
+            "aloe_classification": regulation.aloe_classification
+        }) if regulation else None
         
         # Calculate financial ratios
         financial_summary = self._calculate_financial_metrics()
@@ -326,59 +334,63 @@ class MarketEntryPlan(WebsiteGenerator):
 # Utility functions
 
 @frappe.whitelist()
+@read_from_replica
 def get_market_entry_dashboard():
     """Get dashboard data for market entry plans."""
     
-    # Status distribution
-    status_data = frappe.db.sql("""
-        SELECT status, COUNT(*) as count
-        FROM `tabMarket Entry Plan`
-        GROUP BY status
-    """, as_dict=True)
-    
-    # Country analysis
-    country_data = frappe.db.sql("""
-        SELECT target_country, COUNT(*) as plans,
-               AVG(completion_percentage) as avg_completion,
-               SUM(initial_investment) as total_investment
-        FROM `tabMarket Entry Plan`
-        GROUP BY target_country
-        ORDER BY plans DESC
-    """, as_dict=True)
-    
-    # Financial summary
-    financial_data = frappe.db.sql("""
-        SELECT 
-            SUM(initial_investment) as total_investment,
-            SUM(year_1_revenue) as projected_y1_revenue,
-            SUM(year_3_revenue) as projected_y3_revenue,
-            AVG(completion_percentage) as avg_completion
-        FROM `tabMarket Entry Plan`
-        WHERE status NOT IN ('Cancelled', 'On Hold')
-    """, as_dict=True)
-    
-    # Timeline analysis
-    timeline_data = frappe.db.sql("""
-        SELECT 
-            CASE 
-                WHEN target_launch_date < CURDATE() THEN 'Overdue'
-                WHEN target_launch_date < DATE_ADD(CURDATE(), INTERVAL 90 DAY) THEN 'Due Soon'
-                ELSE 'Future'
-            END as timeline_status,
-            COUNT(*) as count
-        FROM `tabMarket Entry Plan`
-        WHERE status NOT IN ('Completed', 'Cancelled')
-        GROUP BY timeline_status
-    """, as_dict=True)
+    results = run_aggregates({
+        # Status distribution
+        "status_distribution": ("""
+            SELECT status, COUNT(*) as count
+            FROM `tabMarket Entry Plan`
+            GROUP BY status
+        """, ()),
+        
+        # Country analysis
+        "country_analysis": ("""
+            SELECT target_country, COUNT(*) as plans,
+                   AVG(completion_percentage) as avg_completion,
+                   SUM(initial_investment) as total_investment
+            FROM `tabMarket Entry Plan`
+            GROUP BY target_country
+            ORDER BY plans DESC
+        """, ()),
+        
+        # Financial summary
+        "financial_summary": ("""
+            SELECT 
+                SUM(initial_investment) as total_investment,
+                SUM(year_1_revenue) as projected_y1_revenue,
+                SUM(year_3_revenue) as projected_y3_revenue,
+                AVG(completion_percentage) as avg_completion
+            FROM `tabMarket Entry Plan`
+            WHERE status NOT IN ('Cancelled', 'On Hold')
+        """, ()),
+        
+        # Timeline analysis
+        "timeline_analysis": ("""
+            SELECT 
+                CASE 
+                    WHEN target_launch_date < CURDATE() THEN 'Overdue'
+                    WHEN target_launch_date < DATE_ADD(CURDATE(), INTERVAL 90 DAY) THEN 'Due Soon'
+                    ELSE 'Future'
+                END as timeline_status,
+                COUNT(*) as count
+            FROM `tabMarket Entry Plan`
+            WHERE status NOT IN ('Completed', 'Cancelled')
+            GROUP BY timeline_status
+        """, ())
+    })
     
     return {
-        "status_distribution": status_data,
-        "country_analysis": country_data,
-        "financial_summary": financial_data[0] if financial_data else {},
-        "timeline_analysis": timeline_data
+        "status_distribution": results["status_distribution"],
+        "country_analysis": results["country_analysis"],
+        "financial_summary": results["financial_summary"][0] if results["financial_summary"] else {},
+        "timeline_analysis": results["timeline_analysis"]
     }
 
 @frappe.whitelist()
+@read_from_replica
 def get_market_opportunities():
     """Identify potential market opportunities."""
     
@@ -394,6 +406,7 @@ def get_market_opportunities():
     return opportunities
 
 @frappe.whitelist()
+@read_from_replica
 def generate_market_entry_report(filters=None):
     """Generate comprehensive market entry report."""
     
@@ -7,8 +7,12 @@ including competitive analysis, market trends, and customer insights.
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import nowdate, add_days
+from frappe.utils import nowdate, add_days, cint, cstr, get_fullname, now_datetime
 from frappe import _
+from frappe.query_builder import Order
+from frappe.query_builder.functions import Count
+from sysmayal.sysmayal.utils.text_search import add_fulltext_index
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
 class MarketResearch(Document):
     """Market Research document class for managing market intelligence data."""
@@ -18,6 +22,7 @@ class MarketResearch(Document):
         self.validate_research_dates()
         self.validate_completion_percentage()
         self.set_default_values()
+        self.update_competitor_index()
         
     def validate_research_dates(self):
         """Validate research date is not in the future."""
@@ -42,6 +47,25 @@ class MarketResearch(Document):
         if not self.priority:
             self.priority = "Medium"
             
+    def update_competitor_index(self):
+        """Keep the competitor index rows in step with the main competitors."""
+        
+        # Only completed studies count towards competitor mentions
+        competitors = parse_competitors(self.main_competitors) if self.research_status == "Completed" else []
+        
+        rows = [{
+            "competitor": competitor,
+            "country": self.country,
+            "region": self.region,
+            "product_category": self.product_category
+        } for competitor in competitors]
+        
+        current = [{field: row.get(field) for field in ("competitor", "country", "region", "product_category")}
+                   for row in self.competitor_index]
+        
+        if current != rows:
+            self.set("competitor_index", rows)
+            
     def on_update(self):
         """Actions to perform when document is updated."""
         self.update_related_projects()
@@ -49,24 +73,15 @@ class MarketResearch(Document):
     def update_related_projects(self):
         """Update related R&D projects with market research insights."""
         if self.research_status == "Completed" and self.strategic_recommendations:
-            # Find related projects by country and product category
-            related_projects = frappe.get_all(
-                "Product Development Project",
-                filters={
-                    "target_countries": ["like", f"%{self.country}%"],
-                    "product_category": self.product_category,
-                    "status": ["in", ["Planning", "In Progress"]]
-                },
-                fields=["name", "project_name"]
+            # Comment on related projects in the background, once per research record
+            frappe.enqueue(
+                "sysmayal.sysmayal.doctype.market_research.market_research.add_insight_comments",
+                queue="long",
+                job_id=f"market_research_insights::{self.name}",
+                deduplicate=True,
+                enqueue_after_commit=True,
+                research=self.name
             )
-            
-            # Add a comment to related projects about the research findings
-            for project in related_projects:
-                frappe.get_doc("Product Development Project", project.name).add_comment(
-                    "Comment",
-                    f"Market Research insights available: {self.research_title}. "
-                    f"Key findings: {self.key_findings[:200]}..."
-                )
 
     @frappe.whitelist()
     def get_competitive_analysis_summary(self):
@@ -127,6 +142,89 @@ class MarketResearch(Document):
         }
         return report_data
 
+def add_insight_comments(research):
+    """
+    Comment on R&D projects related to a completed market research record.
+    
+    Related projects share the research country and product category.
+    Projects that already have a comment linked to this research are
+    skipped, so re-saving the research does not duplicate comments, and
+    the remaining comments are written in one bulk insert.
+    
+    Args:
+        research (str): Market Research name
+        
+    Returns:
+        int: Number of comments added
+    """
+    
+    research = frappe.db.get_value(
+        "Market Research",
+        research,
+        ["name", "research_title", "key_findings", "country", "product_category"],
+        as_dict=True
+    )
+    
+    if not research:
+        return 0
+        
+    related_projects = frappe.get_all(
+        "Product Development Project",
+        filters=[
+            ["Project Target Country", "country", "=", research.country],
+            ["product_category", "=", research.product_category],
+            ["status", "in", ["Planning", "In Progress"]]
+        ],
+        distinct=True,
+        pluck="name"
+    )
+    
+    if not related_projects:
+        return 0
+        
+    commented = set(frappe.get_all(
+        "Comment",
+        filters={
+            "comment_type": "Comment",
+            "reference_doctype": "Product Development Project",
+            "reference_name": ["in", related_projects],
+            "link_doctype": "Market Research",
+            "link_name": research.name
+        },
+        pluck="reference_name"
+    ))
+    
+    content = (
+        f"Market Research insights available: {research.research_title}. "
+        f"Key findings: {cstr(research.key_findings)[:200]}..."
+    )
+    
+    now = now_datetime()
+    user = frappe.session.user
+    full_name = get_fullname(user)
+    
+    comments = [
+        (
+            frappe.generate_hash(length=10), now, now, user, user, 0,
+            "Comment", "Product Development Project", project,
+            "Market Research", research.name, content, user, full_name
+        )
+        for project in related_projects
+        if project not in commented
+    ]
+    
+    if comments:
+        frappe.db.bulk_insert(
+            "Comment",
+            ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+             "comment_type", "reference_doctype", "reference_name",
+             "link_doctype", "link_name", "content", "comment_email", "comment_by"],
+            comments
+        )
+        
+    return len(comments)
+
+@read_from_replica
 def get_research_dashboard_data():
     """Get dashboard data for market research overview."""
     
@@ -176,35 +274,31 @@ def get_research_dashboard_data():
     }
 
 @frappe.whitelist()
+@read_from_replica
 def get_market_intelligence_by_country(country):
     """Get market intelligence summary for a specific country."""
     
-    research_data = frappe.get_all(
-        "Market Research",
-        filters={"country": country, "research_status": "Completed"},
-        fields=["*"]
+    research_data = iter_completed_research(
+        ["product_category", "growth_opportunities", "regulatory_challenges", "market_trends"],
+        country=country
     )
     
-    if not research_data:
-        return {"message": f"No market research data available for {country}"}
-    
     # Aggregate insights
     insights = {
         "country": country,
-        "total_research_studies": len(research_data),
+        "total_research_studies": 0,
         "market_segments": set(),
-        "key_competitors": set(),
+        "key_competitors": [],
         "growth_opportunities": [],
         "regulatory_challenges": [],
         "market_trends": []
     }
     
     for research in research_data:
+        insights["total_research_studies"] += 1
+        
         if research.product_category:
             insights["market_segments"].add(research.product_category)
-        if research.main_competitors:
-            competitors = research.main_competitors.split(",")
-            insights["key_competitors"].update([c.strip() for c in competitors])
         if research.growth_opportunities:
             insights["growth_opportunities"].append(research.growth_opportunities)
         if research.regulatory_challenges:
@@ -212,34 +306,30 @@ def get_market_intelligence_by_country(country):
         if research.market_trends:
             insights["market_trends"].append(research.market_trends)
     
+    if not insights["total_research_studies"]:
+        return {"message": f"No market research data available for {country}"}
+    
     # Convert sets to lists for JSON serialization
     insights["market_segments"] = list(insights["market_segments"])
-    insights["key_competitors"] = list(insights["key_competitors"])
+    insights["key_competitors"] = [c.competitor for c in get_competitor_counts(country=country)]
     
     return insights
 
 @frappe.whitelist()
+@read_from_replica
 def generate_competitive_landscape_report(product_category=None, region=None):
     """Generate competitive landscape report across multiple research studies."""
     
-    filters = {"research_status": "Completed"}
-    if product_category:
-        filters["product_category"] = product_category
-    if region:
-        filters["region"] = region
-    
-    research_studies = frappe.get_all(
-        "Market Research",
-        filters=filters,
-        fields=["*"]
+    research_studies = iter_completed_research(
+        ["country", "competitive_threats", "growth_opportunities",
+         "strengths", "weaknesses", "opportunities", "threats"],
+        product_category=product_category,
+        region=region
     )
     
-    if not research_studies:
-        return {"message": "No completed research studies found for the specified criteria"}
-    
     # Aggregate competitive data
     competitive_data = {
-        "total_studies": len(research_studies),
+        "total_studies": 0,
         "markets_analyzed": set(),
         "all_competitors": {},
         "competitive_threats": [],
@@ -253,15 +343,10 @@ def generate_competitive_landscape_report(product_category=None, region=None):
     }
     
     for study in research_studies:
+        competitive_data["total_studies"] += 1
+        
         if study.country:
             competitive_data["markets_analyzed"].add(study.country)
-            
-        # Aggregate competitor mentions
-        if study.main_competitors:
-            competitors = [c.strip() for c in study.main_competitors.split(",")]
-            for competitor in competitors:
-                if competitor:
-                    competitive_data["all_competitors"][competitor] = competitive_data["all_competitors"].get(competitor, 0) + 1
         
         # Collect threats and opportunities
         if study.competitive_threats:
@@ -286,12 +371,106 @@ def generate_competitive_landscape_report(product_category=None, region=None):
         if study.threats:
             competitive_data["swot_summary"]["threats"].append(study.threats)
     
-    # Convert sets to lists and sort competitors by frequency
+    if not competitive_data["total_studies"]:
+        return {"message": "No completed research studies found for the specified criteria"}
+    
+    # Convert sets to lists and add competitor mentions by frequency
     competitive_data["markets_analyzed"] = list(competitive_data["markets_analyzed"])
-    competitive_data["top_competitors"] = sorted(
-        competitive_data["all_competitors"].items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:10]
+    competitive_data["all_competitors"] = {
+        c.competitor: c.mentions
+        for c in get_competitor_counts(product_category=product_category, region=region)
+    }
+    competitive_data["top_competitors"] = list(competitive_data["all_competitors"].items())[:10]
     
     return competitive_data
+
+def iter_completed_research(fields, **filters):
+    """
+    Stream completed market research studies over an unbuffered cursor.
+    
+    Only the requested columns are selected and rows are fetched one at a
+    time, so aggregations over thousands of studies stay small in memory.
+    No other query may run on the connection while the rows are consumed.
+    
+    Args:
+        fields (list): Market Research columns to select
+        filters: Column equality filters, ignored when the value is empty
+        
+    Returns:
+        generator: Rows as frappe._dict
+    """
+    
+    research = frappe.qb.DocType("Market Research")
+    query = frappe.qb.from_(research).select(*fields).where(research.research_status == "Completed")
+    
+    for fieldname, value in filters.items():
+        if value:
+            query = query.where(research[fieldname] == value)
+            
+    with frappe.db.unbuffered_cursor():
+        yield from query.run(as_dict=True, as_iterator=True)
+
+def parse_competitors(text):
+    """
+    Split a comma separated competitor list into distinct names.
+    
+    Args:
+        text (str): Main competitors text
+        
+    Returns:
+        list: Competitor names in order of first mention, de-duplicated case-insensitively
+    """
+    
+    competitors = {}
+    for competitor in (text or "").split(","):
+        competitor = competitor.strip()
+        if competitor:
+            competitors.setdefault(competitor.lower(), competitor)
+            
+    return list(competitors.values())
+
+def get_competitor_counts(product_category=None, region=None, country=None, limit=None):
+    """
+    Count completed studies mentioning each competitor from the competitor index.
+    
+    Args:
+        product_category (str): Only count studies in this category
+        region (str): Only count studies in this region
+        country (str): Only count studies in this country
+        limit (int): Maximum number of competitors returned
+        
+    Returns:
+        list: Rows with competitor and mentions, most mentioned first
+    """
+    
+    competitor = frappe.qb.DocType("Market Research Competitor")
+    mentions = Count(competitor.parent).as_("mentions")
+    
+    query = (
+        frappe.qb.from_(competitor)
+        .select(competitor.competitor, mentions)
+        .where(competitor.parenttype == "Market Research")
+        .groupby(competitor.competitor)
+        .orderby(mentions, order=Order.desc)
+        .orderby(competitor.competitor)
+    )
+    
+    for fieldname, value in (("product_category", product_category), ("region", region), ("country", country)):
+        if value:
+            query = query.where(competitor[fieldname] == value)
+            
+    if limit:
+        query = query.limit(cint(limit))
+        
+    return query.run(as_dict=True)
+
+@frappe.whitelist()
+@read_from_replica
+def get_top_competitors(product_category=None, region=None, country=None, limit=10):
+    """Get the most mentioned competitors across completed research studies."""
+    
+    return get_competitor_counts(product_category=product_category, region=region, country=country, limit=limit)
+
+def on_doctype_update():
+    """Add the FULLTEXT index used by the text search API."""
+    add_fulltext_index("Market Research")
@@ -0,0 +1,5 @@
+"""
+Market Research Competitor DocType module initialization.
+"""
+
+pass
@@ -0,0 +1,25 @@
+"""
+Market Research Competitor DocType Controller
+
+Child table of Market Research indexing the competitors named by each
+completed study together with the study's country, region and product
+category, so competitor mention counts are indexed aggregates.
+"""
+
+import frappe
+from frappe.model.document import Document
+
+class MarketResearchCompetitor(Document):
+    """
+    Market Research Competitor child table controller.
+    
+    Rows are maintained by MarketResearch.update_competitor_index.
+    """
+    
+    pass
+
+def on_doctype_update():
+    """Add composite indexes for per-category, per-region and per-country counts."""
+    frappe.db.add_index("Market Research Competitor", ["product_category", "competitor"])
+    frappe.db.add_index("Market Research Competitor", ["region", "competitor"])
+    frappe.db.add_index("Market Research Competitor", ["country", "competitor"])
@@ -10,6 +10,10 @@ from frappe.model.document import Document
 from frappe.website.website_generator import WebsiteGenerator
 from frappe.utils import nowdate, add_months, date_diff, cstr
 from frappe import _
+from sysmayal.sysmayal.utils.regulation_registry import get_regulation
+from sysmayal.sysmayal.utils.expiry_buckets import get_buckets_within
+from sysmayal.sysmayal.utils.concurrent_queries import run_aggregates
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
 class ProductCompliance(WebsiteGenerator):
     # Website configuration to fix the AttributeError
@@ -167,11 +171,11 @@ class ProductCompliance(WebsiteGenerator):
             summary["days_to_expiry"] = date_diff(self.expiry_date, nowdate())
             
         # Get country-specific requirements
-        country_reqs = frappe.get_value("Country Regulation", self.country, 
-                                      ["regulatory_authority", "key_requirements"], as_dict=True)
+        country_reqs = get_regulation(self.country)
         if country_reqs:
             summary["regulatory_authority"] = country_reqs.regulatory_authority
             summary["key_requirements"] = country_reqs.key_requirements
+            summary["requirements"] = country_reqs.requirements
             
         return summary
         
@@ -273,44 +277,47 @@ class ProductCompliance(WebsiteGenerator):
 # Utility functions
 
 @frappe.whitelist()
+@read_from_replica
 def get_compliance_dashboard_data():
     """Get dashboard data for product compliance."""
     
-    # Compliance status distribution
-    status_data = frappe.db.sql("""
-        SELECT compliance_status, COUNT(*) as count
-        FROM `tabProduct Compliance`
-        GROUP BY compliance_status
-    """, as_dict=True)
-    
-    # Risk level distribution
-    risk_data = frappe.db.sql("""
-        SELECT risk_level, COUNT(*) as count
-        FROM `tabProduct Compliance`
-        GROUP BY risk_level
-    """, as_dict=True)
-    
-    # Country-wise compliance
-    country_data = frappe.db.sql("""
-        SELECT country, compliance_status, COUNT(*) as count
-        FROM `tabProduct Compliance`
-        GROUP BY country, compliance_status
-    """, as_dict=True)
-    
-    # Products expiring soon (within 90 days)
-    expiring_soon = frappe.db.sql("""
-        SELECT product_name, country, expiry_date,
-               DATEDIFF(expiry_date, CURDATE()) as days_to_expiry
-        FROM `tabProduct Compliance`
-        WHERE expiry_date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 90 DAY)
-        ORDER BY expiry_date
-    """, as_dict=True)
+    results = run_aggregates({
+        # Compliance status distribution
+        "status_distribution": ("""
+            SELECT compliance_status, COUNT(*) as count
+            FROM `tabProduct Compliance`
+            GROUP BY compliance_status
+        """, ()),
+        
+        # Risk level distribution
+        "risk_distribution": ("""
+            SELECT risk_level, COUNT(*) as count
+            FROM `tabProduct Compliance`
+            GROUP BY risk_level
+        """, ()),
+        
+        # Country-wise compliance
+        "country_compliance": ("""
+            SELECT country, compliance_status, COUNT(*) as count
+            FROM `tabProduct Compliance`
+            GROUP BY country, compliance_status
+        """, ()),
+        
+        # Products expiring soon (within 90 days)
+        "expiring_products": ("""
+            SELECT product_name, country, expiry_date,
+                   DATEDIFF(expiry_date, CURDATE()) as days_to_expiry
+            FROM `tabProduct Compliance`
+            WHERE expiry_bucket IN %(buckets)s
+            ORDER BY expiry_date
+        """, {"buckets": tuple(get_buckets_within(90))})
+    })
     
     return {
-        "status_distribution": status_data,
-        "risk_distribution": risk_data,
-        "country_compliance": country_data,
-        "expiring_products": expiring_soon
+        "status_distribution": results["status_distribution"],
+        "risk_distribution": results["risk_distribution"],
+        "country_compliance": results["country_compliance"],
+        "expiring_products": results["expiring_products"]
     }
 
 @frappe.whitelist()
@@ -349,6 +356,7 @@ def bulk_update_compliance_status(product_names, new_status, notes=None):
     return _("{0} products updated successfully").format(updated_count)
 
 @frappe.whitelist()
+@read_from_replica
 def generate_compliance_report(country=None, status=None, risk_level=None):
     """Generate compliance report with filters."""
     
@@ -5,10 +5,13 @@ This module contains the server-side logic for managing R&D projects
 for aloe vera product development and regulatory compliance.
 """
 
+import re
+
 import frappe
 from frappe.model.document import Document
 from frappe.utils import nowdate, date_diff
 from frappe import _
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
 class ProductDevelopmentProject(Document):
     """
@@ -22,6 +25,7 @@ class ProductDevelopmentProject(Document):
         """Validate the project before saving."""
         self.validate_dates()
         self.set_defaults()
+        self.update_target_country_list()
         
     def before_save(self):
         """Called before saving the document."""
@@ -44,6 +48,13 @@ class ProductDevelopmentProject(Document):
         if not self.compliance_status:
             self.compliance_status = "Not Started"
             
+    def update_target_country_list(self):
+        """Keep the indexed target country rows in step with the free-text fields."""
+        countries = get_target_countries(self.target_countries, self.target_markets)
+        
+        if [row.country for row in self.target_country_list] != countries:
+            self.set("target_country_list", [{"country": country} for country in countries])
+            
     def update_last_update_date(self):
         """Update the last update date."""
         self.last_update_date = nowdate()
@@ -78,12 +89,45 @@ class ProductDevelopmentProject(Document):
             "estimated_investment": self.estimated_investment,
             "current_phase": self.current_phase,
             "compliance_status": self.compliance_status,
-            "target_countries_count": len(self.target_countries.split(',')) if self.target_countries else 0
+            "target_countries_count": len(self.target_country_list)
         }
 
 # Utility functions
 
+def get_target_countries(*texts, country_names=None):
+    """
+    Get the countries named in free-text target country or market fields.
+    
+    Entries are matched exactly (case-insensitively) against Country names,
+    so "Niger" does not match "Nigeria" and regions such as "Europe" are ignored.
+    
+    Args:
+        texts (str): Comma, semicolon or newline separated lists
+        country_names (dict): Country names keyed by lower case name, loaded when not given
+        
+    Returns:
+        list: Country names in order of first mention
+    """
+    
+    entries = [e.strip() for text in texts if text for e in re.split(r"[,;\n]", text) if e.strip()]
+    if not entries:
+        return []
+        
+    if country_names is None:
+        country_names = {
+            c.lower(): c for c in frappe.get_all("Country", filters={"name": ["in", entries]}, pluck="name")
+        }
+        
+    countries = []
+    for entry in entries:
+        country = country_names.get(entry.lower())
+        if country and country not in countries:
+            countries.append(country)
+            
+    return countries
+
 @frappe.whitelist()
+@read_from_replica
 def get_project_dashboard_data():
     """Get dashboard data for R&D projects."""
     
@@ -0,0 +1,5 @@
+"""
+Project Target Country DocType module initialization.
+"""
+
+pass
@@ -0,0 +1,19 @@
+"""
+Project Target Country DocType Controller
+
+Child table of Product Development Project holding one row per country
+named in the project's target countries or target markets, so projects
+can be looked up by country with an indexed equality join.
+"""
+
+import frappe
+from frappe.model.document import Document
+
+class ProjectTargetCountry(Document):
+    """
+    Project Target Country child table controller.
+    
+    Rows are maintained by ProductDevelopmentProject.update_target_country_list.
+    """
+    
+    pass
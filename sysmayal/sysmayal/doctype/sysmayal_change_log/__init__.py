@@ -0,0 +1,5 @@
+"""
+Sysmayal Change Log DocType module initialization.
+"""
+
+pass
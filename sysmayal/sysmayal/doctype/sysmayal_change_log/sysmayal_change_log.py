@@ -0,0 +1,25 @@
+"""
+Sysmayal Change Log DocType Controller
+
+Append-only log of inserts, updates, deletes and renames of Sysmayal
+records. The autoincrement name is the sequence number consumers page by.
+"""
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+
+class SysmayalChangeLog(Document):
+    """
+    Sysmayal Change Log DocType controller.
+    
+    Entries are written by sysmayal.sysmayal.utils.change_log and read
+    with its get_changes cursor API.
+    """
+    
+    @staticmethod
+    def clear_old_logs(days=30):
+        """Delete entries older than the given number of days."""
+        table = frappe.qb.DocType("Sysmayal Change Log")
+        frappe.db.delete(table, filters=(table.creation < (Now() - Interval(days=days))))
@@ -0,0 +1,5 @@
+"""
+Sysmayal Change Log Cursor DocType module initialization.
+"""
+
+pass
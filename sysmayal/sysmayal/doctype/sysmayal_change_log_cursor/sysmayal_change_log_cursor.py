@@ -0,0 +1,17 @@
+"""
+Sysmayal Change Log Cursor DocType Controller
+
+Position of each named change log consumer, saved with
+set_consumer_cursor in sysmayal.sysmayal.utils.change_log.
+"""
+
+from frappe.model.document import Document
+
+class SysmayalChangeLogCursor(Document):
+    """
+    Sysmayal Change Log Cursor DocType controller.
+    
+    One row per consumer; rows are written directly, not through the form.
+    """
+    
+    pass
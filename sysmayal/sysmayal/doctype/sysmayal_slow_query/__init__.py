@@ -0,0 +1,5 @@
+"""
+Sysmayal Slow Query DocType module initialization.
+"""
+
+pass
@@ -0,0 +1,25 @@
+"""
+Sysmayal Slow Query DocType Controller
+
+Captured Sysmayal-issued queries that exceeded the slow query threshold,
+with a sampled EXPLAIN plan and the request filters that produced them.
+"""
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+
+class SysmayalSlowQuery(Document):
+    """
+    Sysmayal Slow Query DocType controller.
+    
+    Records are written by sysmayal.sysmayal.utils.slow_queries and
+    summarised by the Slow Query Report.
+    """
+    
+    @staticmethod
+    def clear_old_logs(days=14):
+        """Delete captures older than the given number of days."""
+        table = frappe.qb.DocType("Sysmayal Slow Query")
+        frappe.db.delete(table, filters=(table.creation < (Now() - Interval(days=days))))
@@ -0,0 +1,5 @@
+"""
+Sysmayal Sync Event DocType module initialization.
+"""
+
+pass
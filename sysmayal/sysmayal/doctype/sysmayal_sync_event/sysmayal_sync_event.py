@@ -0,0 +1,29 @@
+"""
+Sysmayal Sync Event DocType Controller
+
+Outbox records marking Distribution Organizations and Distribution Contacts
+whose ERPNext Customer, Supplier or Contact records need to be synchronised
+by the background sync worker.
+"""
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+
+class SysmayalSyncEvent(Document):
+    """
+    Sysmayal Sync Event DocType controller.
+    
+    Events are written on save and consumed in batches by
+    sysmayal.sysmayal.integrations.erpnext_sync.process_sync_events.
+    """
+    
+    @staticmethod
+    def clear_old_logs(days=30):
+        """Delete processed events older than the given number of days."""
+        table = frappe.qb.DocType("Sysmayal Sync Event")
+        frappe.db.delete(
+            table,
+            filters=(table.modified < (Now() - Interval(days=days))) & (table.status == "Synced")
+        )
@@ -0,0 +1,13 @@
+"""
+Sysmayal Integrations Module
+
+This module provides synchronisation between Sysmayal DocTypes and
+other applications:
+- ERPNext Customer and Supplier records for Distribution Organizations
+- ERPNext Contact records for Distribution Contacts
+- Batched background processing of pending sync events
+- Per-user iCalendar feeds of certificate and compliance dates
+- Incremental Parquet exports for offline BI
+"""
+
+pass
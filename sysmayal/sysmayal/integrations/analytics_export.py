@@ -0,0 +1,382 @@
+"""
+Analytics Export
+
+This module writes incremental Parquet snapshots of the main Sysmayal
+doctypes to the site's private files, so BI tools can build trend charts
+from columnar files instead of querying the live report endpoints.
+
+The first run exports every row of each doctype in (modified, name)
+order. Later runs export the records the Sysmayal Change Log lists as
+changed since the previous run; the log holds back entries of
+transactions still open, so rows committed late are not skipped the way
+a modified watermark would skip them. Files are laid out as Hive
+partitions by country and creation month, with the country field stored
+in the folder name rather than in the files:
+
+    private/analytics_export/<doctype>/<country field>=<country>/month=<YYYY-MM>/part-<run>-<id>.parquet
+
+A record changed after its first export is written again in a later part
+file; readers keep the row with the latest "modified" per "name".
+Deletions are not exported, and a renamed record is written under its
+new name only. Expiry windows and group totals are left out, as they are
+recomputed without changing "modified" and would go stale in the files;
+readers derive them from the exported dates and links.
+
+Enable with the "sysmayal_analytics_export" site config key. Requires
+pyarrow.
+"""
+
+import json
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import get_datetime, now_datetime
+from sysmayal.sysmayal.utils.change_log import MAX_PAGE_LENGTH, get_settled_sequence, read_changes
+from sysmayal.sysmayal.utils.compliance_rollup import ORGANIZATION_DOCTYPE, ROLLUP_FIELDS
+from sysmayal.sysmayal.utils.expiry_buckets import BUCKET_FIELDS
+
+# Exported doctypes and the field they are partitioned by country on
+EXPORT_DOCTYPES = {
+    "Distribution Organization": "country",
+    "Distribution Contact": "country",
+    "Product Compliance": "country",
+    "Certification Document": "country",
+    "Market Entry Plan": "target_country",
+    "Product Development Project": None
+}
+
+EXPORT_FOLDER = "analytics_export"
+STATE_FILE = "_export_state.json"
+CHUNK_SIZE = 50000
+
+EXPORT_JOB_ID = "sysmayal_analytics_export"
+
+# Partition value for rows without a country, as understood by Hive readers
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Internal columns left out of the export
+SKIPPED_COLUMNS = {"_user_tags", "_comments", "_assign", "_liked_by", "_seen"}
+
+STANDARD_COLUMN_TYPES = {
+    "name": "string",
+    "owner": "string",
+    "modified_by": "string",
+    "creation": "timestamp",
+    "modified": "timestamp",
+    "docstatus": "int",
+    "idx": "int"
+}
+
+FIELDTYPE_COLUMN_TYPES = {
+    "Int": "int",
+    "Check": "int",
+    "Float": "float",
+    "Currency": "float",
+    "Percent": "float",
+    "Rating": "float",
+    "Date": "date",
+    "Datetime": "timestamp"
+}
+
+def is_enabled():
+    """Check whether the scheduled analytics export runs on this site."""
+    return bool(frappe.conf.get("sysmayal_analytics_export"))
+
+def run_scheduled_export():
+    """Queue an export of changed rows (scheduled hourly)."""
+
+    if is_enabled():
+        enqueue_export()
+
+@frappe.whitelist()
+def run_export_now():
+    """Queue an export of changed rows right away."""
+
+    frappe.only_for("System Manager")
+    enqueue_export()
+
+    return _("Analytics export queued")
+
+def enqueue_export():
+    """
+    Queue export_all unless an export is already queued or running.
+
+    Scheduled and manual runs share one job id, so two runs never work on
+    the export state at the same time.
+    """
+
+    frappe.enqueue(
+        "sysmayal.sysmayal.integrations.analytics_export.export_all",
+        queue="long",
+        job_id=EXPORT_JOB_ID,
+        deduplicate=True
+    )
+
+def export_all():
+    """
+    Export the rows changed since the last run for every exported doctype.
+
+    Returns:
+        dict: Number of rows exported per doctype
+    """
+
+    state = get_export_state()
+
+    if "cursor" not in state:
+        # Changes logged after this point are exported from the change log
+        state = {"cursor": get_settled_sequence(), "exported": {}}
+        save_export_state(state)
+
+    run_id = now_datetime().strftime("%Y%m%d%H%M%S")
+    exported = {doctype: 0 for doctype in EXPORT_DOCTYPES}
+
+    for doctype in EXPORT_DOCTYPES:
+        if state["exported"].get(doctype) is not True:
+            exported[doctype] += export_doctype(doctype, state, run_id)
+
+    for doctype, count in export_changes(state, run_id).items():
+        exported[doctype] += count
+
+    return exported
+
+def export_doctype(doctype, state, run_id):
+    """
+    Export every row of a doctype on its first run.
+
+    A (modified, name) watermark is saved after every chunk, so an
+    interrupted run resumes where it stopped.
+
+    Args:
+        doctype (str): One of EXPORT_DOCTYPES
+        state (dict): Export state, updated and saved as chunks are written
+        run_id (str): Run identifier used in the part file names
+
+    Returns:
+        int: Number of rows exported
+    """
+
+    columns = get_export_columns(doctype)
+    exported = 0
+
+    while True:
+        watermark = state["exported"].get(doctype) or {}
+        rows = _read_rows_after(doctype, list(columns), watermark)
+        if not rows:
+            break
+
+        write_rows(doctype, columns, rows, run_id)
+
+        exported += len(rows)
+        state["exported"][doctype] = {"modified": str(rows[-1].modified), "name": rows[-1].name}
+        save_export_state(state)
+
+    state["exported"][doctype] = True
+    save_export_state(state)
+
+    return exported
+
+def export_changes(state, run_id):
+    """
+    Export the records listed in the change log since the saved cursor.
+
+    Changes that only touch expiry windows or group totals are skipped,
+    as those columns are not exported. The cursor is saved after every
+    page of changes.
+
+    Args:
+        state (dict): Export state, updated and saved as pages are written
+        run_id (str): Run identifier used in the part file names
+
+    Returns:
+        dict: Number of rows exported per doctype
+    """
+
+    exported = {}
+
+    while True:
+        page = read_changes(state["cursor"], list(EXPORT_DOCTYPES), MAX_PAGE_LENGTH)
+        if page["cursor"] == state["cursor"]:
+            break
+
+        changed = {}
+        for change in page["changes"]:
+            if change.event == "Delete":
+                continue
+
+            if change.changed_fields and set(change.changed_fields) <= get_derived_columns(change.reference_doctype):
+                continue
+
+            changed.setdefault(change.reference_doctype, set()).add(change.reference_name)
+
+        for doctype, names in changed.items():
+            columns = get_export_columns(doctype)
+            rows = frappe.get_all(doctype, filters={"name": ["in", list(names)]}, fields=list(columns))
+
+            if rows:
+                write_rows(doctype, columns, rows, run_id)
+                exported[doctype] = exported.get(doctype, 0) + len(rows)
+
+        state["cursor"] = page["cursor"]
+        save_export_state(state)
+
+    return exported
+
+def write_rows(doctype, columns, rows, run_id):
+    """Write rows to one part file per partition folder."""
+
+    pa, pq = _import_pyarrow()
+
+    # Partition columns live in the folder names
+    country_field = EXPORT_DOCTYPES[doctype]
+    file_columns = {column: column_type for column, column_type in columns.items() if column != country_field}
+    schema = pa.schema([
+        (column, _get_arrow_type(pa, column_type)) for column, column_type in file_columns.items()
+    ])
+
+    for partition, partition_rows in _partition_rows(rows, country_field).items():
+        folder = os.path.join(get_export_path(), frappe.scrub(doctype), *partition)
+        os.makedirs(folder, exist_ok=True)
+
+        table = pa.Table.from_pylist(
+            [_to_arrow_row(row, file_columns) for row in partition_rows], schema=schema
+        )
+        pq.write_table(table, os.path.join(folder, f"part-{run_id}-{frappe.generate_hash(length=10)}.parquet"))
+
+def get_export_columns(doctype):
+    """
+    Get the exported columns of a doctype with their column types.
+
+    Returns:
+        dict: Column names mapped to "string", "int", "float", "date" or "timestamp"
+    """
+
+    meta = frappe.get_meta(doctype)
+    columns = dict(STANDARD_COLUMN_TYPES)
+
+    skipped = SKIPPED_COLUMNS | get_derived_columns(doctype)
+
+    for column in frappe.db.get_table_columns(doctype):
+        if column in columns or column in skipped:
+            continue
+
+        field = meta.get_field(column)
+        columns[column] = FIELDTYPE_COLUMN_TYPES.get(field.fieldtype, "string") if field else "string"
+
+    return columns
+
+def get_derived_columns(doctype):
+    """Columns recomputed in bulk without changing modified, left out of the export."""
+
+    derived = set(BUCKET_FIELDS.get(doctype, {}))
+    if doctype == ORGANIZATION_DOCTYPE:
+        derived.update(ROLLUP_FIELDS)
+
+    return derived
+
+def get_export_path():
+    """Root folder of the export in the site's private files."""
+    return frappe.get_site_path("private", EXPORT_FOLDER)
+
+def get_export_state():
+    """Load the change log cursor and first-run watermarks of previous runs."""
+
+    path = os.path.join(get_export_path(), STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as f:
+        return json.load(f)
+
+def save_export_state(state):
+    """Save the export state, replacing the state file atomically."""
+
+    path = os.path.join(get_export_path(), STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(state, f, indent=1)
+
+    os.replace(f"{path}.tmp", path)
+
+def _read_rows_after(doctype, columns, watermark):
+    """Read the next chunk of rows after the watermark, in (modified, name) order."""
+
+    table = frappe.qb.DocType(doctype)
+    query = (
+        frappe.qb.from_(table)
+        .select(*[table[column] for column in columns])
+        .orderby(table.modified)
+        .orderby(table.name)
+        .limit(CHUNK_SIZE)
+    )
+
+    if watermark:
+        modified = get_datetime(watermark["modified"])
+        query = query.where(
+            (table.modified > modified)
+            | ((table.modified == modified) & (table.name > watermark["name"]))
+        )
+
+    return query.run(as_dict=True)
+
+def _partition_rows(rows, country_field):
+    """Group rows by their country and creation month partition folders."""
+
+    partitions = {}
+
+    for row in rows:
+        partition = ["month={0}".format(get_datetime(row.creation).strftime("%Y-%m"))]
+        if country_field:
+            country = _partition_value(row.get(country_field) or NULL_PARTITION)
+            partition.insert(0, f"{country_field}={country}")
+
+        partitions.setdefault(tuple(partition), []).append(row)
+
+    return partitions
+
+def _partition_value(value):
+    """Make a value safe for use in a partition folder name."""
+    return str(value).replace("/", "_").replace("=", "_")
+
+def _to_arrow_row(row, columns):
+    """Convert database values to the Python types of their Arrow columns."""
+
+    converted = {}
+
+    for column, column_type in columns.items():
+        value = row.get(column)
+
+        if column_type == "string":
+            value = value if value is None or isinstance(value, str) else str(value)
+        elif value is None or value == "":
+            value = None
+        elif column_type == "float":
+            value = float(value)
+        elif column_type == "int":
+            value = int(value)
+
+        converted[column] = value
+
+    return converted
+
+def _get_arrow_type(pa, column_type):
+    """Map an export column type to its Arrow type."""
+
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us")
+    }.get(column_type, pa.string())
+
+def _import_pyarrow():
+    """Import pyarrow only when an export runs."""
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        frappe.throw(_("pyarrow is required for the analytics export. Install it with: bench pip install pyarrow"))
+
+    return pa, pq
@@ -0,0 +1,328 @@
+"""
+Calendar Feed
+
+This module publishes certificate expiries, certificate renewal dues,
+compliance reviews and product expiries as a per-user iCalendar (ICS)
+feed that calendar applications can subscribe to.
+
+The calendar events of each document are rendered once and cached in
+Redis; when a Certification Document or Product Compliance record
+changes only that document is re-rendered. Each user's assembled feed
+is cached with an ETag and the feed version it was built from, so a
+poll that finds nothing changed is answered 304 Not Modified from two
+cache reads. The version is bumped when a feed document or a
+permission changes, and each day as the feed's date window moves.
+
+Feeds cover events from FEED_PAST_DAYS ago to FEED_FUTURE_DAYS ahead.
+"""
+
+import datetime
+import hashlib
+from zoneinfo import ZoneInfo
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, get_datetime, get_system_timezone, get_url, get_url_to_form, getdate, nowdate
+from werkzeug.wrappers import Response
+from sysmayal.sysmayal.utils.upcoming_events import EVENT_SOURCES
+
+FEED_DOCTYPES = ("Certification Document", "Product Compliance")
+
+# (event type, doctype, date field, title field) for the events in the feed
+FEED_SOURCES = [source for source in EVENT_SOURCES if source[1] in FEED_DOCTYPES]
+
+# Days of past and future events included in a feed
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 365
+
+EVENTS_CACHE_KEY = "sysmayal:calendar_feed_events"
+VERSION_CACHE_KEY = "sysmayal:calendar_feed_version"
+FEED_CACHE_KEY = "sysmayal:calendar_feed"
+FEED_CACHE_TTL = 86400
+
+# Feed tokens mapped to users, loaded from the users' defaults on first use
+TOKENS_CACHE_KEY = "sysmayal:calendar_feed_tokens"
+TOKENS_LOADED_CACHE_KEY = "sysmayal:calendar_feed_tokens_loaded"
+
+TOKEN_DEFAULT_KEY = "sysmayal_calendar_feed_token"
+
+@frappe.whitelist()
+def get_feed_url(regenerate=False):
+    """
+    Get the subscription URL of the current user's calendar feed.
+
+    Args:
+        regenerate (bool): Issue a new token, invalidating the old URL
+
+    Returns:
+        str: Feed URL including the user's private token
+    """
+
+    if frappe.session.user == "Guest":
+        frappe.throw(_("Log in to subscribe to the calendar feed"), frappe.PermissionError)
+
+    token = frappe.defaults.get_user_default(TOKEN_DEFAULT_KEY)
+    if not token or frappe.utils.cint(regenerate):
+        if token:
+            frappe.cache().hdel(TOKENS_CACHE_KEY, token)
+
+        token = frappe.generate_hash(length=32)
+        frappe.defaults.set_user_default(TOKEN_DEFAULT_KEY, token)
+
+    frappe.cache().hset(TOKENS_CACHE_KEY, token, frappe.session.user)
+
+    return get_url(f"/api/method/sysmayal.sysmayal.integrations.calendar_feed.download_feed?token={token}")
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def download_feed(token=None):
+    """
+    Serve a user's calendar feed, honouring If-None-Match.
+
+    Args:
+        token (str): Feed token from get_feed_url
+    """
+
+    user = get_token_user(token)
+    if not user:
+        return Response(status=403)
+
+    feed = get_user_feed(user)
+    headers = {"ETag": feed["etag"], "Cache-Control": "private, must-revalidate"}
+
+    if feed["etag"] in (frappe.get_request_header("If-None-Match") or ""):
+        return Response(status=304, headers=headers)
+
+    headers["Content-Disposition"] = 'inline; filename="sysmayal.ics"'
+    return Response(feed["content"], mimetype="text/calendar", headers=headers)
+
+def get_token_user(token):
+    """
+    Get the user a feed token belongs to.
+
+    Tokens are looked up in a Redis map; the map is loaded from the users'
+    defaults in one query when it is missing, so unknown tokens never
+    scan the defaults table.
+
+    Returns:
+        str: User, or None for an unknown token
+    """
+
+    if not token:
+        return None
+
+    cache = frappe.cache()
+
+    if not cache.get_value(TOKENS_LOADED_CACHE_KEY):
+        for default in frappe.get_all(
+            "DefaultValue",
+            filters={"defkey": TOKEN_DEFAULT_KEY},
+            fields=["parent", "defvalue"]
+        ):
+            cache.hset(TOKENS_CACHE_KEY, default.defvalue, default.parent)
+
+        cache.set_value(TOKENS_LOADED_CACHE_KEY, 1)
+
+    return cache.hget(TOKENS_CACHE_KEY, token)
+
+def get_user_feed(user):
+    """
+    Get a user's feed, assembling it again only if the feed version changed.
+
+    Args:
+        user (str): User the feed is built for
+
+    Returns:
+        dict: Feed "content", "etag" and the "version" it was built from
+    """
+
+    cache = frappe.cache()
+    version = get_feed_version()
+    feed = cache.get_value(f"{FEED_CACHE_KEY}:{user}")
+
+    if feed and feed["version"] == version:
+        return feed
+
+    content = render_feed(user)
+    feed = {
+        "version": version,
+        "etag": '"{0}"'.format(hashlib.sha1(content.encode()).hexdigest()),
+        "content": content
+    }
+    cache.set_value(f"{FEED_CACHE_KEY}:{user}", feed, expires_in_sec=FEED_CACHE_TTL)
+
+    return feed
+
+def get_feed_version():
+    """Current feed version; it changes with feed data, permissions and the date."""
+
+    version = frappe.cache().get_value(VERSION_CACHE_KEY)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(VERSION_CACHE_KEY, version)
+
+    return f"{nowdate()}:{version}"
+
+def bump_feed_version():
+    """Make every user's cached feed stale."""
+    frappe.cache().set_value(VERSION_CACHE_KEY, frappe.generate_hash(length=10))
+
+def render_feed(user):
+    """Assemble the ICS calendar from the cached events of documents the user can read."""
+
+    from_date = getdate(add_days(nowdate(), -FEED_PAST_DAYS))
+    to_date = getdate(add_days(nowdate(), FEED_FUTURE_DAYS))
+    events = []
+
+    for doctype in FEED_DOCTYPES:
+        date_fields = {source[2] for source in FEED_SOURCES if source[1] == doctype}
+        names = frappe.get_list(
+            doctype,
+            user=user,
+            or_filters={field: ["between", [from_date, to_date]] for field in date_fields},
+            pluck="name",
+            order_by="name",
+            limit_page_length=0
+        )
+
+        document_events = get_document_events(doctype, names)
+        for name in names:
+            events.extend(
+                rendered for date, rendered in document_events[name]
+                if from_date <= getdate(date) <= to_date
+            )
+
+    return "\r\n".join([
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Sysmayal//Compliance Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Sysmayal Compliance",
+        *events,
+        "END:VCALENDAR",
+        ""
+    ])
+
+def get_document_events(doctype, names):
+    """
+    Get the rendered VEVENT blocks of documents, rendering cache misses.
+
+    Args:
+        doctype (str): Certification Document or Product Compliance
+        names (list): Document names
+
+    Returns:
+        dict: Lists of (date, rendered event) keyed by document name
+    """
+
+    cache_key = f"{EVENTS_CACHE_KEY}:{doctype}"
+
+    # Hash keys come back from Redis as bytes
+    cached = {
+        key.decode() if isinstance(key, bytes) else key: rendered
+        for key, rendered in (frappe.cache().hgetall(cache_key) or {}).items()
+    }
+
+    events = {name: cached.get(name) for name in names}
+    missing = [name for name, rendered in events.items() if rendered is None]
+
+    if missing:
+        for name, rendered in _render_documents(doctype, missing).items():
+            frappe.cache().hset(cache_key, name, rendered)
+            events[name] = rendered
+
+    return events
+
+def update_feed_events(doc, method=None, *args, **kwargs):
+    """
+    Re-render a changed document's events after the transaction commits.
+
+    Called from doc_events on update, trash and rename of
+    Certification Document and Product Compliance.
+    """
+
+    doctype, name = doc.doctype, doc.name
+
+    def refresh():
+        cache_key = f"{EVENTS_CACHE_KEY}:{doctype}"
+
+        if method == "after_rename":
+            frappe.cache().delete_value(cache_key)
+        elif method == "on_trash":
+            frappe.cache().hdel(cache_key, name)
+        else:
+            frappe.cache().hset(cache_key, name, _render_documents(doctype, [name]).get(name, []))
+
+        # Users' feeds are reassembled from the cached events on their next poll
+        bump_feed_version()
+
+    frappe.db.after_commit.add(refresh)
+
+def clear_feed_cache(doc=None, method=None, *args, **kwargs):
+    """
+    Make feeds stale after a permission change.
+
+    Called from doc_events of User Permission, DocShare, User (for role
+    changes) and Custom DocPerm, which change which documents users can read.
+    """
+
+    frappe.db.after_commit.add(bump_feed_version)
+
+def _render_documents(doctype, names):
+    """Render the VEVENT blocks of documents loaded in one query."""
+
+    sources = [source for source in FEED_SOURCES if source[1] == doctype]
+    fields = {"name", "modified"} | {source[2] for source in sources} | {source[3] for source in sources}
+
+    documents = frappe.get_all(doctype, filters={"name": ["in", names]}, fields=list(fields))
+
+    rendered = {name: [] for name in names}
+    for document in documents:
+        rendered[document.name] = [
+            (
+                str(getdate(document.get(date_field))),
+                _render_event(event_type, doctype, document, date_field, title_field)
+            )
+            for event_type, _doctype, date_field, title_field in sources
+            if document.get(date_field)
+        ]
+
+    return rendered
+
+def _render_event(event_type, doctype, document, date_field, title_field):
+    """Render one all-day VEVENT."""
+
+    date = getdate(document.get(date_field))
+    uid = "{0}-{1}-{2}@{3}".format(
+        frappe.scrub(doctype), document.name, date_field, frappe.local.site
+    )
+
+    return "\r\n".join([
+        "BEGIN:VEVENT",
+        f"UID:{_escape(uid)}",
+        "DTSTAMP:{0}".format(_to_utc(document.modified).strftime("%Y%m%dT%H%M%SZ")),
+        "DTSTART;VALUE=DATE:{0}".format(date.strftime("%Y%m%d")),
+        "DTEND;VALUE=DATE:{0}".format(getdate(add_days(date, 1)).strftime("%Y%m%d")),
+        "SUMMARY:{0}".format(_escape(f"{event_type}: {document.get(title_field) or document.name}")),
+        "URL:{0}".format(get_url_to_form(doctype, document.name)),
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT"
+    ])
+
+def _to_utc(value):
+    """Convert a datetime stored in the system time zone to UTC."""
+
+    value = get_datetime(value).replace(tzinfo=ZoneInfo(get_system_timezone()))
+    return value.astimezone(datetime.timezone.utc)
+
+def _escape(text):
+    """Escape a TEXT value for iCalendar."""
+
+    return (
+        str(text)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
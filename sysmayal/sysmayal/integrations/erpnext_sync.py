@@ -0,0 +1,320 @@
+"""
+ERPNext Sync Worker
+
+This module keeps ERPNext Customer, Supplier and Contact records in sync
+with Distribution Organizations and Distribution Contacts outside of the
+save path. Saves record a "needs sync" event in the Sysmayal Sync Event
+outbox and a background worker applies pending events in batches, so ten
+edits to one organization result in a single Customer update.
+"""
+
+import frappe
+from frappe.utils import now_datetime
+
+SYNC_EVENT_DOCTYPE = "Sysmayal Sync Event"
+
+CUSTOMER_ORGANIZATION_TYPES = ("Distributor", "Retailer", "Wholesaler")
+SUPPLIER_ORGANIZATION_TYPES = ("Supplier", "Manufacturer")
+
+CONTACT_SYNC_FIELDS = ("first_name", "last_name", "phone", "mobile_no", "designation", "department")
+
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 5
+
+def queue_sync(doc):
+    """
+    Record that a document needs to be synced to ERPNext.
+
+    A pending event is only written once per document; further saves
+    before the worker runs are absorbed by the existing event by raising
+    its revision, so a worker that read the document before the save
+    committed leaves the event pending instead of marking it synced.
+
+    Args:
+        doc (Document): Distribution Organization or Distribution Contact
+    """
+
+    pending = frappe.db.exists(SYNC_EVENT_DOCTYPE, {
+        "reference_doctype": doc.doctype,
+        "reference_name": doc.name,
+        "status": "Pending"
+    })
+
+    if pending:
+        # Pending again in case a worker marked it synced since the check
+        frappe.db.sql("""
+            UPDATE `tabSysmayal Sync Event`
+            SET revision = revision + 1, status = 'Pending', modified = %(now)s
+            WHERE name = %(name)s
+        """, {"now": now_datetime(), "name": pending})
+
+    else:
+        frappe.get_doc({
+            "doctype": SYNC_EVENT_DOCTYPE,
+            "reference_doctype": doc.doctype,
+            "reference_name": doc.name,
+            "status": "Pending"
+        }).insert(ignore_permissions=True)
+
+    # Enqueue the worker once per request, after the events are committed
+    if not frappe.flags.sysmayal_sync_enqueued:
+        frappe.flags.sysmayal_sync_enqueued = True
+        frappe.enqueue(
+            "sysmayal.sysmayal.integrations.erpnext_sync.process_sync_events",
+            queue="long",
+            job_id="sysmayal_erpnext_sync",
+            deduplicate=True,
+            enqueue_after_commit=True
+        )
+
+def process_sync_events(batch_size=BATCH_SIZE):
+    """
+    Apply all pending sync events in batches.
+
+    Called from the background queue after saves and from the scheduler
+    as a safety net for events whose job was not enqueued.
+
+    Args:
+        batch_size (int): Number of events processed per transaction
+
+    Returns:
+        int: Number of events processed
+    """
+
+    processed = 0
+    last_event = 0
+
+    while True:
+        events = frappe.get_all(
+            SYNC_EVENT_DOCTYPE,
+            filters={"status": "Pending", "name": [">", last_event]},
+            fields=["name", "reference_doctype", "reference_name", "attempts", "revision"],
+            order_by="name asc",
+            limit=batch_size
+        )
+
+        if not events:
+            break
+
+        _process_batch(events)
+        frappe.db.commit()
+
+        processed += len(events)
+        last_event = events[-1].name
+
+    return processed
+
+def _process_batch(events):
+    """Sync the distinct documents referenced by a batch of events."""
+
+    organizations = list({e.reference_name for e in events if e.reference_doctype == "Distribution Organization"})
+    contacts = list({e.reference_name for e in events if e.reference_doctype == "Distribution Contact"})
+
+    # Organizations first so newly created Customers/Suppliers can be linked to contacts
+    errors = {}
+    errors.update(sync_organizations(organizations))
+    errors.update(sync_contacts(contacts))
+
+    _mark_events(events, errors)
+
+def sync_organizations(organization_names):
+    """
+    Create or update ERPNext Customer and Supplier records for organizations.
+
+    Args:
+        organization_names (list): Distribution Organization names
+
+    Returns:
+        dict: Errors keyed by (doctype, name)
+    """
+
+    if not organization_names:
+        return {}
+
+    organizations = frappe.get_all(
+        "Distribution Organization",
+        filters={"name": ["in", organization_names]},
+        fields=["name", "organization_name", "organization_type", "territory"]
+    )
+
+    linked_customers = _get_linked_records("Customer", "custom_distribution_organization", organization_names, ["territory"])
+    linked_suppliers = _get_linked_records("Supplier", "custom_distribution_organization", organization_names)
+
+    # Customer and Supplier names already taken by records not linked to an organization
+    display_names = [org.organization_name for org in organizations]
+    existing_customers = set(frappe.get_all("Customer", filters={"name": ["in", display_names]}, pluck="name"))
+    existing_suppliers = set(frappe.get_all("Supplier", filters={"name": ["in", display_names]}, pluck="name"))
+
+    errors = {}
+
+    for org in organizations:
+        frappe.db.savepoint("sysmayal_sync")
+        try:
+            customer = linked_customers.get(org.name)
+            territory = org.territory or "All Territories"
+
+            if customer:
+                if customer.territory != territory:
+                    customer_doc = frappe.get_doc("Customer", customer.name)
+                    customer_doc.territory = territory
+                    customer_doc.save(ignore_permissions=True)
+
+            elif org.organization_type in CUSTOMER_ORGANIZATION_TYPES and org.organization_name not in existing_customers:
+                customer_doc = frappe.new_doc("Customer")
+                customer_doc.customer_name = org.organization_name
+                customer_doc.customer_type = "Company"
+                customer_doc.customer_group = "Commercial"  # Default group
+                customer_doc.territory = territory
+                customer_doc.save(ignore_permissions=True)
+
+                # Link back to distribution organization
+                customer_doc.db_set("custom_distribution_organization", org.name)
+
+            if (not linked_suppliers.get(org.name)
+                and org.organization_type in SUPPLIER_ORGANIZATION_TYPES
+                and org.organization_name not in existing_suppliers):
+                supplier_doc = frappe.new_doc("Supplier")
+                supplier_doc.supplier_name = org.organization_name
+                supplier_doc.supplier_type = "Company"
+                supplier_doc.supplier_group = "Raw Material"  # Default group
+                supplier_doc.save(ignore_permissions=True)
+
+                # Link back to distribution organization
+                supplier_doc.db_set("custom_distribution_organization", org.name)
+
+        except Exception as e:
+            frappe.db.rollback(save_point="sysmayal_sync")
+            errors[("Distribution Organization", org.name)] = str(e)
+            frappe.log_error(
+                message=f"Error syncing Customer/Supplier for {org.name}: {str(e)}",
+                title="Distribution Organization Sync Error"
+            )
+
+    return errors
+
+def sync_contacts(contact_names):
+    """
+    Create or update ERPNext Contact records for distribution contacts.
+
+    Args:
+        contact_names (list): Distribution Contact names
+
+    Returns:
+        dict: Errors keyed by (doctype, name)
+    """
+
+    if not contact_names:
+        return {}
+
+    contacts = frappe.get_all(
+        "Distribution Contact",
+        filters={"name": ["in", contact_names]},
+        fields=["name", "email_id", "organization", *CONTACT_SYNC_FIELDS]
+    )
+
+    linked_contacts = _get_linked_records("Contact", "custom_distribution_contact", contact_names, CONTACT_SYNC_FIELDS)
+
+    emails = [c.email_id for c in contacts if c.email_id]
+    existing_emails = set(frappe.get_all("Contact", filters={"email_id": ["in", emails]}, pluck="email_id")) if emails else set()
+
+    organizations = list({c.organization for c in contacts if c.organization})
+    customers = _get_linked_records("Customer", "custom_distribution_organization", organizations)
+    suppliers = _get_linked_records("Supplier", "custom_distribution_organization", organizations)
+
+    errors = {}
+
+    for contact in contacts:
+        frappe.db.savepoint("sysmayal_sync")
+        try:
+            linked = linked_contacts.get(contact.name)
+
+            if linked:
+                # Only save when a synced field actually changed
+                if any((linked.get(f) or None) != (contact.get(f) or None) for f in CONTACT_SYNC_FIELDS):
+                    contact_doc = frappe.get_doc("Contact", linked.name)
+                    contact_doc.update({f: contact.get(f) for f in CONTACT_SYNC_FIELDS})
+                    contact_doc.save(ignore_permissions=True)
+
+            elif contact.email_id and contact.email_id not in existing_emails:
+                contact_doc = frappe.new_doc("Contact")
+                contact_doc.update({f: contact.get(f) for f in CONTACT_SYNC_FIELDS})
+                contact_doc.email_id = contact.email_id
+
+                # Add organization links
+                if customers.get(contact.organization):
+                    contact_doc.append("links", {
+                        "link_doctype": "Customer",
+                        "link_name": customers[contact.organization].name
+                    })
+
+                if suppliers.get(contact.organization):
+                    contact_doc.append("links", {
+                        "link_doctype": "Supplier",
+                        "link_name": suppliers[contact.organization].name
+                    })
+
+                contact_doc.save(ignore_permissions=True)
+
+                # Link back to distribution contact
+                contact_doc.db_set("custom_distribution_contact", contact.name)
+                existing_emails.add(contact.email_id)
+
+        except Exception as e:
+            frappe.db.rollback(save_point="sysmayal_sync")
+            errors[("Distribution Contact", contact.name)] = str(e)
+            frappe.log_error(
+                message=f"Error syncing Contact for {contact.name}: {str(e)}",
+                title="Distribution Contact Sync Error"
+            )
+
+    return errors
+
+def _get_linked_records(doctype, link_field, names, fields=()):
+    """Get ERPNext records linked back to Sysmayal records, keyed by the link value."""
+
+    if not names:
+        return {}
+
+    records = frappe.get_all(
+        doctype,
+        filters={link_field: ["in", names]},
+        fields=["name", link_field, *fields]
+    )
+
+    return {r.get(link_field): r for r in records}
+
+def _mark_events(events, errors):
+    """
+    Mark processed events as synced, or record the failure for retry.
+
+    An event is only marked synced if its revision is still the one read
+    with the batch. A save that committed after the worker read the
+    document raised the revision, so its event stays pending and the
+    document is synced again with the new data.
+    """
+
+    now = now_datetime()
+
+    synced = {}
+    for event in events:
+        if (event.reference_doctype, event.reference_name) not in errors:
+            synced.setdefault(event.revision or 0, []).append(event.name)
+
+    for revision, names in synced.items():
+        frappe.db.sql("""
+            UPDATE `tabSysmayal Sync Event`
+            SET status = 'Synced', synced_on = %(now)s, modified = %(now)s
+            WHERE name IN %(names)s AND revision = %(revision)s
+        """, {"now": now, "names": tuple(names), "revision": revision})
+
+    for event in events:
+        error = errors.get((event.reference_doctype, event.reference_name))
+        if not error:
+            continue
+
+        attempts = (event.attempts or 0) + 1
+        frappe.db.set_value(SYNC_EVENT_DOCTYPE, event.name, {
+            "attempts": attempts,
+            "last_error": error,
+            "status": "Failed" if attempts >= MAX_ATTEMPTS else "Pending"
+        })
@@ -0,0 +1,10 @@
+"""
+Sysmayal Notifications Module
+
+This module provides scheduled notification functionality for:
+- Certificate expiry reminders
+- Product compliance review reminders
+- Per-recipient daily digests
+"""
+
+pass
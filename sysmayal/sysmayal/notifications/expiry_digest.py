@@ -0,0 +1,147 @@
+"""
+Expiry Digest Notifications
+
+This module groups certificate expiry reminders and product compliance
+review reminders per recipient, so each contact receives a single daily
+digest email instead of one email per document.
+"""
+
+import itertools
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, escape_html, nowdate
+
+# Days before expiry on which a certificate reminder is due
+CERTIFICATE_REMINDER_DAYS = (90, 30, 7, 1)
+
+# Days before the next review on which a compliance review reminder is due
+REVIEW_REMINDER_DAYS = (30, 7, 1)
+
+def is_digest_enabled():
+    """Check whether expiry reminders are delivered as a daily digest."""
+    return bool(frappe.conf.get("sysmayal_expiry_digest"))
+
+def get_due_reminders(date=None):
+    """
+    Get every reminder due on the given date.
+
+    Certificate expiries and compliance reviews are fetched in one query,
+    matched on exact due dates so the date indexes can be used, and
+    ordered by recipient for grouping.
+
+    Args:
+        date (str): Reference date, defaults to today
+
+    Returns:
+        list: Reminder rows ordered by recipient and due date
+    """
+
+    date = date or nowdate()
+
+    return frappe.db.sql("""
+        SELECT
+            LOWER(cd.contact_email) as recipient,
+            cd.primary_contact as contact_name,
+            'Certification Document' as reference_doctype,
+            cd.name as reference_name,
+            'Certificate Expiry' as reminder_type,
+            cd.document_title as title,
+            cd.certificate_number as reference_number,
+            cd.issuing_authority as authority,
+            cd.expiry_date as due_date,
+            DATEDIFF(cd.expiry_date, %(date)s) as days_remaining
+        FROM `tabCertification Document` cd
+        WHERE cd.docstatus < 2
+        AND cd.expiry_date IN %(certificate_dates)s
+        AND IFNULL(cd.contact_email, '') != ''
+
+        UNION ALL
+
+        SELECT
+            LOWER(COALESCE(NULLIF(pc.contact_email, ''), u.email)) as recipient,
+            u.full_name as contact_name,
+            'Product Compliance' as reference_doctype,
+            pc.name as reference_name,
+            'Compliance Review' as reminder_type,
+            pc.product_name as title,
+            pc.product_code as reference_number,
+            pc.country as authority,
+            pc.next_review_date as due_date,
+            DATEDIFF(pc.next_review_date, %(date)s) as days_remaining
+        FROM `tabProduct Compliance` pc
+        LEFT JOIN `tabUser` u ON u.name = pc.responsible_person
+        WHERE pc.docstatus < 2
+        AND pc.next_review_date IN %(review_dates)s
+        AND COALESCE(NULLIF(pc.contact_email, ''), u.email) IS NOT NULL
+
+        ORDER BY recipient, due_date, title
+    """, {
+        "date": date,
+        "certificate_dates": tuple(add_days(date, days) for days in CERTIFICATE_REMINDER_DAYS),
+        "review_dates": tuple(add_days(date, days) for days in REVIEW_REMINDER_DAYS)
+    }, as_dict=True)
+
+def send_expiry_digests(date=None):
+    """
+    Send one digest email per recipient with all reminders due today.
+
+    Args:
+        date (str): Reference date, defaults to today
+
+    Returns:
+        int: Number of digest emails queued
+    """
+
+    if not is_digest_enabled():
+        return 0
+
+    sent_count = 0
+
+    for recipient, reminders in itertools.groupby(get_due_reminders(date), key=lambda r: r.recipient):
+        reminders = list(reminders)
+
+        try:
+            frappe.sendmail(
+                recipients=[recipient],
+                subject=_("Sysmayal Expiry Digest: {0} item(s) need attention").format(len(reminders)),
+                message=render_digest(reminders)
+            )
+            sent_count += 1
+        except Exception as e:
+            frappe.log_error(
+                message=f"Failed to send expiry digest to {recipient}: {str(e)}",
+                title="Expiry Digest Error"
+            )
+
+    return sent_count
+
+def render_digest(reminders):
+    """Render the digest email body for one recipient."""
+
+    contact_name = next((r.contact_name for r in reminders if r.contact_name), None)
+
+    sections = []
+    for reminder_type, heading in (
+        ("Certificate Expiry", _("Certificates expiring soon")),
+        ("Compliance Review", _("Compliance reviews due"))
+    ):
+        rows = [r for r in reminders if r.reminder_type == reminder_type]
+        if not rows:
+            continue
+
+        items = "".join(
+            f"<li><strong>{escape_html(r.title)}</strong> "
+            f"({escape_html(r.reference_number or 'N/A')}, {escape_html(r.authority or 'N/A')}): "
+            f"{r.due_date} - {r.days_remaining} day(s) remaining</li>"
+            for r in rows
+        )
+        sections.append(f"<h4>{heading}</h4><ul>{items}</ul>")
+
+    return f"""
+        <p>Dear {escape_html(contact_name or 'Sir/Madam')},</p>
+        <p>The following items need your attention:</p>
+        {''.join(sections)}
+        <p>Please take necessary action before the due dates.</p>
+        <p>Best regards,<br>Sysmayal Compliance Team</p>
+    """
@@ -0,0 +1,5 @@
+"""
+Sysmayal database patches.
+"""
+
+pass
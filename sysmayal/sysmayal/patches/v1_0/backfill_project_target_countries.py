@@ -0,0 +1,37 @@
+"""
+Backfill the Project Target Country child table from the free-text
+target countries and target markets of existing projects.
+"""
+
+import frappe
+from frappe.utils import now_datetime
+from sysmayal.sysmayal.doctype.product_development_project.product_development_project import get_target_countries
+
+def execute():
+    country_names = {c.lower(): c for c in frappe.get_all("Country", pluck="name")}
+
+    projects = frappe.get_all(
+        "Product Development Project",
+        fields=["name", "target_countries", "target_markets"]
+    )
+
+    now = now_datetime()
+    rows = []
+
+    for project in projects:
+        countries = get_target_countries(project.target_countries, project.target_markets, country_names=country_names)
+
+        for idx, country in enumerate(countries, start=1):
+            rows.append((
+                frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", 0,
+                project.name, "Product Development Project", "target_country_list", idx, country
+            ))
+
+    frappe.db.delete("Project Target Country", {"parenttype": "Product Development Project"})
+
+    frappe.db.bulk_insert(
+        "Project Target Country",
+        ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+         "parent", "parenttype", "parentfield", "idx", "country"],
+        rows
+    )
@@ -0,0 +1,9 @@
+"""
+Compute the group compliance totals of existing Distribution
+Organization records.
+"""
+
+from sysmayal.sysmayal.utils.compliance_rollup import rebuild_compliance_rollup
+
+def execute():
+    rebuild_compliance_rollup()
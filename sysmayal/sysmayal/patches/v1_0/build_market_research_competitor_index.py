@@ -0,0 +1,36 @@
+"""
+Build the Market Research Competitor index from the main competitors of
+existing completed studies.
+"""
+
+import frappe
+from frappe.utils import now_datetime
+from sysmayal.sysmayal.doctype.market_research.market_research import parse_competitors
+
+def execute():
+    studies = frappe.get_all(
+        "Market Research",
+        filters={"research_status": "Completed"},
+        fields=["name", "main_competitors", "country", "region", "product_category"]
+    )
+
+    now = now_datetime()
+    rows = []
+
+    for study in studies:
+        for idx, competitor in enumerate(parse_competitors(study.main_competitors), start=1):
+            rows.append((
+                frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", 0,
+                study.name, "Market Research", "competitor_index", idx,
+                competitor, study.country, study.region, study.product_category
+            ))
+
+    frappe.db.delete("Market Research Competitor", {"parenttype": "Market Research"})
+
+    frappe.db.bulk_insert(
+        "Market Research Competitor",
+        ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+         "parent", "parenttype", "parentfield", "idx",
+         "competitor", "country", "region", "product_category"],
+        rows
+    )
@@ -0,0 +1,9 @@
+"""
+Set the expiry window fields of existing Product Compliance,
+Certification Document and Distribution Organization records.
+"""
+
+from sysmayal.sysmayal.utils.expiry_buckets import update_expiry_buckets
+
+def execute():
+    update_expiry_buckets()
@@ -8,15 +8,19 @@ across different countries and regulatory frameworks.
 import frappe
 from frappe import _
 from frappe.utils import date_diff, nowdate
+from sysmayal.sysmayal.utils.expiry_buckets import get_buckets_within
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
+@read_from_replica
 def execute(filters=None):
     """Execute the compliance status report."""
     
     columns = get_columns()
     data = get_data(filters)
     chart_data = get_chart_data(data)
+    report_summary = get_report_summary(filters)
     
-    return columns, data, None, chart_data
+    return columns, data, None, chart_data, report_summary
 
 def get_columns():
     """Define report columns."""
@@ -132,6 +136,8 @@ def get_data(filters):
             pc.expiry_date,
             pc.responsible_person,
             pc.manufacturer,
+            pc.expiry_bucket,
+            pc.review_bucket,
             CASE 
                 WHEN pc.next_review_date IS NOT NULL 
                 THEN DATEDIFF(pc.next_review_date, CURDATE())
@@ -235,34 +241,81 @@ def get_chart_data(data):
     
     return chart_data
 
-def get_report_summary(data):
-    """Generate report summary statistics."""
+def get_report_summary(filters):
+    """
+    Generate report summary statistics.
     
-    if not data:
-        return {}
+    All counts come from one aggregate query over the filtered products,
+    so the summary cost does not depend on the rows loaded in the report.
+    """
     
-    total_products = len(data)
-    compliant_products = len([d for d in data if d.get('compliance_status') == 'Compliant'])
-    non_compliant = len([d for d in data if d.get('compliance_status') == 'Non-Compliant'])
-    expired = len([d for d in data if d.get('compliance_status') == 'Expired'])
+    conditions = get_conditions(filters)
     
-    # Products expiring soon (within 30 days)
-    expiring_soon = len([d for d in data if d.get('days_to_expiry') and d['days_to_expiry'] <= 30 and d['days_to_expiry'] > 0])
+    expiring_buckets = ", ".join(frappe.db.escape(b) for b in get_buckets_within(30))
+    review_buckets = ", ".join(frappe.db.escape(b) for b in get_buckets_within(7))
     
-    # Reviews due soon (within 7 days)
-    reviews_due = len([d for d in data if d.get('days_to_review') and d['days_to_review'] <= 7 and d['days_to_review'] > 0])
+    summary = frappe.db.sql(f"""
+        SELECT
+            COUNT(*) as total_products,
+            COUNT(CASE WHEN pc.compliance_status = 'Compliant' THEN 1 END) as compliant_products,
+            COUNT(CASE WHEN pc.compliance_status = 'Non-Compliant' THEN 1 END) as non_compliant,
+            COUNT(CASE WHEN pc.compliance_status = 'Expired' THEN 1 END) as expired,
+            COUNT(CASE WHEN pc.expiry_bucket IN ({expiring_buckets}) THEN 1 END) as expiring_soon,
+            COUNT(CASE WHEN pc.review_bucket IN ({review_buckets}) THEN 1 END) as reviews_due
+        FROM `tabProduct Compliance` pc
+        WHERE pc.docstatus < 2
+        {conditions}
+    """, as_dict=True)[0]
     
-    compliance_rate = (compliant_products / total_products * 100) if total_products > 0 else 0
+    if not summary.total_products:
+        return []
     
-    return {
-        "total_products": total_products,
-        "compliant_products": compliant_products,
-        "compliance_rate": round(compliance_rate, 1),
-        "non_compliant": non_compliant,
-        "expired": expired,
-        "expiring_soon": expiring_soon,
-        "reviews_due": reviews_due
-    }
+    compliance_rate = summary.compliant_products / summary.total_products * 100
+    
+    return [
+        {
+            "value": summary.total_products,
+            "label": _("Total Products"),
+            "datatype": "Int",
+            "indicator": "Blue"
+        },
+        {
+            "value": summary.compliant_products,
+            "label": _("Compliant"),
+            "datatype": "Int",
+            "indicator": "Green"
+        },
+        {
+            "value": round(compliance_rate, 1),
+            "label": _("Compliance Rate"),
+            "datatype": "Percent",
+            "indicator": "Green" if compliance_rate >= 80 else "Orange"
+        },
+        {
+            "value": summary.non_compliant,
+            "label": _("Non-Compliant"),
+            "datatype": "Int",
+            "indicator": "Red" if summary.non_compliant else "Green"
+        },
+        {
+            "value": summary.expired,
+            "label": _("Expired"),
+            "datatype": "Int",
+            "indicator": "Red" if summary.expired else "Green"
+        },
+        {
+            "value": summary.expiring_soon,
+            "label": _("Expiring within 30 Days"),
+            "datatype": "Int",
+            "indicator": "Orange" if summary.expiring_soon else "Green"
+        },
+        {
+            "value": summary.reviews_due,
+            "label": _("Reviews Due within 7 Days"),
+            "datatype": "Int",
+            "indicator": "Orange" if summary.reviews_due else "Green"
+        }
+    ]
 
 @frappe.whitelist()
 def get_compliance_filters():
@@ -8,7 +8,10 @@ including organization performance, geographic coverage, and growth trends.
 import frappe
 from frappe import _
 from frappe.utils import nowdate, add_months
+from sysmayal.sysmayal.utils.expiry_buckets import get_buckets_within
+from sysmayal.sysmayal.utils.replica import read_from_replica
 
+@read_from_replica
 def execute(filters=None):
     """Execute the distribution analytics report."""
     
@@ -231,6 +234,7 @@ def get_chart_data(data):
     return chart_data
 
 @frappe.whitelist()
+@read_from_replica
 def get_distribution_summary(filters=None):
     """Get distribution network summary statistics."""
     
@@ -297,13 +301,12 @@ def get_distribution_summary(filters=None):
             DATEDIFF(agreement_expiry, CURDATE()) as days_to_expiry
         FROM `tabDistribution Organization`
         WHERE docstatus < 2
-        AND agreement_expiry IS NOT NULL
-        AND agreement_expiry BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 90 DAY)
+        AND agreement_expiry_bucket IN %(buckets)s
         {conditions}
         ORDER BY agreement_expiry
     """
     
-    expiring_agreements = frappe.db.sql(expiring_query, as_dict=True)
+    expiring_agreements = frappe.db.sql(expiring_query, {"buckets": tuple(get_buckets_within(90))}, as_dict=True)
     
     return {
         "summary": summary,
@@ -313,6 +316,7 @@ def get_distribution_summary(filters=None):
     }
 
 @frappe.whitelist()
+@read_from_replica
 def get_performance_metrics(filters=None):
     """Get performance metrics for distribution network."""
     
@@ -369,6 +373,7 @@ def get_performance_metrics(filters=None):
     }
 
 @frappe.whitelist()
+@read_from_replica
 def get_contact_analytics(filters=None):
     """Get contact analytics for distribution network."""
     
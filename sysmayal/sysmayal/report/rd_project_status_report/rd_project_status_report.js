@@ -53,6 +53,13 @@ frappe.query_reports["R&D Project Status Report"] = {
             "options": "\nNot Started\nIn Progress\nPending Review\nCompliant\nNon-Compliant",
             "width": "120px"
         },
+        {
+            "fieldname": "target_country",
+            "label": __("Target Country"),
+            "fieldtype": "Link",
+            "options": "Country",
+            "width": "120px"
+        },
         {
             "fieldname": "from_date",
             "label": __("From Date"),
@@ -5,10 +5,14 @@ This report provides comprehensive overview of research and development
 projects including progress tracking, resource allocation, and timeline analysis.
 """
 
+import hashlib
+
 import frappe
 from frappe import _
-from frappe.utils import date_diff, nowdate
+from frappe.utils import date_diff, getdate, nowdate
+from sysmayal.sysmayal.utils.replica import get_cache_ttl, read_from_replica
 
+@read_from_replica
 def execute(filters=None):
     """Execute the R&D project status report."""
     
@@ -209,6 +213,15 @@ def get_conditions(filters):
         if filters.get("compliance_status"):
             conditions += f" AND proj.compliance_status = '{filters['compliance_status']}'"
             
+        if filters.get("target_country"):
+            conditions += f"""
+                AND EXISTS (
+                    SELECT 1 FROM `tabProject Target Country` ptc
+                    WHERE ptc.parent = proj.name
+                    AND ptc.parenttype = 'Product Development Project'
+                    AND ptc.country = {frappe.db.escape(filters['target_country'])}
+                )"""
+            
         if filters.get("from_date"):
             conditions += f" AND proj.start_date >= '{filters['from_date']}'"
             
@@ -265,235 +278,313 @@ def get_chart_data(data):
     return chart_data
 
 @frappe.whitelist()
+@read_from_replica
 def get_project_portfolio_summary(filters=None):
     """Get project portfolio summary statistics."""
     
-    conditions = get_conditions(filters) if filters else ""
-    
-    # Basic project metrics
-    summary_query = f"""
-        SELECT 
-            COUNT(*) as total_projects,
-            COUNT(CASE WHEN status IN ('In Progress', 'Testing', 'Regulatory Review') THEN 1 END) as active_projects,
-            COUNT(CASE WHEN status = 'Completed' THEN 1 END) as completed_projects,
-            COUNT(CASE WHEN status = 'On Hold' THEN 1 END) as on_hold_projects,
-            COUNT(CASE WHEN status = 'Cancelled' THEN 1 END) as cancelled_projects,
-            COUNT(CASE WHEN priority = 'High' THEN 1 END) as high_priority,
-            COUNT(CASE WHEN priority = 'Medium' THEN 1 END) as medium_priority,
-            COUNT(CASE WHEN priority = 'Low' THEN 1 END) as low_priority,
-            AVG(completion_percentage) as avg_completion,
-            SUM(estimated_investment) as total_investment,
-            AVG(estimated_investment) as avg_investment
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        {conditions}
-    """
-    
-    summary = frappe.db.sql(summary_query, as_dict=True)[0]
-    
-    # Timeline analysis
-    timeline_query = f"""
-        SELECT 
-            CASE 
-                WHEN expected_completion < CURDATE() AND status NOT IN ('Completed', 'Cancelled') THEN 'Overdue'
-                WHEN expected_completion BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 30 DAY) THEN 'Due Soon'
-                WHEN expected_completion BETWEEN DATE_ADD(CURDATE(), INTERVAL 31 DAY) AND DATE_ADD(CURDATE(), INTERVAL 90 DAY) THEN 'Due This Quarter'
-                ELSE 'Future'
-            END as timeline_category,
-            COUNT(*) as count
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND expected_completion IS NOT NULL
-        AND status NOT IN ('Completed', 'Cancelled')
-        {conditions}
-        GROUP BY timeline_category
-    """
-    
-    timeline_data = frappe.db.sql(timeline_query, as_dict=True)
-    
-    # Product category analysis
-    category_query = f"""
-        SELECT 
-            product_category,
-            COUNT(*) as project_count,
-            AVG(completion_percentage) as avg_progress,
-            SUM(estimated_investment) as total_investment,
-            COUNT(CASE WHEN status = 'Completed' THEN 1 END) as completed_count
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND product_category IS NOT NULL
-        {conditions}
-        GROUP BY product_category
-        ORDER BY project_count DESC
-    """
-    
-    category_data = frappe.db.sql(category_query, as_dict=True)
-    
-    # Resource allocation
-    resource_query = f"""
-        SELECT 
-            project_manager,
-            COUNT(*) as managed_projects,
-            AVG(completion_percentage) as avg_progress,
-            COUNT(CASE WHEN status IN ('In Progress', 'Testing', 'Regulatory Review') THEN 1 END) as active_projects
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND project_manager IS NOT NULL
-        {conditions}
-        GROUP BY project_manager
-        ORDER BY managed_projects DESC
-    """
-    
-    resource_data = frappe.db.sql(resource_query, as_dict=True)
+    analytics = get_project_analytics(filters)
     
     return {
-        "summary": summary,
-        "timeline_analysis": timeline_data,
-        "category_analysis": category_data,
-        "resource_allocation": resource_data
+        "summary": analytics["summary"],
+        "timeline_analysis": analytics["timeline_analysis"],
+        "category_analysis": analytics["category_analysis"],
+        "resource_allocation": analytics["resource_allocation"]
     }
 
 @frappe.whitelist()
+@read_from_replica
 def get_project_performance_metrics(filters=None):
     """Get detailed project performance metrics."""
     
-    conditions = get_conditions(filters) if filters else ""
-    
-    # Completion rate by status
-    completion_query = f"""
-        SELECT 
-            status,
-            COUNT(*) as project_count,
-            AVG(completion_percentage) as avg_completion,
-            MIN(completion_percentage) as min_completion,
-            MAX(completion_percentage) as max_completion
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        {conditions}
-        GROUP BY status
-        ORDER BY avg_completion DESC
-    """
-    
-    completion_data = frappe.db.sql(completion_query, as_dict=True)
-    
-    # Investment vs progress analysis
-    investment_query = f"""
-        SELECT 
-            CASE 
-                WHEN estimated_investment < 100000 THEN 'Small (<$100K)'
-                WHEN estimated_investment < 500000 THEN 'Medium ($100K-$500K)'
-                WHEN estimated_investment < 1000000 THEN 'Large ($500K-$1M)'
-                ELSE 'Major (>$1M)'
-            END as investment_category,
-            COUNT(*) as project_count,
-            AVG(completion_percentage) as avg_progress,
-            AVG(DATEDIFF(expected_completion, start_date)) as avg_duration_days
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND estimated_investment IS NOT NULL
-        AND start_date IS NOT NULL
-        AND expected_completion IS NOT NULL
-        {conditions}
-        GROUP BY investment_category
-        ORDER BY 
-            CASE investment_category
-                WHEN 'Small (<$100K)' THEN 1
-                WHEN 'Medium ($100K-$500K)' THEN 2
-                WHEN 'Large ($500K-$1M)' THEN 3
-                ELSE 4
-            END
-    """
-    
-    investment_data = frappe.db.sql(investment_query, as_dict=True)
-    
-    # Compliance status analysis
-    compliance_query = f"""
-        SELECT 
-            compliance_status,
-            COUNT(*) as project_count,
-            AVG(completion_percentage) as avg_progress,
-            COUNT(CASE WHEN status = 'Completed' THEN 1 END) as completed_count
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND compliance_status IS NOT NULL
-        {conditions}
-        GROUP BY compliance_status
-        ORDER BY project_count DESC
-    """
-    
-    compliance_data = frappe.db.sql(compliance_query, as_dict=True)
+    analytics = get_project_analytics(filters)
     
     return {
-        "completion_by_status": completion_data,
-        "investment_analysis": investment_data,
-        "compliance_analysis": compliance_data
+        "completion_by_status": analytics["completion_by_status"],
+        "investment_analysis": analytics["investment_analysis"],
+        "compliance_analysis": analytics["compliance_analysis"]
     }
 
 @frappe.whitelist()
+@read_from_replica
 def get_project_risks_and_issues(filters=None):
     """Identify project risks and issues."""
     
-    conditions = get_conditions(filters) if filters else ""
+    analytics = get_project_analytics(filters)
     
-    # Overdue projects
-    overdue_query = f"""
-        SELECT 
-            project_name,
-            status,
-            expected_completion,
-            completion_percentage,
-            DATEDIFF(CURDATE(), expected_completion) as days_overdue
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND expected_completion < CURDATE()
-        AND status NOT IN ('Completed', 'Cancelled')
-        {conditions}
-        ORDER BY days_overdue DESC
+    return {
+        "overdue_projects": analytics["overdue_projects"],
+        "stalled_projects": analytics["stalled_projects"],
+        "high_risk_projects": analytics["high_risk_projects"]
+    }
+
+# Project analytics engine
+
+ANALYTICS_CACHE_KEY = "sysmayal:rd_project_analytics"
+ANALYTICS_CACHE_TTL = 300
+
+ACTIVE_STATUSES = ("In Progress", "Testing", "Regulatory Review")
+CLOSED_STATUSES = ("Completed", "Cancelled")
+
+INVESTMENT_CATEGORIES = (
+    (100000, "Small (<$100K)"),
+    (500000, "Medium ($100K-$500K)"),
+    (1000000, "Large ($500K-$1M)"),
+    (None, "Major (>$1M)")
+)
+
+def get_project_analytics(filters=None):
     """
+    Compute every portfolio, performance and risk breakdown for a filter set.
     
-    overdue_projects = frappe.db.sql(overdue_query, as_dict=True)
+    The filtered projects are fetched once with only the columns needed and
+    all breakdowns are computed in a single pass. Results are cached per
+    filter set until a project changes or the cache expires.
     
-    # Stalled projects (low progress for extended period)
-    stalled_query = f"""
-        SELECT 
-            project_name,
-            status,
-            completion_percentage,
-            start_date,
-            DATEDIFF(CURDATE(), start_date) as days_since_start
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND start_date IS NOT NULL
-        AND DATEDIFF(CURDATE(), start_date) > 180
-        AND completion_percentage < 25
-        AND status NOT IN ('Completed', 'Cancelled', 'On Hold')
-        {conditions}
-        ORDER BY days_since_start DESC
+    Args:
+        filters (dict): Report filters
+        
+    Returns:
+        dict: Breakdowns keyed by name
     """
     
-    stalled_projects = frappe.db.sql(stalled_query, as_dict=True)
+    filters = frappe.parse_json(filters) if filters else {}
     
-    # High investment, low progress projects
-    risk_query = f"""
-        SELECT 
-            project_name,
-            estimated_investment,
-            completion_percentage,
-            status,
-            start_date
-        FROM `tabProduct Development Project`
-        WHERE docstatus < 2
-        AND estimated_investment > 500000
-        AND completion_percentage < 50
-        AND status NOT IN ('Completed', 'Cancelled')
+    cache_key = "{0}:{1}:{2}".format(
+        ANALYTICS_CACHE_KEY,
+        nowdate(),
+        hashlib.sha1(frappe.as_json(filters, indent=None).encode()).hexdigest() if filters else "all"
+    )
+    
+    analytics = frappe.cache().get_value(cache_key)
+    if analytics is None:
+        analytics = compute_project_analytics(get_analytics_rows(filters))
+        
+        # Replica reads may predate the save that cleared the cache
+        ttl = get_cache_ttl(ANALYTICS_CACHE_TTL)
+        if ttl:
+            frappe.cache().set_value(cache_key, analytics, expires_in_sec=ttl)
+        
+    return analytics
+
+def clear_project_analytics_cache(doc=None, method=None):
+    """Drop cached project analytics when a project changes."""
+    frappe.cache().delete_keys(ANALYTICS_CACHE_KEY)
+
+def get_analytics_rows(filters):
+    """Fetch the filtered projects with the columns used by the analytics."""
+    
+    conditions = get_conditions(filters)
+    
+    return frappe.db.sql(f"""
+        SELECT
+            proj.project_name,
+            proj.status,
+            proj.priority,
+            proj.completion_percentage,
+            proj.estimated_investment,
+            proj.start_date,
+            proj.expected_completion,
+            proj.product_category,
+            proj.project_manager,
+            proj.compliance_status
+        FROM `tabProduct Development Project` proj
+        WHERE proj.docstatus < 2
         {conditions}
-        ORDER BY estimated_investment DESC
+    """, as_dict=True)
+
+def compute_project_analytics(rows):
     """
+    Compute all project breakdowns from the fetched rows in one pass.
     
-    high_risk_projects = frappe.db.sql(risk_query, as_dict=True)
+    Args:
+        rows (list): Project rows from get_analytics_rows
+        
+    Returns:
+        dict: Breakdowns keyed by name
+    """
+    
+    today = getdate(nowdate())
+    
+    summary = frappe._dict(
+        total_projects=0, active_projects=0, completed_projects=0, on_hold_projects=0,
+        cancelled_projects=0, high_priority=0, medium_priority=0, low_priority=0
+    )
+    completion_values = []
+    investment_values = []
+    
+    timeline = {}
+    categories = {}
+    managers = {}
+    statuses = {}
+    investments = {}
+    compliance = {}
+    
+    overdue_projects = []
+    stalled_projects = []
+    high_risk_projects = []
+    
+    for row in rows:
+        status = row.status
+        completion = row.completion_percentage
+        investment = row.estimated_investment
+        is_open = bool(status) and status not in CLOSED_STATUSES
+        is_active = status in ACTIVE_STATUSES
+        is_completed = status == "Completed"
+        
+        # Portfolio summary
+        summary.total_projects += 1
+        summary.active_projects += is_active
+        summary.completed_projects += is_completed
+        summary.on_hold_projects += status == "On Hold"
+        summary.cancelled_projects += status == "Cancelled"
+        summary.high_priority += row.priority == "High"
+        summary.medium_priority += row.priority == "Medium"
+        summary.low_priority += row.priority == "Low"
+        
+        if completion is not None:
+            completion_values.append(completion)
+        if investment is not None:
+            investment_values.append(investment)
+            
+        # Timeline analysis
+        if row.expected_completion and is_open:
+            days_left = date_diff(row.expected_completion, today)
+            if days_left < 0:
+                timeline_category = "Overdue"
+            elif days_left <= 30:
+                timeline_category = "Due Soon"
+            elif days_left <= 90:
+                timeline_category = "Due This Quarter"
+            else:
+                timeline_category = "Future"
+            timeline[timeline_category] = timeline.get(timeline_category, 0) + 1
+            
+            if days_left < 0:
+                overdue_projects.append(frappe._dict(
+                    project_name=row.project_name,
+                    status=status,
+                    expected_completion=row.expected_completion,
+                    completion_percentage=completion,
+                    days_overdue=-days_left
+                ))
+                
+        # Grouped breakdowns
+        if row.product_category:
+            group = _add_to_group(categories, row.product_category, completion, investment)
+            group["completed_count"] += is_completed
+            
+        if row.project_manager:
+            group = _add_to_group(managers, row.project_manager, completion)
+            group["active_projects"] += is_active
+            
+        if status:
+            _add_to_group(statuses, status, completion)
+            
+        if investment is not None and row.start_date and row.expected_completion:
+            label = next(label for limit, label in INVESTMENT_CATEGORIES if limit is None or investment < limit)
+            group = _add_to_group(investments, label, completion)
+            group["durations"].append(date_diff(row.expected_completion, row.start_date))
+            
+        if row.compliance_status:
+            group = _add_to_group(compliance, row.compliance_status, completion)
+            group["completed_count"] += is_completed
+            
+        # Risks
+        if (row.start_date and completion is not None and completion < 25
+                and is_open and status != "On Hold"):
+            days_since_start = date_diff(today, row.start_date)
+            if days_since_start > 180:
+                stalled_projects.append(frappe._dict(
+                    project_name=row.project_name,
+                    status=status,
+                    completion_percentage=completion,
+                    start_date=row.start_date,
+                    days_since_start=days_since_start
+                ))
+                
+        if investment is not None and investment > 500000 and completion is not None and completion < 50 and is_open:
+            high_risk_projects.append(frappe._dict(
+                project_name=row.project_name,
+                estimated_investment=investment,
+                completion_percentage=completion,
+                status=status,
+                start_date=row.start_date
+            ))
+            
+    summary.avg_completion = _average(completion_values)
+    summary.total_investment = sum(investment_values) if investment_values else None
+    summary.avg_investment = _average(investment_values)
+    
+    investment_order = [label for limit, label in INVESTMENT_CATEGORIES]
     
     return {
-        "overdue_projects": overdue_projects,
-        "stalled_projects": stalled_projects,
-        "high_risk_projects": high_risk_projects
+        "summary": summary,
+        "timeline_analysis": [
+            frappe._dict(timeline_category=category, count=count) for category, count in timeline.items()
+        ],
+        "category_analysis": sorted((
+            frappe._dict(
+                product_category=category,
+                project_count=group["count"],
+                avg_progress=_average(group["completion"]),
+                total_investment=sum(group["investment"]) if group["investment"] else None,
+                completed_count=group["completed_count"]
+            ) for category, group in categories.items()
+        ), key=lambda r: r.project_count, reverse=True),
+        "resource_allocation": sorted((
+            frappe._dict(
+                project_manager=manager,
+                managed_projects=group["count"],
+                avg_progress=_average(group["completion"]),
+                active_projects=group["active_projects"]
+            ) for manager, group in managers.items()
+        ), key=lambda r: r.managed_projects, reverse=True),
+        "completion_by_status": sorted((
+            frappe._dict(
+                status=status,
+                project_count=group["count"],
+                avg_completion=_average(group["completion"]),
+                min_completion=min(group["completion"], default=None),
+                max_completion=max(group["completion"], default=None)
+            ) for status, group in statuses.items()
+        ), key=lambda r: r.avg_completion if r.avg_completion is not None else -1, reverse=True),
+        "investment_analysis": sorted((
+            frappe._dict(
+                investment_category=label,
+                project_count=group["count"],
+                avg_progress=_average(group["completion"]),
+                avg_duration_days=_average(group["durations"])
+            ) for label, group in investments.items()
+        ), key=lambda r: investment_order.index(r.investment_category)),
+        "compliance_analysis": sorted((
+            frappe._dict(
+                compliance_status=compliance_status,
+                project_count=group["count"],
+                avg_progress=_average(group["completion"]),
+                completed_count=group["completed_count"]
+            ) for compliance_status, group in compliance.items()
+        ), key=lambda r: r.project_count, reverse=True),
+        "overdue_projects": sorted(overdue_projects, key=lambda r: r.days_overdue, reverse=True),
+        "stalled_projects": sorted(stalled_projects, key=lambda r: r.days_since_start, reverse=True),
+        "high_risk_projects": sorted(high_risk_projects, key=lambda r: r.estimated_investment, reverse=True)
     }
+
+def _add_to_group(groups, key, completion, investment=None):
+    """Add a project to a grouped breakdown and return the group."""
+    
+    group = groups.setdefault(key, {
+        "count": 0, "completion": [], "investment": [], "durations": [],
+        "completed_count": 0, "active_projects": 0
+    })
+    group["count"] += 1
+    
+    if completion is not None:
+        group["completion"].append(completion)
+    if investment is not None:
+        group["investment"].append(investment)
+        
+    return group
+
+def _average(values):
+    """Average of the values, or None like SQL AVG over no rows."""
+    return sum(values) / len(values) if values else None
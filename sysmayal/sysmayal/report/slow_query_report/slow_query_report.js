@@ -0,0 +1,40 @@
+/**
+ * Slow Query Report - Client Side Configuration
+ */
+
+frappe.query_reports["Slow Query Report"] = {
+    "filters": [
+        {
+            "fieldname": "from_date",
+            "label": __("From Date"),
+            "fieldtype": "Date",
+            "default": frappe.datetime.add_days(frappe.datetime.get_today(), -7),
+            "width": "100px"
+        },
+        {
+            "fieldname": "to_date",
+            "label": __("To Date"),
+            "fieldtype": "Date",
+            "width": "100px"
+        },
+        {
+            "fieldname": "endpoint",
+            "label": __("Endpoint"),
+            "fieldtype": "Data",
+            "width": "150px"
+        },
+        {
+            "fieldname": "full_scan_only",
+            "label": __("Full Scans Only"),
+            "fieldtype": "Check",
+            "width": "80px"
+        },
+        {
+            "fieldname": "limit",
+            "label": __("Top"),
+            "fieldtype": "Int",
+            "default": 50,
+            "width": "60px"
+        }
+    ]
+};
@@ -0,0 +1,155 @@
+"""
+Slow Query Report
+
+This report ranks the query shapes captured by the slow query profiler by
+total time spent, with their latency, full table scan flag and the latest
+query, plan and filters captured for each shape.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, flt, nowdate
+
+def execute(filters=None):
+    """Execute the slow query report."""
+    
+    filters = frappe._dict(filters or {})
+    
+    columns = get_columns()
+    data = get_data(filters)
+    
+    return columns, data
+
+def get_columns():
+    """Define report columns."""
+    
+    return [
+        {
+            "fieldname": "query_hash",
+            "label": _("Query Hash"),
+            "fieldtype": "Data",
+            "width": 140
+        },
+        {
+            "fieldname": "captures",
+            "label": _("Captures"),
+            "fieldtype": "Int",
+            "width": 90
+        },
+        {
+            "fieldname": "total_ms",
+            "label": _("Total (ms)"),
+            "fieldtype": "Float",
+            "width": 110
+        },
+        {
+            "fieldname": "avg_ms",
+            "label": _("Average (ms)"),
+            "fieldtype": "Float",
+            "width": 110
+        },
+        {
+            "fieldname": "max_ms",
+            "label": _("Max (ms)"),
+            "fieldtype": "Float",
+            "width": 100
+        },
+        {
+            "fieldname": "full_scan",
+            "label": _("Full Scan"),
+            "fieldtype": "Check",
+            "width": 80
+        },
+        {
+            "fieldname": "endpoint",
+            "label": _("Latest Endpoint"),
+            "fieldtype": "Data",
+            "width": 220
+        },
+        {
+            "fieldname": "call_site",
+            "label": _("Call Site"),
+            "fieldtype": "Data",
+            "width": 220
+        },
+        {
+            "fieldname": "last_seen",
+            "label": _("Last Seen"),
+            "fieldtype": "Datetime",
+            "width": 150
+        },
+        {
+            "fieldname": "latest_capture",
+            "label": _("Latest Capture"),
+            "fieldtype": "Link",
+            "options": "Sysmayal Slow Query",
+            "width": 110
+        },
+        {
+            "fieldname": "query",
+            "label": _("Query"),
+            "fieldtype": "Small Text",
+            "width": 400
+        }
+    ]
+
+def get_data(filters):
+    """Aggregate captures per query shape, most total time first."""
+    
+    conditions = ["creation >= %(from_date)s"]
+    values = {
+        "from_date": filters.get("from_date") or add_days(nowdate(), -7),
+        "limit": cint(filters.get("limit")) or 50
+    }
+    
+    if filters.get("to_date"):
+        conditions.append("creation < %(to_date)s")
+        values["to_date"] = add_days(filters.to_date, 1)
+        
+    if filters.get("endpoint"):
+        conditions.append("endpoint LIKE %(endpoint)s")
+        values["endpoint"] = f"%{filters.endpoint}%"
+        
+    if filters.get("full_scan_only"):
+        conditions.append("full_scan = 1")
+    
+    shapes = frappe.db.sql(f"""
+        SELECT
+            query_hash,
+            COUNT(*) as captures,
+            SUM(duration_ms) as total_ms,
+            AVG(duration_ms) as avg_ms,
+            MAX(duration_ms) as max_ms,
+            MAX(full_scan) as full_scan,
+            MAX(creation) as last_seen,
+            MAX(name) as latest_capture
+        FROM `tabSysmayal Slow Query`
+        WHERE {" AND ".join(conditions)}
+        GROUP BY query_hash
+        ORDER BY total_ms DESC
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+    
+    if not shapes:
+        return []
+    
+    latest = {
+        capture.name: capture
+        for capture in frappe.get_all(
+            "Sysmayal Slow Query",
+            filters={"name": ["in", [shape.latest_capture for shape in shapes]]},
+            fields=["name", "endpoint", "call_site", "query"]
+        )
+    }
+    
+    for shape in shapes:
+        capture = latest.get(shape.latest_capture) or {}
+        shape.update({
+            "total_ms": flt(shape.total_ms, 2),
+            "avg_ms": flt(shape.avg_ms, 2),
+            "endpoint": capture.get("endpoint"),
+            "call_site": capture.get("call_site"),
+            "query": capture.get("query")
+        })
+    
+    return shapes
@@ -9,6 +9,7 @@ import frappe
 import json
 import os
 from frappe.utils import cint, cstr, nowdate
+from sysmayal.sysmayal.data_import.regulation_upsert import upsert_regulations
 
 def after_install():
     """
@@ -141,19 +142,10 @@ def setup_country_regulations():
             with open(regulations_file, 'r', encoding='utf-8') as f:
                 regulations_data = json.load(f)
             
-            # Import country regulations
+            # Import country regulations, creating only the missing ones
             if "countries" in regulations_data:
-                for country_code, country_data in regulations_data["countries"].items():
-                    country_name = country_data.get("country_name", country_code.replace("_", " ").title())
-                    
-                    if not frappe.db.exists("Country Regulation", country_name):
-                        country_reg = frappe.new_doc("Country Regulation")
-                        country_reg.country_name = country_name
-                        country_reg.regulatory_authority = country_data.get("regulatory_authority", "")
-                        country_reg.authority_website = country_data.get("website", "")
-                        country_reg.last_updated = nowdate()
-                        country_reg.save(ignore_permissions=True)
-                        print(f"Created country regulation: {country_name}")
+                result = upsert_regulations(regulations_data, update_existing=False)
+                print(f"Created {result['created']} country regulation(s)")
                         
         except Exception as e:
             print(f"Error importing country regulations: {str(e)}")
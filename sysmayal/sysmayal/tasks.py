@@ -1,10 +1,13 @@
 # sysmayal/sysmayal/tasks.py
 
 import frappe
+from sysmayal.sysmayal.notifications.expiry_digest import send_expiry_digests
 
 def check_certification_expiry():
-    """Placeholder: Check for expiring certifications and notify users."""
+    """Send the daily per-recipient expiry and review reminder digest."""
     frappe.logger().info("Running check_certification_expiry task.")
+    sent_count = send_expiry_digests()
+    frappe.logger().info(f"Queued {sent_count} expiry digest email(s).")
 
 def update_compliance_status():
     """Placeholder: Update compliance status for products or organizations."""
@@ -0,0 +1,20 @@
+"""
+Sysmayal Utilities Module
+
+This module provides shared helpers used across Sysmayal DocTypes,
+reports and background jobs:
+- Request-scoped caching of linked record lookups
+- Cached Country Regulation registry
+- Full-text search over research and regulation text
+- Indexed expiry windows refreshed daily
+- Merged upcoming event stream across doctypes
+- Endpoint latency, query count and memory instrumentation
+- N+1 query detection in development and test mode
+- Slow query capture with sampled EXPLAIN plans
+- Concurrent execution of independent dashboard aggregates
+- Read replica routing for reports and dashboards
+- Change log of Sysmayal records with a cursor consumer API
+- Group compliance totals rolled up the organization hierarchy
+"""
+
+pass
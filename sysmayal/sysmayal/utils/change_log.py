@@ -0,0 +1,253 @@
+"""
+Change Log
+
+This module records every insert, update, delete and rename of the
+Sysmayal doctypes in the append-only Sysmayal Change Log, so incremental
+caches, rollups, exports and syncs can process what changed since their
+last run instead of rescanning tables by modified.
+
+Document saves are recorded from doc_events with the fields that changed;
+bulk paths that write rows without loading documents record their changes
+with record_changes. Each entry's autoincrement name is its sequence
+number, and consumers page through entries with get_changes, keeping
+their position with get_consumer_cursor and set_consumer_cursor.
+
+Sequence numbers are taken when an entry is inserted but become visible
+when its transaction commits, so a long transaction can commit entries
+below ones already read. get_changes therefore stops at the first gap in
+the sequence and waits for it to fill. A gap older than
+"sysmayal_change_log_gap_timeout" seconds (default 600) is skipped, as
+rolled back transactions and cleared entries leave gaps that never fill;
+entries of a transaction that stays open longer than that are missed.
+"""
+
+import json
+
+import frappe
+from frappe.model import no_value_fields, table_fields
+from frappe.query_builder.functions import Max
+from frappe.utils import add_to_date, cint, cstr, now_datetime
+
+TRACKED_DOCTYPES = (
+    "Distribution Organization",
+    "Distribution Contact",
+    "Product Compliance",
+    "Certification Document",
+    "Market Entry Plan",
+    "Product Development Project",
+    "Market Research",
+    "Country Regulation"
+)
+
+# Fields that change on every save and are not reported as changes
+IGNORED_FIELDS = {"modified", "modified_by", "idx"}
+
+DEFAULT_PAGE_LENGTH = 1000
+MAX_PAGE_LENGTH = 10000
+
+# Seconds a gap in the sequence is waited on before it is assumed to belong
+# to a rolled back transaction or to entries already cleared, and skipped
+DEFAULT_GAP_TIMEOUT = 600
+
+CURSOR_DOCTYPE = "Sysmayal Change Log Cursor"
+
+def record_document_change(doc, method=None, *args, **kwargs):
+    """
+    Record a document insert, update, delete or rename.
+
+    Called from doc_events on update, trash and rename of the tracked doctypes.
+    """
+
+    if method == "on_trash":
+        record_changes(doc.doctype, {doc.name: None}, "Delete", source="Document")
+
+    elif method == "after_rename":
+        old_name = args[0] if args else kwargs.get("old")
+        record_changes(doc.doctype, {doc.name: ["name"]}, "Rename", source="Document", previous_name=old_name)
+
+    else:
+        before = doc.get_doc_before_save()
+        if before is None:
+            record_changes(doc.doctype, {doc.name: None}, "Insert", source="Document")
+            return
+
+        changed = get_changed_fields(doc, before)
+        if changed:
+            record_changes(doc.doctype, {doc.name: changed}, "Update", source="Document")
+
+def get_changed_fields(doc, before):
+    """
+    Compare a document with its state before the save.
+
+    Returns:
+        list: Names of fields whose values changed, including child tables
+    """
+
+    changed = []
+
+    for df in doc.meta.fields:
+        if df.fieldname in IGNORED_FIELDS:
+            continue
+
+        if df.fieldtype in table_fields:
+            current = [row.as_dict(no_default_fields=True) for row in doc.get(df.fieldname) or []]
+            previous = [row.as_dict(no_default_fields=True) for row in before.get(df.fieldname) or []]
+            if current != previous:
+                changed.append(df.fieldname)
+
+        elif df.fieldtype not in no_value_fields and cstr(doc.get(df.fieldname)) != cstr(before.get(df.fieldname)):
+            changed.append(df.fieldname)
+
+    return changed
+
+def record_changes(doctype, changes, event, source=None, previous_name=None):
+    """
+    Append change log entries in one insert.
+
+    Bulk paths that write rows without loading documents call this to keep
+    the log complete.
+
+    Args:
+        doctype (str): DocType of the changed records
+        changes (dict): Record names mapped to their changed fields, or None
+            when every field is affected (inserts and deletes)
+        event (str): Insert, Update, Delete or Rename
+        source (str): Document, or the bulk operation that wrote the rows
+        previous_name (str): Old name of a renamed record
+    """
+
+    if not changes:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+
+    # Autoincrement names come from the doctype's sequence, which a raw
+    # insert does not draw from by itself
+    frappe.db.bulk_insert(
+        "Sysmayal Change Log",
+        [
+            "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+            "reference_doctype", "reference_name", "event", "changed_fields", "source", "previous_name"
+        ],
+        [
+            (
+                frappe.db.get_next_sequence_val("Sysmayal Change Log"), now, now, user, user, 0, 0,
+                doctype, name, event, json.dumps(fields) if fields else None, source, previous_name
+            )
+            for name, fields in changes.items()
+        ]
+    )
+
+@frappe.whitelist()
+def get_changes(after=0, doctypes=None, limit=DEFAULT_PAGE_LENGTH):
+    """
+    Get change log entries after a sequence number, oldest first.
+
+    Entries are returned up to the first gap in the sequence that may
+    still be filled by an open transaction, so a consumer that saves the
+    returned cursor never skips an entry committed late.
+
+    Args:
+        after (int): Sequence number of the last entry already processed
+        doctypes (list): Only return changes of these doctypes
+        limit (int): Maximum number of entries read
+
+    Returns:
+        dict: "changes" with sequence, doctype, name, event, changed fields
+        and time of each entry, and the "cursor" to pass as after next time
+    """
+
+    frappe.only_for("System Manager")
+
+    if isinstance(doctypes, str):
+        doctypes = frappe.parse_json(doctypes) if doctypes.startswith("[") else [doctypes]
+
+    return read_changes(after, doctypes, limit)
+
+def read_changes(after=0, doctypes=None, limit=DEFAULT_PAGE_LENGTH):
+    """Read change log entries after a sequence number for get_changes and in-app consumers."""
+
+    table = frappe.qb.DocType("Sysmayal Change Log")
+    gap_expired_before = _get_gap_expired_before()
+
+    # Every doctype is read so gaps can be told apart from filtered entries
+    entries = (
+        frappe.qb.from_(table)
+        .select(
+            table.name.as_("sequence"),
+            table.reference_doctype,
+            table.reference_name,
+            table.previous_name,
+            table.event,
+            table.changed_fields,
+            table.source,
+            table.creation
+        )
+        .where(table.name > cint(after))
+        .orderby(table.name)
+        .limit(min(cint(limit) or DEFAULT_PAGE_LENGTH, MAX_PAGE_LENGTH))
+    ).run(as_dict=True)
+
+    cursor = cint(after)
+    changes = []
+
+    for entry in entries:
+        # Numbers between the cursor and this entry may belong to an open transaction
+        if entry.sequence != cursor + 1 and entry.creation > gap_expired_before:
+            break
+
+        cursor = entry.sequence
+
+        if not doctypes or entry.reference_doctype in doctypes:
+            entry.changed_fields = json.loads(entry.changed_fields) if entry.changed_fields else None
+            changes.append(entry)
+
+    return {"changes": changes, "cursor": cursor}
+
+def get_settled_sequence():
+    """
+    Get a starting cursor for a new consumer.
+
+    Returns:
+        int: Sequence number of the last entry older than the gap timeout;
+        entries after it may still be joined by ones committed late
+    """
+
+    table = frappe.qb.DocType("Sysmayal Change Log")
+    result = (
+        frappe.qb.from_(table)
+        .select(Max(table.name))
+        .where(table.creation <= _get_gap_expired_before())
+    ).run()
+
+    return cint(result[0][0]) if result else 0
+
+def _get_gap_expired_before():
+    """Entries created before this time no longer hold back a gap in the sequence."""
+
+    gap_timeout = cint(frappe.conf.get("sysmayal_change_log_gap_timeout") or DEFAULT_GAP_TIMEOUT)
+    return add_to_date(now_datetime(), seconds=-gap_timeout)
+
+def get_consumer_cursor(consumer):
+    """Get the last sequence number a named consumer has processed."""
+    return cint(frappe.db.get_value(CURSOR_DOCTYPE, consumer, "last_sequence"))
+
+def set_consumer_cursor(consumer, cursor):
+    """
+    Save the last sequence number a named consumer has processed.
+
+    Cursors are kept one row per consumer in Sysmayal Change Log Cursor
+    and written with a single upsert, without touching any cache.
+    """
+
+    now = now_datetime()
+    user = frappe.session.user
+
+    frappe.db.sql("""
+        INSERT INTO `tabSysmayal Change Log Cursor`
+            (name, consumer, last_sequence, creation, modified, owner, modified_by, docstatus, idx)
+        VALUES (%(consumer)s, %(consumer)s, %(cursor)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0)
+        ON DUPLICATE KEY UPDATE
+            last_sequence = VALUES(last_sequence), modified = VALUES(modified), modified_by = VALUES(modified_by)
+    """, {"consumer": consumer, "cursor": cint(cursor), "now": now, "user": user})
@@ -0,0 +1,288 @@
+"""
+Compliance Rollup
+
+This module keeps group-level compliance totals on every Distribution
+Organization: the number of organizations, contacts, non-compliant
+products and expiring certificates in the organization and all of its
+subsidiaries. Group views read the stored totals instead of walking the
+parent_organization tree and counting each subsidiary's records.
+
+When a Product Compliance, Certification Document or Distribution Contact
+is saved or deleted, the change in what it counts towards is added to its
+organization and every ancestor in one UPDATE. Moving an organization to
+another parent moves its totals from the old ancestors to the new ones.
+Certificates leave or enter the expiring window as days pass, so the
+totals are rebuilt after the daily expiry window refresh changes any
+certificate's window.
+"""
+
+import frappe
+from frappe.query_builder.functions import Count
+from frappe.utils import cint
+from sysmayal.sysmayal.utils.expiry_buckets import get_buckets_within
+
+ORGANIZATION_DOCTYPE = "Distribution Organization"
+
+# Rollup fields on Distribution Organization
+ROLLUP_FIELDS = (
+    "group_organizations",
+    "group_contacts",
+    "group_non_compliant_products",
+    "group_expiring_certificates"
+)
+
+NON_COMPLIANT_STATUSES = ("Non-Compliant", "Expired")
+EXPIRING_WITHIN_DAYS = 90
+
+# Ancestor levels followed before a parent_organization loop is assumed
+MAX_DEPTH = 50
+
+def get_contribution(doc):
+    """
+    Get the organization a record counts towards and the totals it adds.
+
+    Args:
+        doc (Document): Product Compliance, Certification Document or
+            Distribution Contact, or its state before a save
+
+    Returns:
+        tuple: Organization name and a dict of rollup field increments,
+        or (None, {}) when the record counts towards nothing
+    """
+
+    if doc is None:
+        return None, {}
+
+    if doc.doctype == "Distribution Contact":
+        return doc.get("organization"), {"group_contacts": 1}
+
+    if doc.doctype == "Product Compliance":
+        if doc.get("compliance_status") in NON_COMPLIANT_STATUSES:
+            return doc.get("manufacturer"), {"group_non_compliant_products": 1}
+
+    elif doc.doctype == "Certification Document":
+        if doc.get("expiry_bucket") in get_buckets_within(EXPIRING_WITHIN_DAYS):
+            return doc.get("organization"), {"group_expiring_certificates": 1}
+
+    return None, {}
+
+def update_record_rollup(doc, method=None):
+    """
+    Apply a record's change to its organizations' group totals.
+
+    Called from doc_events on update and trash of Product Compliance,
+    Certification Document and Distribution Contact.
+    """
+
+    if method == "on_trash":
+        before, after = doc, None
+    else:
+        before, after = doc.get_doc_before_save(), doc
+
+    old_organization, old_counts = get_contribution(before)
+    new_organization, new_counts = get_contribution(after)
+
+    if old_organization == new_organization and old_counts == new_counts:
+        return
+
+    if old_organization:
+        apply_delta(old_organization, {field: -count for field, count in old_counts.items()})
+
+    if new_organization:
+        apply_delta(new_organization, new_counts)
+
+def set_organization_rollup(doc, method=None):
+    """
+    Load an organization's stored totals before it is saved (validate hook).
+
+    Totals change in the database while the form is open; saving the
+    values the form was loaded with would overwrite those changes.
+    """
+
+    if doc.is_new():
+        doc.update({field: 0 for field in ROLLUP_FIELDS})
+        doc.group_organizations = 1
+        return
+
+    doc.update(frappe.db.get_value(ORGANIZATION_DOCTYPE, doc.name, ROLLUP_FIELDS, as_dict=True, for_update=True) or {})
+
+def update_organization_rollup(doc, method=None):
+    """
+    Move an organization's totals when it is added, moved or deleted.
+
+    Called from doc_events on update and trash of Distribution Organization.
+    """
+
+    if method == "on_trash":
+        old_parent, new_parent = doc.parent_organization, None
+    else:
+        before = doc.get_doc_before_save()
+        old_parent, new_parent = before.parent_organization if before else None, doc.parent_organization
+
+    if old_parent == new_parent:
+        return
+
+    # The organization's own row holds its current subtree totals
+    totals = frappe.db.get_value(ORGANIZATION_DOCTYPE, doc.name, ROLLUP_FIELDS, as_dict=True)
+
+    if old_parent:
+        apply_delta(old_parent, {field: -cint(totals[field]) for field in ROLLUP_FIELDS})
+
+    if new_parent:
+        apply_delta(new_parent, {field: cint(totals[field]) for field in ROLLUP_FIELDS})
+
+def apply_delta(organization, delta):
+    """
+    Add increments to the totals of an organization and all its ancestors.
+
+    Args:
+        organization (str): Distribution Organization the record belongs to
+        delta (dict): Rollup fields mapped to the amount to add
+    """
+
+    delta = {field: count for field, count in delta.items() if count}
+    if not delta:
+        return
+
+    table = frappe.qb.DocType(ORGANIZATION_DOCTYPE)
+    query = frappe.qb.update(table).where(table.name.isin(get_ancestors(organization)))
+
+    for field, count in delta.items():
+        query = query.set(table[field], table[field] + count)
+
+    query.run()
+
+def get_ancestors(organization):
+    """
+    Get an organization and its parents up to the top of its group.
+
+    Returns:
+        list: Organization names, starting with the organization itself
+    """
+
+    ancestors = []
+
+    while organization and organization not in ancestors and len(ancestors) < MAX_DEPTH:
+        ancestors.append(organization)
+        organization = frappe.db.get_value(ORGANIZATION_DOCTYPE, organization, "parent_organization")
+
+    return ancestors
+
+def rebuild_compliance_rollup():
+    """
+    Recompute every organization's group totals from its records.
+
+    Counts each organization's own records with one GROUP BY per doctype,
+    adds them up the parent chain in memory and writes only the totals
+    that differ from the stored ones.
+
+    The organization rows are locked before counting. Saves that would
+    change a total wait on the lock until the rebuild commits, and then
+    apply their increment to the rebuilt value. Without the lock, an
+    increment committed between the counts and the write would be
+    overwritten.
+
+    Returns:
+        int: Number of organizations whose totals were corrected
+    """
+
+    # Start a fresh transaction so the counts see everything committed
+    # before the lock was taken
+    frappe.db.commit()
+
+    table = frappe.qb.DocType(ORGANIZATION_DOCTYPE)
+    organizations = (
+        frappe.qb.from_(table)
+        .select(table.name, table.parent_organization, *[table[field] for field in ROLLUP_FIELDS])
+        .for_update()
+    ).run(as_dict=True)
+    parents = {org.name: org.parent_organization for org in organizations}
+
+    totals = {org.name: {field: 0 for field in ROLLUP_FIELDS} for org in organizations}
+    own_counts = _get_own_counts()
+
+    for org in organizations:
+        own_counts.setdefault(org.name, {})["group_organizations"] = 1
+
+    for organization, counts in own_counts.items():
+        ancestor, visited = organization, set()
+
+        while ancestor in totals and ancestor not in visited and len(visited) < MAX_DEPTH:
+            visited.add(ancestor)
+
+            for field, count in counts.items():
+                totals[ancestor][field] += count
+
+            ancestor = parents.get(ancestor)
+
+    corrected = 0
+
+    for org in organizations:
+        if any(cint(org.get(field)) != totals[org.name][field] for field in ROLLUP_FIELDS):
+            frappe.db.set_value(ORGANIZATION_DOCTYPE, org.name, totals[org.name], update_modified=False)
+            corrected += 1
+
+    # Release the lock on the organization rows
+    frappe.db.commit()
+
+    return corrected
+
+def _get_own_counts():
+    """Count the records each organization has directly, per rollup field."""
+
+    sources = (
+        ("Distribution Contact", "organization", "group_contacts", None),
+        ("Product Compliance", "manufacturer", "group_non_compliant_products",
+            lambda table: table.compliance_status.isin(NON_COMPLIANT_STATUSES)),
+        ("Certification Document", "organization", "group_expiring_certificates",
+            lambda table: table.expiry_bucket.isin(get_buckets_within(EXPIRING_WITHIN_DAYS)))
+    )
+
+    own_counts = {}
+
+    for doctype, link_field, rollup_field, condition in sources:
+        table = frappe.qb.DocType(doctype)
+        query = (
+            frappe.qb.from_(table)
+            .select(table[link_field].as_("organization"), Count("*").as_("count"))
+            .where(table[link_field].isnotnull())
+            .groupby(table[link_field])
+        )
+
+        if condition:
+            query = query.where(condition(table))
+
+        for row in query.run(as_dict=True):
+            own_counts.setdefault(row.organization, {})[rollup_field] = row.count
+
+    return own_counts
+
+@frappe.whitelist()
+def get_group_compliance(organization):
+    """
+    Get the group totals of an organization and of each direct subsidiary.
+
+    Args:
+        organization (str): Distribution Organization name
+
+    Returns:
+        dict: The organization's totals and a "subsidiaries" list with the
+        totals of each direct child
+    """
+
+    frappe.has_permission(ORGANIZATION_DOCTYPE, "read", organization, throw=True)
+
+    fields = ["name", "organization_name", "regulatory_status", *ROLLUP_FIELDS]
+
+    group = frappe.db.get_value(ORGANIZATION_DOCTYPE, organization, fields, as_dict=True)
+    if not group:
+        frappe.throw(frappe._("Distribution Organization {0} not found").format(organization))
+
+    group["subsidiaries"] = frappe.get_all(
+        ORGANIZATION_DOCTYPE,
+        filters={"parent_organization": organization},
+        fields=fields,
+        order_by="organization_name"
+    )
+
+    return group
@@ -0,0 +1,131 @@
+"""
+Concurrent Aggregate Queries
+
+This module runs independent read-only aggregate queries in parallel, each
+on its own database connection from a small thread pool, and returns their
+results together. A dashboard made of several GROUP BY scans then takes
+about as long as its slowest query instead of the sum of all of them.
+
+Queries run in separate connections and transactions, so they do not see
+uncommitted writes of the calling request; when the request has written
+anything, or tests are running, the queries run one after another on the
+request's own connection instead. Set "sysmayal_aggregate_query_workers"
+in site config to size the pool (default 4, 0 to always run sequentially).
+Calls made while reading from the read replica run on replica connections.
+
+Each pool thread keeps its site initialised and its connections open
+between calls, reconnecting when a connection fails, so a dashboard call
+does not pay for connecting and loading the site config per query.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from sysmayal.sysmayal.utils.replica import connect_replica
+
+DEFAULT_WORKERS = 4
+
+_executor = None
+
+# Site and open connections of each pool thread
+_thread_state = threading.local()
+
+def run_aggregates(queries):
+    """
+    Run independent read-only queries concurrently.
+
+    Args:
+        queries (dict): Result keys mapped to (query, values) tuples
+
+    Returns:
+        dict: Result keys mapped to the rows of each query, as dicts
+    """
+
+    workers = frappe.conf.get("sysmayal_aggregate_query_workers", DEFAULT_WORKERS)
+
+    if not workers or len(queries) < 2 or not _can_run_concurrently():
+        return {key: frappe.db.sql(query, values, as_dict=True) for key, (query, values) in queries.items()}
+
+    executor = _get_executor(workers)
+    site, sites_path = frappe.local.site, frappe.local.sites_path
+    on_replica = getattr(frappe.local, "sysmayal_on_replica", False)
+
+    futures = {
+        key: executor.submit(_run_query, site, sites_path, query, values, on_replica)
+        for key, (query, values) in queries.items()
+    }
+
+    return {key: future.result() for key, future in futures.items()}
+
+def _can_run_concurrently():
+    """Check that separate connections would see the same data as the request."""
+
+    if frappe.flags.in_test or frappe.flags.in_migrate:
+        return False
+
+    # Other connections cannot read this transaction's uncommitted writes
+    return not getattr(frappe.db, "transaction_writes", 0)
+
+def _get_executor(workers):
+    """Get the process-wide thread pool, created on first use."""
+
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sysmayal-aggregates")
+
+    return _executor
+
+def _run_query(site, sites_path, query, values, on_replica=False):
+    """Run one query on the pool thread's primary or replica connection."""
+
+    try:
+        return _query_thread_db(site, sites_path, query, values, on_replica)
+    except Exception:
+        # The server may have closed an idle connection; retry once on a new one
+        _reset_thread()
+        return _query_thread_db(site, sites_path, query, values, on_replica)
+
+def _query_thread_db(site, sites_path, query, values, on_replica):
+    """Run a query and end its read transaction, so the next call sees fresh data."""
+
+    db = _get_thread_db(site, sites_path, on_replica)
+    result = db.sql(query, values, as_dict=True)
+    db.rollback()
+
+    return result
+
+def _get_thread_db(site, sites_path, on_replica):
+    """Get the pool thread's connection, initialising the site on first use."""
+
+    if getattr(_thread_state, "site", None) != site:
+        _reset_thread()
+        frappe.init(site=site, sites_path=sites_path)
+        _thread_state.site = site
+
+    connections = _thread_state.connections
+
+    if on_replica not in connections:
+        if on_replica:
+            connections[True] = connect_replica()
+        else:
+            frappe.connect(set_admin_as_user=False)
+            connections[False] = frappe.local.db
+
+    return connections[on_replica]
+
+def _reset_thread():
+    """Close the pool thread's connections and release its site."""
+
+    for db in (getattr(_thread_state, "connections", None) or {}).values():
+        try:
+            db.close()
+        except Exception:
+            pass
+
+    if getattr(_thread_state, "site", None):
+        frappe.destroy()
+
+    _thread_state.site = None
+    _thread_state.connections = {}
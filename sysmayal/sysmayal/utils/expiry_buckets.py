@@ -0,0 +1,153 @@
+"""
+Expiry Windows
+
+This module maintains indexed expiry window fields (Expired, Within 7 Days,
+Within 30 Days, Within 90 Days, Later) next to the expiry and review dates
+of Product Compliance, Certification Document and Distribution
+Organization. Windows are set on save and refreshed by a daily job, so
+"expiring within N days" lookups are indexed equality filters instead of
+DATEDIFF computations over every row.
+"""
+
+import frappe
+from frappe.utils import add_days, create_batch, date_diff, getdate, nowdate
+from sysmayal.sysmayal.utils.change_log import record_changes
+
+# Window names with the largest number of days remaining they cover, in order
+EXPIRY_BUCKETS = (
+    ("Expired", -1),
+    ("Within 7 Days", 7),
+    ("Within 30 Days", 30),
+    ("Within 90 Days", 90)
+)
+
+LATER_BUCKET = "Later"
+
+# Rows updated and logged per statement, keeping each under max_allowed_packet
+UPDATE_BATCH_SIZE = 10000
+
+# Window fields and the date fields they are derived from, per doctype
+BUCKET_FIELDS = {
+    "Product Compliance": {"expiry_bucket": "expiry_date", "review_bucket": "next_review_date"},
+    "Certification Document": {"expiry_bucket": "expiry_date"},
+    "Distribution Organization": {"agreement_expiry_bucket": "agreement_expiry"}
+}
+
+def get_expiry_bucket(date, today=None):
+    """
+    Get the expiry window for a date.
+
+    Args:
+        date (str): Expiry or review date
+        today (str): Reference date, defaults to today
+
+    Returns:
+        str: Window name, or an empty string when there is no date
+    """
+
+    if not date:
+        return ""
+
+    days = date_diff(date, today or nowdate())
+
+    for bucket, max_days in EXPIRY_BUCKETS:
+        if days <= max_days:
+            return bucket
+
+    return LATER_BUCKET
+
+def get_buckets_within(days):
+    """
+    Get the windows covering every date from today up to a number of days ahead.
+
+    Args:
+        days (int): Number of days ahead, one of 7, 30 or 90
+
+    Returns:
+        list: Window names, or None if days is not a window boundary
+    """
+
+    boundaries = [max_days for bucket, max_days in EXPIRY_BUCKETS]
+    if days not in boundaries[1:]:
+        return None
+
+    return [bucket for bucket, max_days in EXPIRY_BUCKETS[1:] if max_days <= days]
+
+def set_expiry_buckets(doc, method=None):
+    """Set a document's expiry window fields from its dates (validate hook)."""
+
+    for bucket_field, date_field in BUCKET_FIELDS.get(doc.doctype, {}).items():
+        doc.set(bucket_field, get_expiry_bucket(doc.get(date_field)))
+
+def update_expiry_buckets(date=None):
+    """
+    Refresh every expiry window field whose window changed since the last run.
+
+    Runs set-based UPDATEs per window field over the rows found to have
+    a stale window, UPDATE_BATCH_SIZE rows at a time, and records them in
+    the change log; the modified
+    timestamp is left untouched because the windows are derived data.
+    Group compliance totals are rebuilt when certificate windows change.
+
+    Args:
+        date (str): Reference date, defaults to today
+    """
+
+    today = getdate(date or nowdate())
+
+    for doctype, fields in BUCKET_FIELDS.items():
+        for bucket_field, date_field in fields.items():
+            bucket_case = _get_bucket_case(date_field)
+            values = _get_bucket_values(today)
+
+            names = frappe.db.sql_list(f"""
+                SELECT name FROM `tab{doctype}`
+                WHERE NOT (`{bucket_field}` <=> {bucket_case})
+            """, values)
+
+            if not names:
+                continue
+
+            for batch in create_batch(names, UPDATE_BATCH_SIZE):
+                frappe.db.sql(f"""
+                    UPDATE `tab{doctype}`
+                    SET `{bucket_field}` = {bucket_case}
+                    WHERE name IN %(names)s
+                """, {**values, "names": tuple(batch)})
+
+                record_changes(doctype, {name: [bucket_field] for name in batch}, "Update", source="Expiry Windows")
+
+            # Certificates entering or leaving the expiring window change group totals
+            if doctype == "Certification Document":
+                frappe.enqueue(
+                    "sysmayal.sysmayal.utils.compliance_rollup.rebuild_compliance_rollup",
+                    queue="long",
+                    job_id="sysmayal_compliance_rollup",
+                    deduplicate=True,
+                    enqueue_after_commit=True
+                )
+
+def _get_bucket_case(date_field):
+    """Build the SQL CASE expression matching get_expiry_bucket."""
+
+    whens = "\n".join(
+        f"WHEN `{date_field}` <= %(bucket_{i})s THEN %(bucket_name_{i})s"
+        for i in range(len(EXPIRY_BUCKETS))
+    )
+
+    return f"""(CASE
+        WHEN `{date_field}` IS NULL THEN ''
+        {whens}
+        ELSE %(later_bucket)s
+    END)"""
+
+def _get_bucket_values(today):
+    """Query values for the window boundaries relative to today."""
+
+    values = {"later_bucket": LATER_BUCKET}
+
+    for i, (bucket, max_days) in enumerate(EXPIRY_BUCKETS):
+        values[f"bucket_{i}"] = add_days(today, max_days)
+        values[f"bucket_name_{i}"] = bucket
+
+    return values
@@ -0,0 +1,297 @@
+"""
+Endpoint Instrumentation
+
+This module measures Sysmayal whitelisted methods, report runs and
+background/scheduler jobs: wall time, SQL query count, rows fetched and
+peak memory per call. Measurements are kept in a per-endpoint ring buffer
+in Redis and summarised as p50/p95/p99 by an admin endpoint.
+
+Requests and jobs are measured through the before/after request and job
+hooks, so every endpoint is covered without decorating it; the
+instrument decorator measures individual functions as well.
+
+Enable with the "sysmayal_instrumentation" site config key. Set
+"sysmayal_instrumentation_trace_memory" to measure Python heap peaks
+with tracemalloc instead of the cheaper process RSS high-water mark.
+"""
+
+import functools
+import json
+import math
+import resource
+import time
+import tracemalloc
+
+import frappe
+from frappe.utils import now_datetime
+
+METRICS_CACHE_KEY = "sysmayal:endpoint_metrics"
+ENDPOINTS_CACHE_KEY = "sysmayal:endpoint_metrics_endpoints"
+
+# Measurements kept per endpoint
+RING_SIZE = 1000
+
+def is_enabled():
+    """Check whether endpoint instrumentation is enabled for the site."""
+    return bool(frappe.conf.get("sysmayal_instrumentation"))
+
+def instrument(name=None):
+    """
+    Decorator recording a measurement for every call of a function.
+
+    Args:
+        name (str): Endpoint name, defaults to the function's dotted path
+    """
+
+    def decorator(fn):
+        endpoint = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return fn(*args, **kwargs)
+
+            with Measurement(endpoint):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+class Measurement:
+    """Context manager measuring one call and recording it on exit."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.trace_memory = False
+
+    def __enter__(self):
+        stats = install_query_counter()
+        self.start_queries = stats["queries"]
+        self.start_rows = stats["rows"]
+        self.start_rss = _get_peak_rss()
+
+        # tracemalloc is process wide, so only the outermost measurement traces
+        if frappe.conf.get("sysmayal_instrumentation_trace_memory") and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.trace_memory = True
+
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall_time = time.perf_counter() - self.start
+        stats = get_query_stats()
+
+        if self.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        else:
+            peak_memory = max(_get_peak_rss() - self.start_rss, 0)
+
+        record_measurement(self.endpoint, {
+            "timestamp": str(now_datetime()),
+            "wall_ms": round(wall_time * 1000, 2),
+            "queries": stats["queries"] - self.start_queries,
+            "rows": stats["rows"] - self.start_rows,
+            "peak_memory_kb": peak_memory,
+            "error": exc_type.__name__ if exc_type else None
+        })
+
+def install_query_counter():
+    """
+    Count queries and fetched rows on the current database connection.
+
+    The connection's sql method is wrapped once per request or job, the
+    same way the Frappe recorder does.
+
+    Returns:
+        dict: Running "queries" and "rows" totals for this request or job
+    """
+
+    stats = get_query_stats()
+
+    if frappe.db and not getattr(frappe.db.sql, "sysmayal_counting", False):
+        sql = frappe.db.sql
+
+        @functools.wraps(sql)
+        def counting_sql(*args, **kwargs):
+            result = sql(*args, **kwargs)
+            stats["queries"] += 1
+            if isinstance(result, (list, tuple)):
+                stats["rows"] += len(result)
+            return result
+
+        counting_sql.sysmayal_counting = True
+        frappe.db.sql = counting_sql
+
+    return stats
+
+def get_query_stats():
+    """Get the query totals of the current request or job."""
+
+    if not hasattr(frappe.local, "sysmayal_query_stats"):
+        frappe.local.sysmayal_query_stats = {"queries": 0, "rows": 0}
+
+    return frappe.local.sysmayal_query_stats
+
+def record_measurement(endpoint, measurement):
+    """Push a measurement onto the endpoint's ring buffer."""
+
+    try:
+        cache = frappe.cache()
+        key = f"{METRICS_CACHE_KEY}:{endpoint}"
+        cache.lpush(key, json.dumps(measurement))
+        cache.ltrim(key, 0, RING_SIZE - 1)
+        cache.hset(ENDPOINTS_CACHE_KEY, endpoint, 1)
+    except Exception:
+        # Instrumentation must never break the measured call
+        pass
+
+# Request and job hooks
+
+def before_request():
+    """Start measuring a request."""
+
+    if is_enabled():
+        frappe.local.sysmayal_request_measurement = Measurement(None).__enter__()
+
+def after_request(response=None, request=None):
+    """Record the request's measurement if it called a Sysmayal endpoint."""
+
+    measurement = getattr(frappe.local, "sysmayal_request_measurement", None)
+    if not measurement:
+        return
+
+    frappe.local.sysmayal_request_measurement = None
+    measurement.endpoint = _get_request_endpoint()
+
+    if measurement.endpoint:
+        measurement.__exit__(None, None, None)
+    elif measurement.trace_memory:
+        tracemalloc.stop()
+
+def before_job(method=None, kwargs=None, transaction_type=None):
+    """Start measuring a background or scheduler job."""
+
+    if is_enabled():
+        frappe.local.sysmayal_job_measurement = Measurement(None).__enter__()
+
+def after_job(method=None, kwargs=None, result=None):
+    """Record the job's measurement if it ran Sysmayal code."""
+
+    measurement = getattr(frappe.local, "sysmayal_job_measurement", None)
+    if not measurement:
+        return
+
+    frappe.local.sysmayal_job_measurement = None
+    measurement.endpoint = _get_job_endpoint(method, kwargs or {})
+
+    if measurement.endpoint:
+        measurement.__exit__(None, None, None)
+    elif measurement.trace_memory:
+        tracemalloc.stop()
+
+def _get_request_endpoint():
+    """Name the Sysmayal endpoint served by the current request, if any."""
+
+    cmd = frappe.form_dict.get("cmd") or ""
+    path = getattr(getattr(frappe.local, "request", None), "path", "") or ""
+    if not cmd and path.startswith("/api/method/"):
+        cmd = path[len("/api/method/"):]
+
+    if cmd.startswith("sysmayal."):
+        return cmd
+
+    if cmd in ("frappe.desk.query_report.run", "frappe.desk.query_report.export_query"):
+        report_name = frappe.form_dict.get("report_name")
+        if report_name and frappe.get_cached_value("Report", report_name, "module") == "sysmayal":
+            return f"report:{report_name}"
+
+    return None
+
+def _get_job_endpoint(method, kwargs):
+    """Name the Sysmayal job or scheduler task being run, if any."""
+
+    if not isinstance(method, str):
+        method = f"{getattr(method, '__module__', '')}.{getattr(method, '__qualname__', '')}"
+
+    if method.endswith("run_scheduled_job") and kwargs.get("job_type"):
+        method = frappe.get_cached_value("Scheduled Job Type", kwargs["job_type"], "method") or ""
+
+    return method if method.startswith("sysmayal.") else None
+
+def _get_peak_rss():
+    """Process resident set size high-water mark in KB."""
+
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# Reporting
+
+@frappe.whitelist()
+def get_endpoint_metrics(endpoint=None):
+    """
+    Summarise recorded measurements per endpoint.
+
+    Args:
+        endpoint (str): Only summarise this endpoint
+
+    Returns:
+        list: Per-endpoint call count and p50/p95/p99 of wall time, queries,
+        rows and peak memory, slowest p95 first
+    """
+
+    frappe.only_for("System Manager")
+
+    endpoints = [endpoint] if endpoint else get_recorded_endpoints()
+    summary = []
+
+    for name in endpoints:
+        measurements = [
+            json.loads(m) for m in frappe.cache().lrange(f"{METRICS_CACHE_KEY}:{name}", 0, RING_SIZE - 1) or []
+        ]
+        if not measurements:
+            continue
+
+        row = {"endpoint": name, "calls": len(measurements)}
+        for metric in ("wall_ms", "queries", "rows", "peak_memory_kb"):
+            values = sorted(m.get(metric) or 0 for m in measurements)
+            row[metric] = {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99)
+            }
+        row["errors"] = len([m for m in measurements if m.get("error")])
+        summary.append(row)
+
+    return sorted(summary, key=lambda r: r["wall_ms"]["p95"], reverse=True)
+
+@frappe.whitelist()
+def clear_endpoint_metrics():
+    """Drop all recorded measurements."""
+
+    frappe.only_for("System Manager")
+
+    for name in get_recorded_endpoints():
+        frappe.cache().delete_value(f"{METRICS_CACHE_KEY}:{name}")
+
+    frappe.cache().delete_value(ENDPOINTS_CACHE_KEY)
+
+def get_recorded_endpoints():
+    """Names of the endpoints with recorded measurements."""
+
+    # Hash keys come back from Redis as bytes
+    return [
+        name.decode() if isinstance(name, bytes) else name
+        for name in frappe.cache().hgetall(ENDPOINTS_CACHE_KEY) or {}
+    ]
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+
+    if not sorted_values:
+        return None
+
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
@@ -0,0 +1,88 @@
+"""
+Request-scoped Link Lookup Cache
+
+Controllers, reports and imports repeatedly read the same linked records
+(the contact's organization, the parent organization, the organization's
+country) within one request or background job. This module
+memoizes those reads on frappe.local, which Frappe resets for every
+request and job, and drops entries when the linked record is written.
+"""
+
+import frappe
+
+# Fields loaded together on the first lookup of a record, so that later
+# lookups of other fields in the same request are served from the cache
+PREFETCH_FIELDS = {
+    "Distribution Organization": [
+        "organization_name", "organization_type", "parent_organization", "country",
+        "territory", "status", "regulatory_status", "website", "contact_person", "email_id"
+    ]
+}
+
+def get_cached_value(doctype, name, fieldname="name"):
+    """
+    Get field values of a linked record, memoized for the current request.
+
+    Args:
+        doctype (str): Linked DocType
+        name (str): Linked record name
+        fieldname (str|list): Field or list of fields to return
+
+    Returns:
+        Value of the field, a dict for a list of fields, or None if the
+        record does not exist
+    """
+
+    if not name:
+        return None
+
+    fields = [fieldname] if isinstance(fieldname, str) else list(fieldname)
+    cache = _get_cache().setdefault(doctype, {})
+
+    record = cache.get(name, {})
+    if record is not None:
+        missing = [f for f in fields if f not in record]
+
+        if missing:
+            to_fetch = list(dict.fromkeys(["name", *missing, *PREFETCH_FIELDS.get(doctype, [])]))
+            values = frappe.db.get_value(doctype, name, to_fetch, as_dict=True)
+
+            # Remember missing records too, so repeated misses are free
+            record = {**record, **values} if values else None
+            cache[name] = record
+
+    if record is None:
+        return None
+
+    if isinstance(fieldname, str):
+        return record.get(fieldname)
+
+    return frappe._dict({f: record.get(f) for f in fields})
+
+def clear_lookup_cache(doc, method=None, *args, **kwargs):
+    """
+    Drop cached lookups for a record that was written.
+
+    Registered in doc_events for the cached DocTypes.
+    """
+
+    cache = _get_cache()
+
+    if method == "after_rename":
+        # The old name is not known here, drop the whole DocType
+        cache.pop(doc.doctype, None)
+    else:
+        cache.get(doc.doctype, {}).pop(doc.name, None)
+
+def reset_lookup_cache():
+    """Drop all cached lookups for the current request."""
+    frappe.local.sysmayal_lookup_cache = {}
+
+def _get_cache():
+    """Get the cache dictionary bound to the current request or job."""
+
+    cache = getattr(frappe.local, "sysmayal_lookup_cache", None)
+    if cache is None:
+        cache = frappe.local.sysmayal_lookup_cache = {}
+
+    return cache
@@ -0,0 +1,271 @@
+"""
+N+1 Query Detection
+
+This module watches the SQL issued during a request or background job in
+development and test mode and flags N+1 patterns: the same query shape
+run over and over with different parameters, typically a lookup inside a
+loop over rows. Each flagged shape is reported with the Sysmayal call
+sites that issued it, so the loop can be replaced with one batched query.
+
+Detection runs when developer_mode is on or tests are running, unless
+"sysmayal_n_plus_one_detection" is set to 0 in site config. The threshold
+of distinct parameter sets per shape is "sysmayal_n_plus_one_threshold"
+(default 10). Flagged requests and jobs are logged to the Error Log by a
+short background job; wrap code under test in assert_no_n_plus_one to
+fail the test instead.
+"""
+
+import functools
+import re
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+import frappe
+from frappe import _
+
+DEFAULT_THRESHOLD = 10
+
+# Call sites kept per flagged shape in the report
+MAX_CALL_SITES = 5
+
+# Literals replaced when reducing a query to its shape
+LITERAL_PATTERNS = (
+    re.compile(r"'(?:[^'\\]|\\.|'')*'"),
+    re.compile(r'"(?:[^"\\]|\\.)*"'),
+    re.compile(r"\b\d+(?:\.\d+)?\b")
+)
+IN_LIST_PATTERN = re.compile(r"\bin\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Modules wrapping frappe.db.sql, never reported as the issuing call site
+QUERY_WRAPPER_FILES = ("instrumentation.py", "n_plus_one.py", "slow_queries.py")
+
+class NPlusOneQueryError(frappe.ValidationError):
+    pass
+
+def is_enabled():
+    """Check whether N+1 detection runs on this site."""
+
+    if not frappe.conf.get("sysmayal_n_plus_one_detection", 1):
+        return False
+
+    return bool(frappe.conf.get("developer_mode") or frappe.flags.in_test)
+
+def get_threshold():
+    """Distinct parameter sets of one query shape allowed before it is flagged."""
+    return frappe.conf.get("sysmayal_n_plus_one_threshold") or DEFAULT_THRESHOLD
+
+def start_detection():
+    """
+    Start recording query shapes on the current database connection.
+
+    The connection's sql method is wrapped once per connection; recording
+    stops when stop_detection is called.
+    """
+
+    frappe.local.sysmayal_query_shapes = {}
+    install_shape_recorder()
+
+def install_shape_recorder():
+    """Wrap the current connection's sql method to record query shapes, once per connection."""
+
+    if frappe.db and not getattr(frappe.db.sql, "sysmayal_shape_recording", False):
+        sql = frappe.db.sql
+
+        @functools.wraps(sql)
+        def recording_sql(query, values=(), *args, **kwargs):
+            shapes = getattr(frappe.local, "sysmayal_query_shapes", None)
+            if shapes is not None and isinstance(query, str):
+                record_query(shapes, query, values)
+            return sql(query, values, *args, **kwargs)
+
+        recording_sql.sysmayal_shape_recording = True
+        frappe.db.sql = recording_sql
+
+def stop_detection(threshold=None):
+    """
+    Stop recording and collect the query shapes over the threshold.
+
+    Args:
+        threshold (int): Distinct parameter sets allowed per shape, defaults
+            to the site threshold
+
+    Returns:
+        list: Flagged shapes with their query, executions, distinct
+        parameter sets and call sites, most repeated first
+    """
+
+    shapes = getattr(frappe.local, "sysmayal_query_shapes", None) or {}
+    frappe.local.sysmayal_query_shapes = None
+
+    threshold = threshold or get_threshold()
+    flagged = [
+        {
+            "query": shape["query"],
+            "executions": shape["executions"],
+            "distinct_parameters": len(shape["parameters"]),
+            "call_sites": shape["call_sites"].most_common(MAX_CALL_SITES)
+        }
+        for shape in shapes.values()
+        if len(shape["parameters"]) > threshold
+    ]
+
+    return sorted(flagged, key=lambda s: s["distinct_parameters"], reverse=True)
+
+def record_query(shapes, query, values):
+    """Count one execution of a query under its shape."""
+
+    shape, literals = get_query_shape(query)
+
+    if shape not in shapes:
+        shapes[shape] = {"query": query, "executions": 0, "parameters": set(), "call_sites": Counter()}
+
+    entry = shapes[shape]
+    entry["executions"] += 1
+    entry["parameters"].add(repr((literals, values)))
+
+    call_site = get_call_site()
+    if call_site:
+        entry["call_sites"][call_site] += 1
+
+def get_query_shape(query):
+    """
+    Reduce a query to its shape by replacing literal values with placeholders.
+
+    Args:
+        query (str): SQL as passed to frappe.db.sql
+
+    Returns:
+        tuple: The query shape and the literals that were replaced
+    """
+
+    literals = []
+
+    def replace(match):
+        literals.append(match.group(0))
+        return "?"
+
+    shape = query
+    for pattern in LITERAL_PATTERNS:
+        shape = pattern.sub(replace, shape)
+
+    # IN lists of any length are the same shape
+    shape = IN_LIST_PATTERN.sub("in (?)", shape)
+    shape = shape.replace("%s", "?")
+    shape = re.sub(r"%\(\w+\)s", "?", shape)
+
+    return WHITESPACE_PATTERN.sub(" ", shape).strip().lower(), tuple(literals)
+
+def get_call_site():
+    """The innermost Sysmayal frame outside the query wrappers that issued the query."""
+
+    for frame in reversed(traceback.extract_stack()):
+        if "/sysmayal/" in frame.filename and not frame.filename.endswith(QUERY_WRAPPER_FILES):
+            return f"{frame.filename.split('/sysmayal/', 1)[-1]}:{frame.lineno} in {frame.name}"
+
+    return None
+
+def report(source, flagged, raise_exception=False):
+    """
+    Log or raise the N+1 report for a request, job or block of code.
+
+    Args:
+        source (str): What issued the queries, e.g. the request path or job method
+        flagged (list): Shapes returned by stop_detection
+        raise_exception (bool): Raise NPlusOneQueryError instead of logging
+    """
+
+    if not flagged:
+        return
+
+    message = format_report(source, flagged)
+
+    if raise_exception:
+        frappe.throw(message, NPlusOneQueryError, title=_("N+1 Queries Detected"))
+
+    # Request and job hooks run after the transaction is committed or rolled
+    # back, so the Error Log is written by a job with its own transaction
+    frappe.enqueue(
+        "sysmayal.sysmayal.utils.n_plus_one.save_report",
+        queue="short",
+        source=source,
+        message=message
+    )
+
+def save_report(source, message):
+    """Write an N+1 report to the Error Log (background job)."""
+    frappe.log_error(message=message, title=f"N+1 queries in {source}"[:140])
+
+def format_report(source, flagged):
+    """Render flagged shapes as a plain-text report."""
+
+    lines = [f"N+1 query patterns in {source}:"]
+
+    for shape in flagged:
+        lines.append("")
+        lines.append(
+            "{0} executions with {1} distinct parameter sets:".format(
+                shape["executions"], shape["distinct_parameters"]
+            )
+        )
+        lines.append("    " + WHITESPACE_PATTERN.sub(" ", shape["query"]).strip()[:500])
+        for call_site, count in shape["call_sites"]:
+            lines.append(f"    {count}x from {call_site}")
+
+    return "\n".join(lines)
+
+@contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """
+    Fail if the wrapped block issues an N+1 query pattern, for use in tests.
+
+    Args:
+        threshold (int): Distinct parameter sets allowed per shape, defaults
+            to the site threshold
+    """
+
+    previous = getattr(frappe.local, "sysmayal_query_shapes", None)
+    start_detection()
+
+    try:
+        yield
+    finally:
+        flagged = stop_detection(threshold)
+        frappe.local.sysmayal_query_shapes = previous
+
+    report("test block", flagged, raise_exception=True)
+
+# Request and job hooks
+
+def before_request():
+    """Start watching a request's queries."""
+
+    if is_enabled():
+        start_detection()
+
+def after_request(response=None, request=None):
+    """Report N+1 patterns found in the request."""
+
+    if getattr(frappe.local, "sysmayal_query_shapes", None) is None:
+        return
+
+    path = getattr(getattr(frappe.local, "request", None), "path", "") or ""
+    report(frappe.form_dict.get("cmd") or path, stop_detection())
+
+def before_job(method=None, kwargs=None, transaction_type=None):
+    """Start watching a background or scheduler job's queries."""
+
+    if is_enabled():
+        start_detection()
+
+def after_job(method=None, kwargs=None, result=None):
+    """Report N+1 patterns found in the job."""
+
+    if getattr(frappe.local, "sysmayal_query_shapes", None) is None:
+        return
+
+    if not isinstance(method, str):
+        method = f"{getattr(method, '__module__', '')}.{getattr(method, '__qualname__', '')}"
+
+    report(method, stop_detection())
@@ -0,0 +1,180 @@
+"""
+Country Regulation Registry
+
+Country Regulation records change rarely but are read on every contact,
+organization, compliance and market entry lookup. This module serves them
+from a small in-process LRU backed by Redis, keyed by country and region,
+with the requirement text already parsed into lists. CountryRegulation
+invalidates the registry whenever a record is written.
+"""
+
+import re
+from collections import OrderedDict
+
+import frappe
+from frappe.utils import strip_html
+
+REGULATION_FIELDS = [
+    "name", "country_name", "region", "regulatory_authority", "authority_website",
+    "aloe_classification", "key_requirements", "typical_timeline",
+    "verification_status", "last_updated"
+]
+
+COUNTRY_CACHE_KEY = "sysmayal:country_regulation"
+REGION_CACHE_KEY = "sysmayal:country_regulation_region"
+VERSION_CACHE_KEY = "sysmayal:country_regulation_version"
+
+LOCAL_CACHE_SIZE = 512
+
+# Process-wide LRU shared by all requests handled by this worker, keyed by site
+_local_cache = OrderedDict()
+_local_versions = {}
+
+def get_regulation(country):
+    """
+    Get the cached regulation for a country.
+
+    Args:
+        country (str): Country name
+
+    Returns:
+        frappe._dict: Regulation fields plus a parsed "requirements" list,
+        or None if the country has no regulation record
+    """
+
+    if not country:
+        return None
+
+    regulation = _get(("country", country), lambda: _load_country(country))
+    return frappe._dict(regulation) if regulation else None
+
+def get_regulations_by_region(region):
+    """
+    Get the cached regulations for all countries in a region.
+
+    Args:
+        region (str): Region name
+
+    Returns:
+        list: Regulations ordered by country name
+    """
+
+    if not region:
+        return []
+
+    countries = _get(("region", region), lambda: _load_region(region))
+    return [r for r in (get_regulation(country) for country in countries) if r]
+
+def clear_regulation_cache(country=None):
+    """
+    Invalidate cached regulations in Redis and in every worker process.
+
+    The registry is cleared immediately and again after the transaction
+    commits, so concurrent readers cannot re-cache the old values.
+
+    Args:
+        country (str): Country to drop, or None to drop every country
+    """
+
+    _clear(country)
+    frappe.db.after_commit.add(lambda: _clear(country))
+
+def _clear(country=None):
+    """Drop cached regulations and publish a new registry version."""
+
+    cache = frappe.cache()
+
+    if country:
+        cache.hdel(COUNTRY_CACHE_KEY, country)
+    else:
+        cache.delete_value(COUNTRY_CACHE_KEY)
+
+    # Region membership may have changed as well
+    cache.delete_value(REGION_CACHE_KEY)
+
+    # Other processes notice the new version and drop their local LRU
+    cache.set_value(VERSION_CACHE_KEY, frappe.generate_hash(length=10))
+    _clear_local()
+
+def parse_requirements(text):
+    """Split requirement text (HTML or plain) into a list of requirements."""
+
+    if not text:
+        return []
+
+    parts = re.split(r"<br\s*/?>|</p>|</li>|\n", text, flags=re.IGNORECASE)
+    return [item for item in (strip_html(part).strip(" \t-•") for part in parts) if item]
+
+def _get(key, loader):
+    """Read through the local LRU, then Redis, then the loader."""
+
+    _check_version()
+
+    kind, value = key
+    key = (frappe.local.site, kind, value)
+
+    if key in _local_cache:
+        _local_cache.move_to_end(key)
+        return _local_cache[key]
+
+    redis_key = COUNTRY_CACHE_KEY if kind == "country" else REGION_CACHE_KEY
+
+    cached = frappe.cache().hget(redis_key, value)
+    if cached is None:
+        cached = loader()
+        frappe.cache().hset(redis_key, value, cached)
+
+    _local_cache[key] = cached
+    if len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+    return cached
+
+def _check_version():
+    """Drop the local LRU if another process invalidated the registry."""
+
+    # Check Redis at most once per request or job
+    if getattr(frappe.local, "sysmayal_regulation_version_checked", False):
+        return
+
+    frappe.local.sysmayal_regulation_version_checked = True
+
+    version = frappe.cache().get_value(VERSION_CACHE_KEY)
+    if version != _local_versions.get(frappe.local.site):
+        _clear_local()
+        _local_versions[frappe.local.site] = version
+
+def _clear_local():
+    """Drop the current site's entries from the local LRU."""
+
+    site = frappe.local.site
+    for key in [k for k in _local_cache if k[0] == site]:
+        del _local_cache[key]
+
+def _load_country(country):
+    """Load one country's regulation from the database."""
+
+    regulation = frappe.db.get_value(
+        "Country Regulation",
+        {"country_name": country},
+        REGULATION_FIELDS,
+        as_dict=True
+    )
+
+    if not regulation:
+        # Cache the miss as an empty dict so it is not queried again
+        return {}
+
+    regulation = dict(regulation)
+    regulation["requirements"] = parse_requirements(regulation.get("key_requirements"))
+    return regulation
+
+def _load_region(region):
+    """Load the list of countries with a regulation in a region."""
+
+    return frappe.get_all(
+        "Country Regulation",
+        filters={"region": region},
+        order_by="country_name",
+        pluck="country_name"
+    )
@@ -0,0 +1,267 @@
+"""
+Read Replica Routing
+
+This module routes read-only analytic entry points (script reports,
+dashboards, report generators and market intelligence APIs) to a
+read replica of the site database, so their GROUP BY scans do not compete
+with saves and imports on the primary.
+
+Replication lag is checked at most every few seconds; when the replica is
+further behind than "sysmayal_replica_max_lag" seconds (default 30), is
+not replicating or cannot be reached, the entry points fall back to the
+primary until the next check. The replica connection is opened once per
+request or job, carries the request's instrumentation, N+1 and slow
+query wrappers, and is closed by the after request and job hooks. Caches
+filled from replica reads use get_cache_ttl, so stale results are not
+kept past the replica's lag.
+
+Enable with the "sysmayal_read_from_replica" site config key. The replica
+connection uses Frappe's replica settings ("replica_host",
+"replica_db_port" and, with "different_credentials_for_replica",
+"replica_db_name" and "replica_db_password"). To test locally against a
+second MariaDB instance that holds a copy of the database but is not
+replicating, also set "sysmayal_replica_allow_standalone".
+
+Reading the replication lag needs a global privilege that Frappe's
+database-level grants do not include. Grant it to the site's database
+user on the replica:
+
+    GRANT REPLICATION CLIENT ON *.* TO '<db user>'@'%';   -- MariaDB before 10.5
+    GRANT SLAVE MONITOR ON *.* TO '<db user>'@'%';        -- MariaDB 10.5 and later
+
+Without it the lag is unknown and the replica is not used, unless
+"sysmayal_replica_allow_unknown_lag" is set to accept it anyway.
+"""
+
+import functools
+
+import frappe
+from frappe.utils import cint
+from sysmayal.sysmayal.utils import instrumentation, n_plus_one, slow_queries
+
+DEFAULT_MAX_LAG = 30
+
+# Seconds a replica status check is reused, and before an unusable replica is retried
+STATUS_TTL = 10
+RETRY_INTERVAL = 60
+
+STATUS_CACHE_KEY = "sysmayal:replica_status"
+
+# MariaDB/MySQL error raised when a global privilege is missing
+SPECIFIC_ACCESS_DENIED_ERROR = 1227
+
+def is_enabled():
+    """Check whether analytic entry points should read from the replica."""
+    return bool(frappe.conf.get("sysmayal_read_from_replica") and frappe.conf.get("replica_host"))
+
+def read_from_replica(fn):
+    """
+    Decorator running a read-only function on the replica connection.
+
+    Falls back to the primary when routing is disabled or the replica is
+    unusable. The replica connection is opened once per request or job
+    and reused by every decorated call in it; nested calls run on the
+    connection already in use.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(frappe.local, "sysmayal_on_replica", False) or not is_enabled():
+            return fn(*args, **kwargs)
+
+        replica = get_request_replica()
+        if not replica:
+            return fn(*args, **kwargs)
+
+        primary = frappe.local.db
+        frappe.local.db = replica
+        frappe.local.sysmayal_on_replica = True
+
+        try:
+            install_query_wrappers()
+            return fn(*args, **kwargs)
+        finally:
+            frappe.local.db = primary
+            frappe.local.sysmayal_on_replica = False
+
+    return wrapper
+
+def get_request_replica():
+    """Get the replica connection of the current request or job, opening it on first use."""
+
+    if getattr(frappe.local, "sysmayal_replica_db", None) is None:
+        frappe.local.sysmayal_replica_db = get_replica_connection() or False
+
+    return frappe.local.sysmayal_replica_db
+
+def install_query_wrappers():
+    """
+    Install the active request's or job's query wrappers on the current connection.
+
+    Instrumentation, N+1 detection and slow query capture wrap the sql
+    method of the connection in use when they start, so the replica
+    connection gets the same wrappers when a call switches to it.
+    """
+
+    if hasattr(frappe.local, "sysmayal_query_stats"):
+        instrumentation.install_query_counter()
+
+    if getattr(frappe.local, "sysmayal_query_shapes", None) is not None:
+        n_plus_one.install_shape_recorder()
+
+    if getattr(frappe.local, "sysmayal_slow_queries", None) is not None:
+        slow_queries.install_query_timer()
+
+def close_request_replica(*args, **kwargs):
+    """Close the request's or job's replica connection (after request and job hook)."""
+
+    replica = getattr(frappe.local, "sysmayal_replica_db", None)
+    frappe.local.sysmayal_replica_db = None
+
+    if replica:
+        replica.close()
+
+def get_cache_ttl(ttl):
+    """
+    Cap the lifetime of a cache entry filled from data read on the replica.
+
+    Data read on a lagging replica may predate a save that already
+    invalidated the cache, so it is only kept until the replica has
+    caught up with that save.
+
+    Args:
+        ttl (int): Lifetime in seconds for data read on the primary
+
+    Returns:
+        int: Lifetime to use, or 0 when the entry should not be cached
+    """
+
+    if not getattr(frappe.local, "sysmayal_on_replica", False):
+        return ttl
+
+    lag = (getattr(frappe.local, "sysmayal_replica_status", None) or {}).get("lag")
+    if lag is None:
+        return 0
+
+    return ttl if lag == 0 else min(ttl, cint(lag))
+
+def get_replica_connection():
+    """
+    Connect to the replica if it is usable.
+
+    Returns:
+        Database: Open replica connection, or None to use the primary
+    """
+
+    status = frappe.cache().get_value(STATUS_CACHE_KEY)
+    if status and not status["usable"]:
+        return None
+
+    try:
+        replica = connect_replica()
+
+        if not status:
+            status = check_replica_status(replica)
+            frappe.cache().set_value(
+                STATUS_CACHE_KEY, status, expires_in_sec=STATUS_TTL if status["usable"] else RETRY_INTERVAL
+            )
+
+    except Exception as e:
+        frappe.cache().set_value(
+            STATUS_CACHE_KEY, {"usable": False, "lag": None, "reason": str(e)}, expires_in_sec=RETRY_INTERVAL
+        )
+        frappe.log_error(message=frappe.get_traceback(), title="Read replica unavailable")
+        return None
+
+    if not status["usable"]:
+        replica.close()
+        return None
+
+    frappe.local.sysmayal_replica_status = status
+    return replica
+
+def connect_replica():
+    """Open a connection to the replica with Frappe's replica settings."""
+
+    from frappe.database import get_db
+
+    conf = frappe.conf
+
+    if conf.get("different_credentials_for_replica"):
+        user, password = conf.get("replica_db_name"), conf.get("replica_db_password")
+    else:
+        user, password = conf.get("db_user") or conf.get("db_name"), conf.get("db_password")
+
+    replica = get_db(
+        host=conf.get("replica_host"),
+        port=conf.get("replica_db_port"),
+        user=user,
+        password=password,
+        cur_db_name=conf.get("db_name")
+    )
+
+    # Connections are lazy; connect now so failures fall back to the primary
+    replica.connect()
+    return replica
+
+def check_replica_status(replica):
+    """
+    Check whether the replica is within the staleness bound.
+
+    Returns:
+        dict: "usable", replication "lag" in seconds and the "reason" it is unusable
+    """
+
+    max_lag = cint(frappe.conf.get("sysmayal_replica_max_lag") or DEFAULT_MAX_LAG)
+
+    try:
+        rows = replica.sql("SHOW SLAVE STATUS", as_dict=True)
+    except Exception as e:
+        if not _is_missing_privilege(e):
+            raise
+
+        # The lag cannot be read without the privilege; this is a setup
+        # state rather than a failure, so it is not logged on every retry
+        if frappe.conf.get("sysmayal_replica_allow_unknown_lag"):
+            return {"usable": True, "lag": None, "reason": None}
+        return {"usable": False, "lag": None, "reason": "Replication lag unknown: missing REPLICATION CLIENT / SLAVE MONITOR privilege"}
+
+    if not rows:
+        if frappe.conf.get("sysmayal_replica_allow_standalone"):
+            return {"usable": True, "lag": None, "reason": None}
+        return {"usable": False, "lag": None, "reason": "Server is not replicating"}
+
+    lag = rows[0].get("Seconds_Behind_Master")
+    if lag is None:
+        return {"usable": False, "lag": None, "reason": "Replication is stopped"}
+
+    if lag > max_lag:
+        return {"usable": False, "lag": lag, "reason": f"Replica is {lag}s behind, over {max_lag}s"}
+
+    return {"usable": True, "lag": lag, "reason": None}
+
+def _is_missing_privilege(e):
+    """Check whether a query failed for lack of a global privilege."""
+    return bool(getattr(e, "args", None)) and e.args[0] == SPECIFIC_ACCESS_DENIED_ERROR
+
+@frappe.whitelist()
+def get_replica_status():
+    """
+    Check the replica now, bypassing the cached status.
+
+    Returns:
+        dict: Whether routing is enabled and the replica's current status
+    """
+
+    frappe.only_for("System Manager")
+
+    frappe.cache().delete_value(STATUS_CACHE_KEY)
+
+    if not is_enabled():
+        return {"enabled": False}
+
+    replica = get_replica_connection()
+    if replica:
+        replica.close()
+
+    return {"enabled": True, "host": frappe.conf.get("replica_host"), **frappe.cache().get_value(STATUS_CACHE_KEY)}
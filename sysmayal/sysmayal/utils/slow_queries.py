@@ -0,0 +1,237 @@
+"""
+Slow Query Capture
+
+This module captures Sysmayal-issued queries that run longer than a
+latency threshold during requests and background jobs. Captures are
+saved by a short background job, so the slow request itself only pays
+for a timer per query; the job runs EXPLAIN on a sample of each query
+shape and stores the plan with the request filters that produced it.
+The Slow Query Report ranks the captured shapes by total time spent.
+
+Enable by setting "sysmayal_slow_query_threshold_ms" in site config.
+"sysmayal_slow_query_explain_interval" sets how often, in seconds, each
+query shape is explained again (default one hour).
+"""
+
+import functools
+import hashlib
+import json
+import re
+import time
+
+import frappe
+from frappe.utils import flt
+from sysmayal.sysmayal.utils.n_plus_one import get_call_site, get_query_shape
+
+DEFAULT_EXPLAIN_INTERVAL = 3600
+
+# Captures kept per request or job
+MAX_CAPTURES = 20
+
+# Characters of request filters stored with a capture
+MAX_FILTERS_LENGTH = 5000
+
+# Request and job arguments whose values are never stored
+SENSITIVE_ARGUMENT_PATTERN = re.compile(
+    r"(?:^|[_\-])(pwd|passwd|password|secret|token|key|otp|signature|authorization)s?(?:$|[_\-])",
+    re.IGNORECASE
+)
+REDACTED = "********"
+
+EXPLAINED_CACHE_KEY = "sysmayal:slow_query_explained"
+
+def get_threshold():
+    """Latency in milliseconds above which queries are captured, or 0 when disabled."""
+    return flt(frappe.conf.get("sysmayal_slow_query_threshold_ms"))
+
+def start_capture():
+    """
+    Start timing queries on the current database connection.
+
+    The connection's sql method is wrapped once per connection; queries
+    are captured until stop_capture is called.
+    """
+
+    frappe.local.sysmayal_slow_queries = []
+    install_query_timer()
+
+def install_query_timer():
+    """Wrap the current connection's sql method to time queries, once per connection."""
+
+    if frappe.db and not getattr(frappe.db.sql, "sysmayal_timing", False):
+        sql = frappe.db.sql
+
+        @functools.wraps(sql)
+        def timing_sql(query, values=(), *args, **kwargs):
+            start = time.perf_counter()
+            result = sql(query, values, *args, **kwargs)
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            captured = getattr(frappe.local, "sysmayal_slow_queries", None)
+            if captured is not None and duration_ms >= get_threshold() and len(captured) < MAX_CAPTURES:
+                capture_query(captured, query, values, duration_ms)
+
+            return result
+
+        timing_sql.sysmayal_timing = True
+        frappe.db.sql = timing_sql
+
+def stop_capture():
+    """Stop capturing and return the slow queries of this request or job."""
+
+    captured = getattr(frappe.local, "sysmayal_slow_queries", None) or []
+    frappe.local.sysmayal_slow_queries = None
+
+    return captured
+
+def capture_query(captured, query, values, duration_ms):
+    """Keep a slow query if it was issued by Sysmayal code."""
+
+    if not isinstance(query, str):
+        return
+
+    call_site = get_call_site()
+    if not call_site:
+        return
+
+    captured.append({
+        "query": query,
+        "values": values,
+        "duration_ms": round(duration_ms, 2),
+        "call_site": call_site
+    })
+
+def save_slow_queries(queries, endpoint, filters=None):
+    """
+    Save captured queries, explaining a sample of each query shape.
+
+    Runs as a background job enqueued at the end of the request or job
+    that issued the queries.
+
+    Args:
+        queries (list): Captures from stop_capture
+        endpoint (str): Method, report or job that issued the queries
+        filters (str): JSON of the request arguments or job keyword arguments
+    """
+
+    for capture in queries:
+        query_hash = hashlib.sha1(get_query_shape(capture["query"])[0].encode()).hexdigest()[:16]
+        plan = explain_query(query_hash, capture["query"], capture["values"])
+
+        frappe.get_doc({
+            "doctype": "Sysmayal Slow Query",
+            "query_hash": query_hash,
+            "endpoint": (endpoint or "")[:140],
+            "call_site": capture["call_site"][:140],
+            "duration_ms": capture["duration_ms"],
+            "full_scan": int(any(row.get("type") == "ALL" for row in plan or [])),
+            "query": _render_query(capture["query"], capture["values"]),
+            "filters": filters,
+            "explain_plan": json.dumps(plan, indent=1, default=str) if plan else None
+        }).insert(ignore_permissions=True)
+
+def explain_query(query_hash, query, values):
+    """
+    Run EXPLAIN for a query unless its shape was explained recently.
+
+    Returns:
+        list: Plan rows, or None when not sampled or not explainable
+    """
+
+    if not query.lstrip().lower().startswith(("select", "with")):
+        return None
+
+    cache_key = f"{EXPLAINED_CACHE_KEY}:{query_hash}"
+    if frappe.cache().get_value(cache_key):
+        return None
+
+    interval = frappe.conf.get("sysmayal_slow_query_explain_interval") or DEFAULT_EXPLAIN_INTERVAL
+    frappe.cache().set_value(cache_key, 1, expires_in_sec=interval)
+
+    try:
+        return frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+    except Exception:
+        frappe.log_error(message=frappe.get_traceback(), title=f"Could not explain slow query {query_hash}")
+        return None
+
+def _render_query(query, values):
+    """Inline query values for display, keeping the raw query if that fails."""
+
+    try:
+        return frappe.db.mogrify(query, values)
+    except Exception:
+        return f"{query}\n-- values: {values!r}"
+
+def _get_filters(arguments):
+    """Serialise request or job arguments for storage with a capture."""
+
+    arguments = {key: value for key, value in (arguments or {}).items() if key not in ("cmd", "csrf_token")}
+    return json.dumps(_redact(arguments), default=str, sort_keys=True)[:MAX_FILTERS_LENGTH]
+
+def _redact(value):
+    """Replace the values of password, secret, token and key arguments, at any depth."""
+
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if SENSITIVE_ARGUMENT_PATTERN.search(str(key)) else _redact(item)
+            for key, item in value.items()
+        }
+
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+
+    return value
+
+def _enqueue_save(endpoint, arguments):
+    """Hand this request's or job's captures to the background save job."""
+
+    captured = stop_capture()
+    if not captured:
+        return
+
+    frappe.enqueue(
+        "sysmayal.sysmayal.utils.slow_queries.save_slow_queries",
+        queue="short",
+        queries=captured,
+        endpoint=endpoint,
+        filters=_get_filters(arguments)
+    )
+
+# Request and job hooks
+
+def before_request():
+    """Start timing a request's queries."""
+
+    if get_threshold():
+        start_capture()
+
+def after_request(response=None, request=None):
+    """Save the request's slow queries."""
+
+    if getattr(frappe.local, "sysmayal_slow_queries", None) is None:
+        return
+
+    path = getattr(getattr(frappe.local, "request", None), "path", "") or ""
+    _enqueue_save(frappe.form_dict.get("cmd") or path, frappe.form_dict)
+
+def before_job(method=None, kwargs=None, transaction_type=None):
+    """Start timing a background or scheduler job's queries."""
+
+    if get_threshold():
+        start_capture()
+
+def after_job(method=None, kwargs=None, result=None):
+    """Save the job's slow queries."""
+
+    if getattr(frappe.local, "sysmayal_slow_queries", None) is None:
+        return
+
+    if not isinstance(method, str):
+        method = f"{getattr(method, '__module__', '')}.{getattr(method, '__qualname__', '')}"
+
+    # Saving captures must not capture the save job's own queries
+    if method.endswith("slow_queries.save_slow_queries"):
+        stop_capture()
+        return
+
+    _enqueue_save(method, kwargs)
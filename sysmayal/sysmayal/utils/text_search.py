@@ -0,0 +1,169 @@
+"""
+Full-Text Search
+
+This module provides ranked full-text search over the long text fields of
+Market Research and Country Regulation using MariaDB FULLTEXT indexes.
+The indexes are created when the doctypes are migrated and are kept in
+sync by the database itself, so searches never scan the text columns.
+"""
+
+import re
+
+import frappe
+from frappe import _
+from frappe.utils import cint, escape_html, strip_html
+
+# Searchable doctypes with the title and text columns covered by their FULLTEXT index
+SEARCH_INDEXES = {
+    "Market Research": {
+        "title_field": "research_title",
+        "fields": ["research_title", "key_findings", "market_trends", "strategic_recommendations", "competitive_threats"]
+    },
+    "Country Regulation": {
+        "title_field": "country_name",
+        "fields": ["country_name", "regulatory_authority", "key_requirements"]
+    }
+}
+
+INDEX_NAME = "sysmayal_fulltext"
+
+SNIPPET_LENGTH = 160
+MAX_RESULTS = 100
+
+def add_fulltext_index(doctype):
+    """
+    Create the FULLTEXT index for a searchable doctype if it is missing.
+
+    Called from the doctype's on_doctype_update during migrate.
+
+    Args:
+        doctype (str): Searchable doctype name
+    """
+
+    if frappe.db.db_type != "mariadb":
+        return
+
+    if frappe.db.has_index(f"tab{doctype}", INDEX_NAME):
+        return
+
+    columns = ", ".join(f"`{field}`" for field in SEARCH_INDEXES[doctype]["fields"])
+    frappe.db.sql_ddl(f"ALTER TABLE `tab{doctype}` ADD FULLTEXT INDEX `{INDEX_NAME}` ({columns})")
+
+@frappe.whitelist()
+def search(query, doctypes=None, limit=20):
+    """
+    Search Market Research and Country Regulation text fields.
+
+    Args:
+        query (str): Search text; every word is matched as a prefix
+        doctypes (list): Doctypes to search, defaults to all searchable doctypes
+        limit (int): Maximum number of results
+
+    Returns:
+        list: Results with doctype, name, title, score and an HTML snippet,
+        best matches first
+    """
+
+    terms = get_search_terms(query)
+    if not terms:
+        return []
+
+    if isinstance(doctypes, str):
+        doctypes = frappe.parse_json(doctypes) if doctypes.startswith("[") else [doctypes]
+
+    limit = min(cint(limit) or 20, MAX_RESULTS)
+
+    results = []
+    for doctype in doctypes or SEARCH_INDEXES:
+        if doctype not in SEARCH_INDEXES:
+            frappe.throw(_("Full-text search is not available for {0}").format(doctype))
+
+        if frappe.has_permission(doctype, "read"):
+            results.extend(_search_doctype(doctype, terms, limit))
+
+    results.sort(key=lambda r: r["score"], reverse=True)
+    return results[:limit]
+
+def get_search_terms(query):
+    """Split search text into words usable in a boolean mode FULLTEXT match."""
+
+    # Boolean mode operators are dropped so user input cannot change the query
+    return re.findall(r"\w+", query or "")[:20]
+
+def _search_doctype(doctype, terms, limit):
+    """Run the ranked FULLTEXT query for one doctype."""
+
+    config = SEARCH_INDEXES[doctype]
+    columns = ", ".join(f"`{field}`" for field in config["fields"])
+
+    rows = frappe.db.sql(f"""
+        SELECT
+            name,
+            {columns},
+            MATCH({columns}) AGAINST (%(against)s IN BOOLEAN MODE) as score
+        FROM `tab{doctype}`
+        WHERE MATCH({columns}) AGAINST (%(against)s IN BOOLEAN MODE)
+        ORDER BY score DESC
+        LIMIT %(limit)s
+    """, {
+        "against": " ".join(f"{term}*" for term in terms),
+        "limit": limit
+    }, as_dict=True)
+
+    return [{
+        "doctype": doctype,
+        "name": row.name,
+        "title": row.get(config["title_field"]) or row.name,
+        "score": row.score,
+        "snippet": make_snippet([row.get(field) for field in config["fields"]], terms)
+    } for row in rows]
+
+def make_snippet(texts, terms, length=SNIPPET_LENGTH):
+    """
+    Build a short HTML snippet around the first matched term.
+
+    Args:
+        texts (list): Candidate text values, searched in order
+        terms (list): Search terms
+        length (int): Approximate snippet length in characters
+
+    Returns:
+        str: Escaped snippet with matched terms wrapped in <mark>
+    """
+
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+
+    for text in texts:
+        text = " ".join(strip_html(text or "").split())
+        match = pattern.search(text)
+        if not match:
+            continue
+
+        start = max(match.start() - length // 3, 0)
+        end = min(start + length, len(text))
+        return "{0}{1}{2}".format(
+            "..." if start else "",
+            highlight(text[start:end], pattern),
+            "..." if end < len(text) else ""
+        )
+
+    return ""
+
+def highlight(text, pattern):
+    """
+    Escape text and wrap the matches of a pattern in <mark>.
+
+    Matches are found on the raw text and the pieces between them escaped
+    separately, so terms never match inside HTML entities.
+    """
+
+    pieces = []
+    position = 0
+
+    for match in pattern.finditer(text):
+        pieces.append(escape_html(text[position:match.start()]))
+        pieces.append(f"<mark>{escape_html(match.group(0))}</mark>")
+        position = match.end()
+
+    pieces.append(escape_html(text[position:]))
+    return "".join(pieces)
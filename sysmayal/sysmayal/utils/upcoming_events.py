@@ -0,0 +1,142 @@
+"""
+Upcoming Events
+
+This module merges the dated events spread across Sysmayal doctypes
+(certificate expiries and renewals, compliance reviews and product
+expiries, agreement expiries and market launches) into one time-ordered
+stream. Each source is read in date order over its date index and the
+sources are combined with a k-way merge, so a page of events only reads
+about one page of rows per source.
+"""
+
+import heapq
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, date_diff, getdate, nowdate
+
+# Event sources in tie-break order: (event type, doctype, date field, title field)
+EVENT_SOURCES = (
+    ("Certificate Expiry", "Certification Document", "expiry_date", "document_title"),
+    ("Certificate Renewal Due", "Certification Document", "next_renewal_due", "document_title"),
+    ("Compliance Review", "Product Compliance", "next_review_date", "product_name"),
+    ("Product Expiry", "Product Compliance", "expiry_date", "product_name"),
+    ("Agreement Expiry", "Distribution Organization", "agreement_expiry", "organization_name"),
+    ("Market Launch", "Market Entry Plan", "target_launch_date", "plan_title")
+)
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_PAGE_LENGTH = 500
+
+@frappe.whitelist()
+def get_upcoming_events(from_date=None, to_date=None, event_types=None, page_length=50, after=None):
+    """
+    Get a page of upcoming events across doctypes, ordered by date.
+
+    Args:
+        from_date (str): Window start, defaults to today
+        to_date (str): Window end, defaults to 90 days after the start
+        event_types (list): Event types to include, defaults to all
+        page_length (int): Number of events per page
+        after (str): Cursor returned with the previous page
+
+    Returns:
+        dict: "events" for this page and "next_cursor" for the next one,
+        or None when the window is exhausted
+    """
+
+    from_date = getdate(from_date or nowdate())
+    to_date = getdate(to_date or add_days(from_date, DEFAULT_WINDOW_DAYS))
+    page_length = min(cint(page_length) or 50, MAX_PAGE_LENGTH)
+
+    if isinstance(event_types, str):
+        event_types = frappe.parse_json(event_types) if event_types.startswith("[") else [event_types]
+
+    cursor = parse_cursor(after)
+
+    streams = []
+    for source_index, source in enumerate(EVENT_SOURCES):
+        event_type, doctype = source[0], source[1]
+
+        if event_types and event_type not in event_types:
+            continue
+
+        if not frappe.has_permission(doctype, "read"):
+            continue
+
+        streams.append(_read_source(source_index, from_date, to_date, cursor, page_length))
+
+    # One extra event tells whether another page exists
+    merged = heapq.merge(*streams, key=lambda e: e["sort_key"])
+    events = [event for _i, event in zip(range(page_length + 1), merged)]
+
+    next_cursor = None
+    if len(events) > page_length:
+        events = events[:page_length]
+        next_cursor = make_cursor(events[-1]["sort_key"])
+
+    today = getdate(nowdate())
+    for event in events:
+        event.pop("sort_key")
+        event["days_remaining"] = date_diff(event["date"], today)
+
+    return {"events": events, "next_cursor": next_cursor}
+
+def make_cursor(sort_key):
+    """Encode an event sort key as a page cursor."""
+
+    date, source_index, name = sort_key
+    return f"{date}|{source_index}|{name}"
+
+def parse_cursor(cursor):
+    """Decode a page cursor into an event sort key."""
+
+    if not cursor:
+        return None
+
+    try:
+        date, source_index, name = cursor.split("|", 2)
+        return (getdate(date), cint(source_index), name)
+    except ValueError:
+        frappe.throw(_("Invalid cursor"))
+
+def _read_source(source_index, from_date, to_date, cursor, limit):
+    """Read one source's events after the cursor, in (date, name) order."""
+
+    event_type, doctype, date_field, title_field = EVENT_SOURCES[source_index]
+
+    table = frappe.qb.DocType(doctype)
+    date_column = table[date_field]
+
+    query = (
+        frappe.qb.from_(table)
+        .select(table.name, date_column.as_("date"), table[title_field].as_("title"))
+        .where(table.docstatus < 2)
+        .where(date_column[from_date:to_date])
+        .orderby(date_column)
+        .orderby(table.name)
+        .limit(limit + 1)
+    )
+
+    # Keyset pagination on (date, source, name)
+    if cursor:
+        cursor_date, cursor_source, cursor_name = cursor
+        if source_index > cursor_source:
+            query = query.where(date_column >= cursor_date)
+        elif source_index < cursor_source:
+            query = query.where(date_column > cursor_date)
+        else:
+            query = query.where(
+                (date_column > cursor_date)
+                | ((date_column == cursor_date) & (table.name > cursor_name))
+            )
+
+    for row in query.run(as_dict=True):
+        yield {
+            "sort_key": (getdate(row.date), source_index, row.name),
+            "date": row.date,
+            "event_type": event_type,
+            "reference_doctype": doctype,
+            "reference_name": row.name,
+            "title": row.title or row.name
+        }